@@ -0,0 +1,80 @@
+import timeit
+
+import numpy as np
+
+from src.superconductor_losses import logcosh, norris_equation, perp_loss
+
+"""
+Measures the HTS loss kernels against their tabulated (lookup table) alternatives.
+
+The perpendicular loss evaluates logcosh and tanh, the Norris equation a logarithm for every field point, so a table
+of the normalized loss shapes could replace them in the loss integrations. The benchmark compares the exact array
+kernels with the cheapest table evaluation in numpy: an equidistant table of the normalized shape (the leading power of
+the shape is factored out), indexed without search, one gather of the neighbouring nodes and a linear interpolation.
+
+Measured result (numpy 2, 1e6 points, the size of the pancake loss integrations): the table runs at about 0.9x of
+perp_loss and 0.4x of norris_equation. It is only faster for the perpendicular loss of the small arrays (1.2-1.5x
+below 1e3 points), where the call overhead dominates both. The gather of the nodes and the interpolation passes cost
+as much as one transcendental pass of numpy, so the loss paths keep the exact kernels and no tabulated mode is
+provided.
+
+Usage: python -m benchmarks.bench_hts_kernels
+"""
+
+SIZES = (1, 1000, 1000000)
+TABLE_NODES = 1 << 16
+
+
+def best_time(func, number, repeat=5):
+    """The best average time of one call in [us]."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def linear_table(func, lower: float, upper: float, power: int, nodes: int = TABLE_NODES):
+    """equidistant table of func(x) / x^power with a linear interpolation"""
+    x = np.linspace(lower, upper, nodes)
+    values = func(x) / x ** power
+    scale = (nodes - 1) / (upper - lower)
+
+    def table(xi):
+        u = (np.asarray(xi, dtype=float) - lower) * scale
+        idx = np.minimum(u.astype(np.intp), nodes - 2)
+        t = u - idx
+        return (values[idx] * (1.0 - t) + values[idx + 1] * t) * xi ** power
+
+    return table
+
+
+def run():
+    rng = np.random.default_rng(0)
+    f, Ic, bc = 50.0, 170.0, 15e-3
+    perp_factor = perp_loss(f, bc) / (2.0 * logcosh(1.0) - np.tanh(1.0))
+    norris_factor = norris_equation(f, 0.5 * Ic, Ic) / (0.5 * np.log(0.5) + 0.375)
+
+    perp_table = linear_table(lambda beta: 2.0 * logcosh(beta) - beta * np.tanh(beta), 1e-3 / bc, 0.5 / bc, 4)
+    norris_table = linear_table(lambda i: (1.0 - i) * np.log(1.0 - i) + (i - i ** 2 / 2.0), 1e-3, 0.95, 3)
+
+    timings = {}
+    for size in SIZES:
+        bperp = rng.uniform(1e-3, 0.5, size)
+        current = rng.uniform(0.2, 0.95 * Ic, size)
+        number = max(1, 20000 // size)
+
+        cases = [
+            ("perp_loss", lambda: perp_loss(f, bperp), lambda: perp_factor * perp_table(bperp / bc)),
+            ("norris_equation", lambda: norris_equation(f, current, Ic),
+             lambda: norris_factor * norris_table(current / Ic)),
+        ]
+        for name, exact, tabulated in cases:
+            t_exact = best_time(exact, number)
+            t_table = best_time(tabulated, number)
+            error = np.max(np.abs(tabulated() / exact() - 1.0))
+            timings[(name, size)] = (t_exact, t_table)
+            print("{:<16} n={:<8d} exact: {:11.2f} us   table: {:11.2f} us   speedup: {:5.2f}x   max rel. error: {:.1e}"
+                  .format(name, size, t_exact, t_table, t_exact / t_table, error))
+
+    return timings
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,70 @@
+import timeit
+
+import numpy as np
+
+from src import base_functions, jit_kernels
+from src.design_library import load_design
+from src.jit_kernels import BACKEND, calculate_population, numba
+
+"""
+Compares the backends of the scalar kernels and the fused population loop with the numpy implementations.
+
+The numba backend is measured only if numba is installed, the first call (compilation) is excluded from the timings.
+
+Usage: python -m benchmarks.bench_jit_kernels
+"""
+
+SIZES = (1000, 100000)
+PYTHON_LOOP_MAX = 10000  # the interpreted loop is measured only on the smaller populations
+
+
+def best_time(func, number, repeat=5):
+    """The best average time of one call in [us]."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def _population(design, size, seed=0):
+    rng = np.random.default_rng(seed)
+    return {name: getattr(design.design_params, name) * rng.uniform(0.8, 1.2, size)
+            for name in ("rc", "bc", "j_in", "j_ou", "h_in", "m_gap")}
+
+
+def run():
+    print("scalar kernels, backend: {}".format(BACKEND))
+    kernels = [
+        ("turn_voltage", (1.6, 200.0, 0.85, 50.0)),
+        ("calc_inner_width", (3333.3, 1100.0, 0.5, 2.65, 46.64)),
+        ("winding_mass", (3, 247.5, 35.0, 1100.0, 0.5)),
+        ("short_circuit_impedance", (10000.0, 3.0, 50.0, 0.97, 46.64, 1100.0, 198.4, 247.5, 35.0, 330.2, 43.4, 20.0)),
+        ("core_loss_unit", (1.6, 15000.0, 1.2)),
+    ]
+    timings = {}
+    for name, args in kernels:
+        original, kernel = getattr(base_functions, name), getattr(jit_kernels, name)
+        kernel(*args)
+        t_numpy = best_time(lambda: original(*args), 20000)
+        t_kernel = best_time(lambda: kernel(*args), 20000)
+        timings[name] = (t_numpy, t_kernel)
+        print("{:<24} base_functions: {:7.3f} us   kernel: {:7.3f} us   speedup: {:5.1f}x".format(
+            name, t_numpy, t_kernel, t_numpy / t_kernel))
+
+    print("fused population loop")
+    for rating, is_sc in (("10MVA_example", False), ("1250kVA_sc_transformer", True)):
+        design = load_design(rating)
+        for size in SIZES:
+            population = _population(design, size)
+            backends = ["numpy"] + (["numba"] if numba is not None else []) + \
+                       (["python"] if size <= PYTHON_LOOP_MAX else [])
+            number = max(1, 100000 // size)
+            for backend in backends:
+                calculate_population(design, population, is_sc, backend=backend)
+                elapsed = best_time(lambda: calculate_population(design, population, is_sc, backend=backend), number,
+                                    repeat=3)
+                timings[(rating, size, backend)] = elapsed
+                print("{:<24} n={:<7d} {:<7} {:12.1f} us   {:7.3f} us/design".format(rating, size, backend, elapsed,
+                                                                                     elapsed / size))
+    return timings
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,45 @@
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from src.diagrams import plot_design_space, plot_flux_profile
+
+"""
+Rendering time of the decimated flux profiles and the aggregated design clouds, the figures are written into files.
+
+Usage: python -m benchmarks.bench_plotting
+"""
+
+SIZE = 10 ** 7
+
+
+def run(size=SIZE):
+    rng = np.random.default_rng(0)
+    z = np.linspace(0.0, 1000.0, size)
+    b_ax = np.sin(z / 50.0) + rng.normal(0.0, 0.1, size)
+    b_rad = np.cos(z / 50.0) + rng.normal(0.0, 0.1, size)
+    sci = rng.normal(5.0, 1.0, size)
+    loss = rng.normal(50.0, 10.0, size)
+
+    cases = [
+        ("flux profile, min-max", lambda path: plot_flux_profile(z, b_ax, b_rad, path=path)),
+        ("flux profile, lttb", lambda path: plot_flux_profile(z, b_ax, b_rad, path=path, method="lttb")),
+        ("design cloud, count", lambda path: plot_design_space(sci, loss, path=path)),
+        ("design cloud, min cost", lambda path: plot_design_space(sci, loss, sci * loss, agg="min", path=path)),
+    ]
+
+    timings = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, plot in cases:
+            start = time.perf_counter()
+            plot(os.path.join(tmp, "figure.png"))
+            timings[name] = time.perf_counter() - start
+            print("{:<24} {:,} points: {:6.2f} s".format(name, size, timings[name]))
+
+    return timings
+
+
+if __name__ == "__main__":
+    run()
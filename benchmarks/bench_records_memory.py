@@ -0,0 +1,70 @@
+import tracemalloc
+
+import numpy as np
+
+from src.models import MainResults, WindingDesign
+from src.records import ResultRecord, ResultsTable, WindingRecord
+
+"""
+Memory usage of the different result representations, extrapolated to one million designs.
+
+Usage: python -m benchmarks.bench_records_memory
+"""
+
+SAMPLE = 20000
+MILLION = 1000000
+N_FLUX = 21  # the number of the horizontal slices in the FEM based flux sampling
+
+
+def sample_objects(i):
+    flux = [(60.0 + i * 1e-6, 2.0), ] * N_FLUX
+    results = MainResults(wh=1320.0 + i, feasible=True, core_loss=8.2, load_loss=49.18, copper_mass=2778.5,
+                          lv_mass=1158.5, hv_mass=1620.0, sci=7.38, window_width=198.4, core_mass=7751.0,
+                          turn_voltage=46.64, capitalized_cost=161503.5, fem_bax_brad_hv=list(flux),
+                          fem_bax_brad_lv=list(flux))
+    lv = WindingDesign(inner_radius=230.0, thickness=35.0, winding_height=1100.0, filling_factor=50.0,
+                       current_density=2.65)
+    hv = WindingDesign(inner_radius=315.0, thickness=43.4, winding_height=1067.0, filling_factor=50.0,
+                       current_density=2.57)
+    lv.calc_properties()
+    hv.calc_properties()
+    return results, lv, hv
+
+
+def traced_size(factory):
+    """The traced memory of SAMPLE objects, extrapolated to a million in [MB]."""
+    tracemalloc.start()
+    objects = [factory(i) for i in range(SAMPLE)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size / SAMPLE * MILLION / 2 ** 20
+
+
+def dataclasses(i):
+    return sample_objects(i)
+
+
+def records(i):
+    results, lv, hv = sample_objects(i)
+    return ResultRecord.from_results(results), WindingRecord.from_design(lv), WindingRecord.from_design(hv)
+
+
+def run():
+    sizes = {
+        "dataclasses (MainResults + 2 WindingDesign)": traced_size(dataclasses),
+        "records (ResultRecord + 2 WindingRecord)": traced_size(records),
+        "ResultsTable float64": ResultsTable(MILLION).nbytes / 2 ** 20,
+        "ResultsTable float64 + flux profiles": ResultsTable(MILLION, n_flux=N_FLUX).nbytes / 2 ** 20,
+        "ResultsTable float32 + flux profiles": ResultsTable(MILLION, n_flux=N_FLUX,
+                                                             float_type=np.float32).nbytes / 2 ** 20,
+    }
+
+    for name, size in sizes.items():
+        print("{:<46} {:9.1f} MB / million designs".format(name, size))
+
+    return sizes
+
+
+if __name__ == "__main__":
+    run()
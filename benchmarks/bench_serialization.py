@@ -0,0 +1,63 @@
+import json
+import timeit
+
+from importlib_resources import files
+
+from src.models import MainResults, TransformerDesign
+from src.serialization import DESIGN_CODEC, RESULTS_CODEC
+
+"""
+Compares the generated codecs with the dataclasses_json based serialization.
+
+Usage: python -m benchmarks.bench_serialization
+"""
+
+NUMBER = 2000
+
+
+def best_time(func, number=NUMBER, repeat=5):
+    """The best average time of one call in [us]."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def run():
+    with open(files("data").joinpath("10MVA_example.json")) as json_file:
+        data = json.load(json_file)
+
+    design = TransformerDesign.from_dict(data)
+    results = MainResults(sci=7.5, core_mass=7751.0, fem_bax_brad_hv=[[58.3, 2.1], [61.0, 0.9]],
+                          fem_bax_brad_lv=[[60.1, 2.3], [63.2, 1.1]])
+
+    design_json = design.to_json()
+    design_tuple = DESIGN_CODEC.to_tuple(design)
+    design_bytes = DESIGN_CODEC.to_bytes(design)
+    results_dict = results.to_dict()
+
+    cases = [
+        ("design to_dict", lambda: design.to_dict(), lambda: DESIGN_CODEC.to_dict(design)),
+        ("design from_dict", lambda: TransformerDesign.from_dict(data), lambda: DESIGN_CODEC.from_dict(data)),
+        ("design to_json", lambda: design.to_json(), lambda: DESIGN_CODEC.to_json(design)),
+        ("design from_json", lambda: TransformerDesign.from_json(design_json),
+         lambda: DESIGN_CODEC.from_json(design_json)),
+        ("design from_dict / from_tuple", lambda: TransformerDesign.from_dict(data),
+         lambda: DESIGN_CODEC.from_tuple(design_tuple)),
+        ("design from_dict / from_bytes", lambda: TransformerDesign.from_dict(data),
+         lambda: DESIGN_CODEC.from_bytes(design_bytes)),
+        ("results to_dict", lambda: results.to_dict(), lambda: RESULTS_CODEC.to_dict(results)),
+        ("results from_dict", lambda: MainResults.from_dict(results_dict),
+         lambda: RESULTS_CODEC.from_dict(results_dict)),
+    ]
+
+    timings = {}
+    for name, reference, fast in cases:
+        t_ref = best_time(reference)
+        t_fast = best_time(fast)
+        timings[name] = (t_ref, t_fast)
+        print("{:<32} dataclasses_json: {:9.2f} us   codec: {:7.2f} us   speedup: {:6.1f}x".format(
+            name, t_ref, t_fast, t_ref / t_fast))
+
+    return timings
+
+
+if __name__ == "__main__":
+    run()
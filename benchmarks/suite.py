@@ -0,0 +1,402 @@
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import timeit
+import typing
+
+import numpy as np
+
+from src import jit_kernels
+from src.base_functions import calc_inner_width, short_circuit_impedance, turn_voltage, winding_mass
+from src.batch_model import evaluate_population, evaluate_sc_population
+from src.design_library import DesignLibrary, load_design
+from src.superconductor_losses import magnusson_ac_loss, norris_equation, perp_loss, supra_winding_ac_loss
+from src.winding_loss_integration import pancake_losses, winding_grid
+
+"""
+Benchmark suite of the hot paths with regression tracking.
+
+Every run is appended to a JSON lines history file (one record per run with the commit, the environment and the best
+time of every benchmark). The results are compared with a baseline record, the benchmarks which are slower than the
+baseline by more than the threshold are reported as regressions and the exit code is 1.
+
+The benchmarks of the FEM model and the scalar two winding model need the agrossuite package, they are skipped if it
+is not installed.
+
+Usage:
+    python -m benchmarks.suite                    runs the suite, appends the history, compares with the baseline
+    python -m benchmarks.suite --save-baseline    saves the results as the new baseline
+    python -m benchmarks.suite -k sc_ --threshold 0.1
+"""
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+HISTORY_FILE = os.path.join(RESULTS_DIR, "history.jsonl")
+BASELINE_FILE = os.path.join(RESULTS_DIR, "baseline.json")
+THRESHOLD = 0.2  # 20 % slowdown is reported as a regression
+
+POPULATION = 100000  # designs in the batch benchmarks
+GENERATION = 100  # individuals in an optimizer generation
+
+
+class SkipBenchmark(Exception):
+    """Raised by the setup of a benchmark if it cannot be run in the current environment."""
+
+
+class Benchmark(typing.NamedTuple):
+    name: str
+    group: str
+    setup: typing.Callable[[], typing.Callable[[], typing.Any]]  # gives back the timed function
+
+
+BENCHMARKS: typing.List[Benchmark] = []
+
+
+def benchmark(name: str, group: str):
+    """Registers the decorated setup function, which gives back the timed function."""
+
+    def register(setup):
+        BENCHMARKS.append(Benchmark(name, group, setup))
+        return setup
+
+    return register
+
+
+def _two_winding_model():
+    try:
+        from src.two_winding_model import TwoWindingModel
+    except ImportError as error:
+        raise SkipBenchmark(str(error)) from None
+    return TwoWindingModel
+
+
+# scalar kernels -------------------------------------------------------------------------------------------------------
+@benchmark("kernel.turn_voltage", "kernels")
+def _turn_voltage():
+    return lambda: turn_voltage(1.6, 200.0, 0.85, 50.0)
+
+
+@benchmark("kernel.calc_inner_width", "kernels")
+def _inner_width():
+    return lambda: calc_inner_width(3333.3, 1100.0, 0.5, 2.65, 46.64)
+
+
+@benchmark("kernel.winding_mass", "kernels")
+def _winding_mass():
+    return lambda: winding_mass(3, 247.5, 35.0, 1100.0, 0.5)
+
+
+@benchmark("kernel.short_circuit_impedance", "kernels")
+def _sci():
+    return lambda: short_circuit_impedance(10000.0, 3.0, 50.0, 0.97, 46.64, 1100.0, 198.4, 247.5, 35.0, 330.2, 43.4,
+                                           20.0)
+
+
+@benchmark("kernel.jit_short_circuit_impedance", "kernels")
+def _jit_sci():
+    args = (10000.0, 3.0, 50.0, 0.97, 46.64, 1100.0, 198.4, 247.5, 35.0, 330.2, 43.4, 20.0)
+    jit_kernels.short_circuit_impedance(*args)
+    return lambda: jit_kernels.short_circuit_impedance(*args)
+
+
+# superconducting losses -----------------------------------------------------------------------------------------------
+@benchmark("sc.perp_loss", "sc_losses")
+def _perp_loss():
+    return lambda: perp_loss(50.0, 0.068)
+
+
+@benchmark("sc.norris_equation", "sc_losses")
+def _norris():
+    return lambda: norris_equation(50.0, 50.0, 115.0)
+
+
+@benchmark("sc.magnusson_ac_loss", "sc_losses")
+def _magnusson():
+    return lambda: magnusson_ac_loss(0.064, 0.034, 50.0, 69.0, 170.0)
+
+
+@benchmark("sc.supra_winding_ac_loss", "sc_losses")
+def _supra():
+    profile = [(0.06, 0.003 + 0.001 * i) for i in range(21)]
+    return lambda: supra_winding_ac_loss(profile, 50.0, 69.0, 170.0)
+
+
+@benchmark("sc.pancake_losses_1e5", "sc_losses")
+def _pancakes():
+    grid = winding_grid(300.0, 20.0, 600.0, 100.0, 0.6, 60, n_r=40, n_z=42)
+    rng = np.random.default_rng(0)
+    b_ax = rng.normal(0.0, 0.05, grid.r.shape)
+    b_rad = rng.normal(0.0, 0.02, grid.r.shape)
+    return lambda: pancake_losses(grid, b_ax, b_rad, 50.0, 50.0, 170.0)
+
+
+# batch models ---------------------------------------------------------------------------------------------------------
+def _population(design, size=POPULATION, seed=0):
+    rng = np.random.default_rng(seed)
+    params = design.design_params
+    return {name: getattr(params, name) * rng.uniform(0.8, 1.2, size) for name in ("rc", "bc", "j_in", "j_ou", "h_in",
+                                                                                   "m_gap")}
+
+
+@benchmark("batch.evaluate_population_1e5", "batch")
+def _batch():
+    design = load_design("10MVA_example")
+    population = _population(design)
+    return lambda: evaluate_population(design, population)
+
+
+@benchmark("batch.evaluate_sc_population_1e5", "batch")
+def _batch_sc():
+    design = load_design("1250kVA_sc_transformer")
+    population = _population(design)
+    return lambda: evaluate_sc_population(design, population)
+
+
+@benchmark("batch.fused_population_1e5", "batch")
+def _fused():
+    if jit_kernels.numba is None:
+        raise SkipBenchmark("numba is not installed")
+    design = load_design("1250kVA_sc_transformer")
+    population = _population(design)
+    jit_kernels.calculate_population(design, population, is_sc=True, backend="numba")
+    return lambda: jit_kernels.calculate_population(design, population, is_sc=True, backend="numba")
+
+
+# optimizer generations ------------------------------------------------------------------------------------------------
+@benchmark("optimizer.batch_generation", "optimizer")
+def _batch_generation():
+    design = load_design("10MVA_example")
+    population = _population(design, GENERATION)
+
+    def generation():
+        # evaluation and the selection of the better half of a generation
+        res = evaluate_population(design, population)
+        cost = np.where(res["feasible"], res["capitalized_cost"], np.inf)
+        return np.argsort(cost)[:GENERATION // 2]
+
+    return generation
+
+
+@benchmark("optimizer.scalar_generation", "optimizer")
+def _scalar_generation():
+    model_class = _two_winding_model()
+    library = DesignLibrary()
+    population = _population(load_design("10MVA_example"), GENERATION)
+
+    def generation():
+        costs = []
+        for i in range(GENERATION):
+            design = library.get("10MVA_example")
+            for name, values in population.items():
+                setattr(design.design_params, name, float(values[i]))
+            model = model_class(input=design)
+            try:
+                model.calculate(is_sc=False)
+                costs.append(model.results.capitalized_cost)
+            except ValueError:
+                costs.append(np.inf)
+        return np.argsort(costs)[:GENERATION // 2]
+
+    return generation
+
+
+# scalar two winding model and FEM -------------------------------------------------------------------------------------
+def _register_ratings():
+    """the calculate() of the scalar model on every bundled rating"""
+    for name in DesignLibrary().names():
+
+        def setup(name=name):
+            model_class = _two_winding_model()
+            design = load_design(name)
+            is_sc = "_sc_" in name
+
+            def calculate():
+                try:
+                    model_class(input=design).calculate(is_sc=is_sc)
+                except ValueError:
+                    # infeasible rating, the measured time is the time of the rejection
+                    pass
+
+            return calculate
+
+        BENCHMARKS.append(Benchmark("calculate." + name, "two_winding_model", setup))
+
+
+_register_ratings()
+
+
+def _solved_model():
+    model_class = _two_winding_model()
+    model = model_class(input=load_design("10MVA_example"))
+    model.calculate(is_sc=False)
+    return model
+
+
+@benchmark("fem.build_solve_sample", "fem")
+def _fem():
+    model = _solved_model()
+    return lambda: model.fem_simulation(detailed_output=False)
+
+
+@benchmark("fem.sample_field_1e3", "fem")
+def _fem_sample():
+    from src.winding_loss_integration import sample_field
+
+    model = _solved_model()
+    model.fem_simulation(detailed_output=False)
+    winding = model.hv_winding
+    grid = winding_grid(winding.inner_radius, winding.thickness, winding.winding_height,
+                        model.input.design_params.rc + model.input.required.ei / 2.0, 0.5, 20, n_r=10, n_z=5)
+    return lambda: sample_field(model.fem_solution, grid)
+
+
+# runner ---------------------------------------------------------------------------------------------------------------
+def best_time(func, repeat: int = 5, min_time: float = 0.2) -> float:
+    """The best average time of one call in [s], the number of the calls is set to run at least min_time."""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+
+    return min([elapsed] + timer.repeat(repeat=repeat - 1, number=number)) / number
+
+
+def run_suite(pattern: str = None, repeat: int = 5, min_time: float = 0.2,
+              verbose: bool = True) -> typing.Tuple[dict, dict]:
+    """
+    Runs the selected benchmarks.
+
+    :param pattern: regular expression of the selected benchmark names, all benchmarks by default
+    :return: name -> best time of one call [s], and name -> reason of the skipped benchmarks
+    """
+    results = {}
+    skipped = {}
+    for bench in BENCHMARKS:
+        if pattern is not None and not re.search(pattern, bench.name):
+            continue
+
+        try:
+            func = bench.setup()
+        except SkipBenchmark as reason:
+            skipped[bench.name] = str(reason)
+            if verbose:
+                print("{:<44} skipped: {}".format(bench.name, reason))
+            continue
+
+        results[bench.name] = best_time(func, repeat, min_time)
+        if verbose:
+            print("{:<44} {:12.3f} us".format(bench.name, results[bench.name] * 1e6))
+
+    return results, skipped
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def make_record(results: dict, skipped: dict) -> dict:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.node(),
+        "platform": platform.platform(),
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def append_history(record: dict, path: str = HISTORY_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as history:
+        history.write(json.dumps(record) + "\n")
+
+
+def read_history(path: str = HISTORY_FILE) -> typing.List[dict]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as history:
+        return [json.loads(line) for line in history if line.strip()]
+
+
+def save_baseline(record: dict, path: str = BASELINE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as baseline:
+        json.dump(record, baseline, indent=2)
+
+
+def load_baseline(path: str = BASELINE_FILE) -> typing.Optional[dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as baseline:
+        return json.load(baseline)
+
+
+def compare(results: dict, baseline: dict, threshold: float = THRESHOLD) -> typing.List[typing.Tuple[str, float, float]]:
+    """
+    Finds the regressions.
+
+    :param results: name -> time of the current run
+    :param baseline: name -> time of the baseline
+    :param threshold: the relative slowdown, which is reported
+    :return: (name, baseline time, current time) of the regressed benchmarks
+    """
+    return [(name, baseline[name], value) for name, value in results.items()
+            if name in baseline and value > baseline[name] * (1.0 + threshold)]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark suite of the TrafoCalc hot paths.")
+    parser.add_argument("-k", "--pattern", help="regular expression of the selected benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimal time of one measurement [s]")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="reported relative slowdown")
+    parser.add_argument("--history", default=HISTORY_FILE)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="saves the results as the new baseline")
+    parser.add_argument("--list", action="store_true", help="lists the benchmarks")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for bench in BENCHMARKS:
+            print("{:<16} {}".format(bench.group, bench.name))
+        return 0
+
+    results, skipped = run_suite(args.pattern, args.repeat, args.min_time)
+    record = make_record(results, skipped)
+    append_history(record, args.history)
+
+    if args.save_baseline:
+        save_baseline(record, args.baseline)
+        print("baseline saved: {}".format(args.baseline))
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        print("there is no baseline, use --save-baseline")
+        return 0
+
+    regressions = compare(results, baseline["results"], args.threshold)
+    for name, before, after in regressions:
+        print("REGRESSION {:<40} {:12.3f} us -> {:12.3f} us ({:+.0f} %)".format(name, before * 1e6, after * 1e6,
+                                                                             (after / before - 1.0) * 100.0))
+    if not regressions:
+        print("no regressions against the baseline of {} ({})".format(baseline.get("commit"), baseline["timestamp"]))
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
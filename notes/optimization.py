@@ -1,11 +1,9 @@
-import json
-
 from math import inf
 from artap.algorithm_genetic import NSGAII
 from artap.problem import Problem
 
-from importlib_resources import files
-from src.two_winding_model import TransformerDesign, TwoWindingModel
+from src.design_library import load_design
+from src.two_winding_model import TwoWindingModel
 from src.models import IndependentVariables
 
 
@@ -24,10 +22,8 @@ class TransformerOptimizationProblem(Problem):
 
         self.costs = [{"name": "TOC", "criteria": "minimize"}]
 
-        path = files("data").joinpath("10MVA_example.json")
-
-        with open(path) as json_file:
-            self.transformer_data = json.load(json_file)
+        # the rating is parsed only once, every evaluation gets a new copy from the library
+        self.rating = "10MVA_example"
 
     def individual_status(self, x):
         """
@@ -43,7 +39,7 @@ class TransformerOptimizationProblem(Problem):
         self.individual_status(x)
 
         try:
-            transformer = TransformerDesign.from_dict(self.transformer_data)
+            transformer = load_design(self.rating)
             transformer.design_params = IndependentVariables(rc=x[0], bc=x[1], j_in=x[2], j_ou=x[3], h_in=x[4],
                                                              m_gap=x[5])
 
@@ -26,7 +26,7 @@ def plot_pp_losses():
 
     p.line(
         flux_dens,
-        perp_loss(1.35, 50, 4.29 * 1e-3, 0.015, flux_dens),
+        perp_loss(50, flux_dens, K=1.35, w=4.29 * 1e-3, bc=0.015),
         legend_label="perpendicular loss",
         line_color="tomato",
         line_dash="dashed",
@@ -34,14 +34,13 @@ def plot_pp_losses():
     )
 
     f = 50.0
-    c = (0.75,)
+    c = 0.75
     bp = 0.0344
     Ac = 0.21 * 4.29 * 1e-6
 
-    bpv = np.vectorize(parallel_loss)
     p.line(
         flux_dens,
-        bpv(f, c, Ac, flux_dens, bp),
+        parallel_loss(flux_dens, f, C=c, ac=Ac, bp=bp),
         legend_label="parallel losses",
         line_dash="dotted",
         line_color="indigo",
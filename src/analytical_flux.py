@@ -1,6 +1,6 @@
 import typing
-from math import exp, log
 
+from numpy import exp, log
 from scipy.constants import mu_0, pi
 
 """
@@ -1,5 +1,6 @@
 import typing
 
+import numpy as np
 from scipy.constants import mu_0, pi
 from scipy.interpolate import interp1d
 
@@ -19,6 +20,10 @@ RHO_COPPER = 8960.0  # kg/m3
 
 PRECISION = 1  # all of the values rounded to .1 decimals, except the turn voltage, due to the manufcturing precision
 
+# the short-circuit peak factor as the function of the x / r ratio of the impedance
+SC_FACTOR_X = [1.0, 2.0, 3.0, 4.5, 7.0, 10.0, 15.0, 20.0, 40.0, 100.0]
+SC_FACTOR_Y = [1.42, 1.8, 2.0, 2.2, 2.4, 2.5, 2.57, 2.63, 2.7, 2.8]
+
 
 def winding_mass(m: float, r_m: float, t: float, h: float, ff: float, material='Cu') -> typing.Any:
     """
@@ -41,7 +46,7 @@ def winding_mass(m: float, r_m: float, t: float, h: float, ff: float, material='
     if material == 'BSSCO':
         density = C_RHO_BSSCO
 
-    return round(m * (r_m + t / 4) * 2.0 * pi * t * h * ff * density, PRECISION)
+    return np.round(m * (r_m + t / 4) * 2.0 * pi * t * h * ff * density, PRECISION)
 
 
 def winding_dc_loss(mass: float, j: float) -> typing.Any:
@@ -54,7 +59,7 @@ def winding_dc_loss(mass: float, j: float) -> typing.Any:
 
     dc_loss = C_RHO_CU * mass * j ** 2.0
 
-    return round(dc_loss * 1e-3, 1)
+    return np.round(dc_loss * 1e-3, 1)
 
 
 def core_loss_unit(ind: float, m_c: float, f_bf: float) -> typing.Any:
@@ -83,7 +88,7 @@ def core_loss_unit(ind: float, m_c: float, f_bf: float) -> typing.Any:
     f = 0.377614241733 * 0.0417580576
     g = 0.13103679517 * 0.0417580576
 
-    return round(
+    return np.round(
         m_c * f_bf * (a + c * ind + d * ind ** b + e * ind ** 3.0 + f * ind ** 4.0 + g * ind ** 5.0) * 10 ** (-3.0), 1)
 
 
@@ -118,7 +123,7 @@ def core_mass(r_c: float, ff_c: float, h: float, ei: float, s: float, m: float)
     m_column = a * 3 * (h + ei)
     m_yoke = a * (s * 8.0 + m * 4.0)
 
-    return round(m_column + m_yoke + m_corner, 1)
+    return np.round(m_column + m_yoke + m_corner, 1)
 
 
 def window_width(g_core: float, t_in: float, t_out: float, g: float, t_r: float, g_r: float) -> float:
@@ -135,7 +140,7 @@ def window_width(g_core: float, t_in: float, t_out: float, g: float, t_r: float,
     g is considered as a phase distance at the end of the windings
     """
 
-    return round(g_core + t_in + t_out + g + t_r + g_r + g, 1)
+    return np.round(g_core + t_in + t_out + g + t_r + g_r + g, 1)
 
 
 def turn_voltage(ind: float, r_c: float, ff_c: float, freq: float) -> typing.Any:
@@ -145,7 +150,7 @@ def turn_voltage(ind: float, r_c: float, ff_c: float, freq: float) -> typing.Any
     """
     area = r_c ** 2.0 * pi * ff_c
 
-    return round(ind * area * 4.44 * 1e-6 * freq, PRECISION + 1)
+    return np.round(ind * area * 4.44 * 1e-6 * freq, PRECISION + 1)
 
 
 def short_circuit_impedance(
@@ -182,7 +187,7 @@ def short_circuit_impedance(
     b = r_ou * t_ou / 3.0
     c = (r_in + t_in / 2.0 + g / 2.0) * g
 
-    return round(imp_con * (a + b + c) * 100, PRECISION + 1)
+    return np.round(imp_con * (a + b + c) * 100, PRECISION + 1)
 
 
 def inner_winding_radius(r_c: float, g_core: float, t_in: float) -> float:
@@ -194,7 +199,7 @@ def inner_winding_radius(r_c: float, g_core: float, t_in: float) -> float:
     Core || Inner Main || Regulating || Outer Main
 
     """
-    return round(r_c + g_core + t_in / 2.0, PRECISION)
+    return np.round(r_c + g_core + t_in / 2.0, PRECISION)
 
 
 def outer_winding_radius(r_in: float, t_in: float, g: float, t_out: float) -> float:
@@ -205,7 +210,7 @@ def outer_winding_radius(r_in: float, t_in: float, g: float, t_out: float) -> fl
     Core || Inner Main || Outer Main || Regulating
 
     """
-    return round(r_in + t_in / 2.0 + g + t_out / 2.0, PRECISION)
+    return np.round(r_in + t_in / 2.0 + g + t_out / 2.0, PRECISION)
 
 
 def winding_power(width: float, height: float, ff_w: float, j_: float, u_t: float) -> float:
@@ -217,7 +222,7 @@ def winding_power(width: float, height: float, ff_w: float, j_: float, u_t: floa
     x ff_w  - filling factor [-]
     """
 
-    return round(width * height * u_t * ff_w * j_ * 1e-3, PRECISION)  # kVA
+    return np.round(width * height * u_t * ff_w * j_ * 1e-3, PRECISION)  # kVA
 
 
 def calc_inner_width(s_p: float, h_: float, ff_w: float, j_: float, u_t: float) -> float:
@@ -230,7 +235,7 @@ def calc_inner_width(s_p: float, h_: float, ff_w: float, j_: float, u_t: float)
     j_    - current density [A/mm2]
     """
 
-    return round(s_p / h_ / ff_w / j_ / u_t * 1e3, PRECISION)  # mm
+    return np.round(s_p / h_ / ff_w / j_ / u_t * 1e3, PRECISION)  # mm
 
 
 def calculate_turn_num(win_voltage: float, turn_vol: float) -> float:
@@ -239,7 +244,7 @@ def calculate_turn_num(win_voltage: float, turn_vol: float) -> float:
     turn_voltage in [V]
     """
 
-    return round(win_voltage / turn_vol * 1e3, PRECISION)
+    return np.round(win_voltage / turn_vol * 1e3, PRECISION)
 
 
 def homogenous_insulation_ff(ff: float) -> typing.Any:
@@ -292,9 +297,7 @@ def sc_factor(x, r):
     :return:
     """
 
-    f_x = [1.0, 2.0, 3.0, 4.5, 7.0, 10.0, 15.0, 20.0, 40.0, 100.0]
-    f_y = [1.42, 1.8, 2.0, 2.2, 2.4, 2.5, 2.57, 2.63, 2.7, 2.8]
-    f = interp1d(f_x, f_y)
+    f = interp1d(SC_FACTOR_X, SC_FACTOR_Y)
     return round(float(f(x / r)), 2)
 
 
@@ -0,0 +1,229 @@
+import typing
+
+import numpy as np
+
+from src.base_functions import turn_voltage, calc_inner_width, inner_winding_radius, outer_winding_radius, \
+    window_width, core_mass, core_loss_unit, short_circuit_impedance, capitalized_cost, winding_mass, winding_dc_loss, \
+    homogenous_insulation_ff, opt_win_eddy_loss, C_RHO_BSSCO
+from src.analytical_flux import calc_b_parallel, calc_b_perpendicular, rogowski
+from src.models import TransformerDesign
+from src.superconductor_losses import parallel_loss, perp_loss, norris_equation, cryo_surface, cryostat_losses, \
+    thermal_incomes, sc_load_loss, cooler_cost
+
+"""
+Columnar (vectorized) version of the two winding model.
+
+The scalar model (TwoWindingModel.calculate) evaluates one design at a time and stores the results in dataclasses.
+This module evaluates a whole population of designs in one pass: the design variables and the cost coefficients are
+given as numpy arrays, the results are given back as a dictionary of numpy columns. The same analytical functions are
+used, therefore the results are the same as in the scalar model.
+
+The superconducting designs are evaluated by evaluate_sc_population with the same columns, extended by the ac loss,
+cryostat, current lead and cooling columns.
+"""
+
+C_WIN_MIN = 10.0  # [mm] technological limit for the thickness of the windings, it should be larger than 10 mm-s
+SC_WIN_MIN = 8.0  # [mm] sc_transformer winding minimum
+CORE_BF = 1.2  # building factor of the core
+
+TAPE_AREA = 0.31 * 4.1  # [mm2] cross-section of the BSCCO tape
+TAPE_WIDTH = 4.1  # [mm] width of the BSCCO tape
+
+# the independent variables of the design (IndependentVariables)
+DESIGN_VARIABLES = ("rc", "bc", "j_in", "j_ou", "h_in", "m_gap")
+# the cost coefficients (MaterialCosts)
+COST_VARIABLES = ("core_cost", "lv_cost", "hv_cost", "ll_cost", "nll_cost")
+
+
+def population_inputs(design: TransformerDesign, variables: typing.Mapping[str, typing.Any]) -> dict:
+    """
+    Builds the input columns of a population, the missing design variables and cost coefficients are taken from the
+    given design and broadcasted to the size of the population.
+
+    :param design: the base design, which contains the requirements, the default design variables and costs
+    :param variables: dictionary of the varied design variables/cost coefficients, the values are arrays (or scalars)
+    :return: dictionary of 1D float arrays with the same length
+    """
+    unknown = set(variables) - set(DESIGN_VARIABLES) - set(COST_VARIABLES)
+    if unknown:
+        raise ValueError("unknown population variables: {}".format(", ".join(sorted(unknown))))
+
+    columns = {}
+    for name in DESIGN_VARIABLES:
+        columns[name] = variables.get(name, getattr(design.design_params, name))
+    for name in COST_VARIABLES:
+        columns[name] = variables.get(name, getattr(design.costs, name))
+
+    arrays = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in columns.values()])
+    return {name: np.atleast_1d(value).ravel() for name, value in zip(columns, arrays)}
+
+
+def _main_dimensions(res: dict, design: TransformerDesign) -> tuple:
+    """the thickness and the mean radius of the inner winding, the height, thickness and mean radius of the outer one"""
+    req = design.required
+
+    # 1) phase power, assumes a 3 phased 3 legged transformer core
+    ph_power = req.power / 3.0  # [kVA]
+
+    # 2) turn voltage
+    res["turn_voltage"] = turn_voltage(res["bc"], res["rc"], req.core_fillingf / 100.0, req.freq)
+
+    # 3) main parameters of the inner winding
+    t_in = calc_inner_width(ph_power, res["h_in"], req.lv.filling_factor / 100.0, res["j_in"], res["turn_voltage"])
+    r_in = inner_winding_radius(res["rc"], req.min_core_gap, t_in)
+
+    # 4) outer winding parameters
+    h_ou = res["h_in"] * req.alpha
+    t_ou = calc_inner_width(ph_power, h_ou, req.hv.filling_factor / 100.0, res["j_ou"], res["turn_voltage"])
+    r_ou = outer_winding_radius(r_in, t_in, res["m_gap"], t_ou)
+
+    return t_in, r_in, h_ou, t_ou, r_ou
+
+
+def _core_and_impedance(res: dict, design: TransformerDesign, t_in, r_in, t_ou, r_ou):
+    """window, core and short circuit impedance columns, the load loss is summarized from the winding columns"""
+    req = design.required
+
+    # window width and window heights
+    res["window_width"] = window_width(req.min_core_gap, t_in, t_ou, res["m_gap"], 0, 0)
+    res["wh"] = res["h_in"] + req.ei
+
+    # core parameters
+    res["core_mass"] = core_mass(res["rc"], req.core_fillingf / 100.0, res["h_in"], req.ei, res["window_width"],
+                                 req.phase_distance / 2.0)
+    res["core_loss"] = core_loss_unit(res["bc"], res["core_mass"], CORE_BF)
+
+    res["load_loss"] = np.round(res["lv_ac_loss"] + res["lv_dc_loss"] + res["hv_ac_loss"] + res["hv_dc_loss"], 2)
+
+    # short circuit impedance calculation with analytical formulas
+    res["sci"] = short_circuit_impedance(req.power, 3.0, req.freq, req.alpha, res["turn_voltage"], res["h_in"],
+                                         res["window_width"], r_in, t_in, r_ou, t_ou, res["m_gap"])
+
+
+def evaluate_population(design: TransformerDesign, variables: typing.Mapping[str, typing.Any]) -> dict:
+    """
+    Calculates the main parameters of a population of two winding transformer designs, it follows the steps of the
+    TwoWindingModel.calculate(is_sc=False) function.
+
+    The designs with too narrow windings are not raising errors, they are marked by the 'feasible' column.
+
+    :param design: the base design, which contains the requirements
+    :param variables: dictionary of the varied design variables/cost coefficients
+    :return: dictionary of the input and the result columns
+    """
+    res = population_inputs(design, variables)
+    req = design.required
+    t_in, r_in, h_ou, t_ou, r_ou = _main_dimensions(res, design)
+
+    # detailed parameters of the windings
+    for prefix, r_m, t, h, j, ff in (("lv", r_in, t_in, res["h_in"], res["j_in"], req.lv.filling_factor),
+                                     ("hv", r_ou, t_ou, h_ou, res["j_ou"], req.hv.filling_factor)):
+        inner_radius = np.round(r_m - t / 2.0, 1)
+        mass = winding_mass(3, inner_radius + t / 2.0, t, h, ff / 100.0)
+        dc_loss = winding_dc_loss(mass, j)
+
+        res[prefix + "_inner_radius"] = inner_radius
+        res[prefix + "_thickness"] = t
+        res[prefix + "_height"] = h
+        res[prefix + "_mass"] = mass
+        res[prefix + "_dc_loss"] = dc_loss
+        res[prefix + "_ac_loss"] = opt_win_eddy_loss(t * homogenous_insulation_ff(ff / 100.0), t) * dc_loss
+        res[prefix + "_amper_turns"] = np.round(t * ff / 100.0 * h * j, 1)
+
+    _core_and_impedance(res, design, t_in, r_in, t_ou, r_ou)
+
+    res["capitalized_cost"] = capitalized_cost(res["core_mass"], res["core_cost"], res["lv_mass"], res["lv_cost"],
+                                               res["hv_mass"], res["hv_cost"], res["load_loss"], res["ll_cost"],
+                                               res["core_loss"], res["nll_cost"])
+    res["copper_mass"] = res["lv_mass"] + res["hv_mass"]
+
+    # if the resulting thickness of the winding is smaller than the required minimum the solution is not feasible
+    res["feasible"] = (t_in >= C_WIN_MIN) & (t_ou >= C_WIN_MIN)
+
+    return res
+
+
+def evaluate_sc_population(design: TransformerDesign, variables: typing.Mapping[str, typing.Any], Ic=170.0,
+                           kappa: float = 1.2, cooling_factor: float = 18.0) -> dict:
+    """
+    Calculates the main parameters of a population of superconducting two winding transformers, it follows the steps
+    of the TwoWindingModel.calculate(is_sc=True) function with the same columns as evaluate_population.
+
+    The ac losses of the windings are estimated by the Magnusson formula (parallel + perpendicular + self-field
+    losses) from the analytical peak values of the axial and the radial flux density, the tape current is the current
+    density of the winding on the tape cross-section. The load loss is the penalized cooling loss of the ac losses, the
+    cryostat losses and the heat load of the current leads, the capital cost of the cooler is added to the
+    capitalized cost.
+
+    The designs are not feasible if a winding is thinner than SC_WIN_MIN or the tape current exceeds the critical
+    current.
+
+    :param design: the base design, which contains the requirements
+    :param variables: dictionary of the varied design variables/cost coefficients
+    :param Ic: critical current of the tape [A], or a CriticalCurrentMap of the (parallel, perpendicular) field
+    :param kappa: considers the winding layout, which can reduce the radial losses in the conductors
+    :param cooling_factor: penalty factor of the cooling (sc_load_loss)
+    :return: dictionary of the input and the result columns
+    """
+    res = population_inputs(design, variables)
+    req = design.required
+    t_in, r_in, h_ou, t_ou, r_ou = _main_dimensions(res, design)
+
+    req.lv.calculate_phase_quantities(req.power)
+    req.hv.calculate_phase_quantities(req.power)
+
+    # the ampere-turns of the windings are balanced, the field is calculated from the inner winding
+    amper_turns = t_in * req.lv.filling_factor / 100.0 * res["h_in"] * res["j_in"]
+    b_parallel = calc_b_parallel(amper_turns, 1.0, res["h_in"] * 1e-3) * rogowski(t_in, t_ou, res["m_gap"],
+                                                                                   res["h_in"])
+    margin = np.ones_like(t_in)
+
+    # detailed parameters of the windings
+    for prefix, r_m, t, h, j, ff in (("lv", r_in, t_in, res["h_in"], res["j_in"], req.lv.filling_factor),
+                                     ("hv", r_ou, t_ou, h_ou, res["j_ou"], req.hv.filling_factor)):
+        inner_radius = np.round(r_m - t / 2.0, 1)
+        mass = winding_mass(3, inner_radius + t / 2.0, t, h, ff / 100.0, material="BSSCO")
+        cable_length = np.round(mass / C_RHO_BSSCO / TAPE_AREA * 1e-3, 2)  # m
+
+        b_perp = calc_b_perpendicular(amper_turns, 1.0, h * 1e-3, TAPE_WIDTH * 1e-3)
+        current = j * TAPE_AREA  # [A] tape current
+        ic = Ic(b_parallel, b_perp) if callable(Ic) else Ic
+        with np.errstate(invalid="ignore", divide="ignore"):
+            loss = parallel_loss(b_parallel, req.freq) + perp_loss(req.freq, b_perp) / kappa + \
+                   norris_equation(req.freq, current, ic)
+        margin = np.minimum(margin, 1.0 - current / ic)
+
+        res[prefix + "_inner_radius"] = inner_radius
+        res[prefix + "_thickness"] = t
+        res[prefix + "_height"] = h
+        res[prefix + "_mass"] = mass
+        res[prefix + "_dc_loss"] = np.zeros_like(t)  # superconducting 'loss' assumed in the normal state
+        res[prefix + "_ac_loss"] = np.round(loss * cable_length, 2)
+        res[prefix + "_amper_turns"] = np.round(t * ff / 100.0 * h * j, 1)
+        res[prefix + "_cable_length"] = cable_length
+        res[prefix + "_b_perpendicular"] = b_perp
+
+    res["b_parallel"] = b_parallel
+    res["ic_margin"] = margin
+
+    _core_and_impedance(res, design, t_in, r_in, t_ou, r_ou)
+
+    # there are significant losses generated by the cryostat and in the current leads
+    res["sc_ac_loss"] = res["load_loss"]
+    res["cryostat_surface"] = cryo_surface(r_in, r_ou + res["m_gap"], h_ou)
+    res["cryostat_loss"] = cryostat_losses(res["cryostat_surface"])
+    res["current_lead_loss"] = np.broadcast_to(thermal_incomes(req.lv.ph_current, req.hv.ph_current),
+                                               t_in.shape).astype(float)
+    cooling_power = res["sc_ac_loss"] + res["cryostat_loss"] + res["current_lead_loss"]
+    res["load_loss"] = sc_load_loss(res["sc_ac_loss"], res["cryostat_loss"], res["current_lead_loss"], cooling_factor)
+    res["cooler_cost"] = cooler_cost(cooling_power)
+
+    res["capitalized_cost"] = capitalized_cost(res["core_mass"], res["core_cost"], res["lv_mass"], res["lv_cost"],
+                                               res["hv_mass"], res["hv_cost"], res["load_loss"], res["ll_cost"],
+                                               res["core_loss"], res["nll_cost"]) + res["cooler_cost"]
+    res["copper_mass"] = res["lv_mass"] + res["hv_mass"]
+
+    with np.errstate(invalid="ignore"):
+        res["feasible"] = (t_in >= SC_WIN_MIN) & (t_ou >= SC_WIN_MIN) & (margin > 0.0)
+
+    return res
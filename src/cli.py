@@ -0,0 +1,573 @@
+import contextlib
+import csv
+import functools
+import itertools
+import json
+import os
+import sys
+import typing
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import numpy as np
+import typer
+from scipy.optimize import differential_evolution
+
+from src.batch_model import COST_VARIABLES, DESIGN_VARIABLES, evaluate_population, evaluate_sc_population
+from src.design_library import DesignLibrary, load_design, validate_design
+from src.fem_fidelity import FIDELITY_LEVELS, calibrate as calibrate_fidelity, get_fidelity
+from src.models import IndependentVariables, MainResults, TransformerDesign
+from src.sci_solver import sci_feasible
+from src.thermal import population_thermal
+
+"""
+Command line interface of the batch evaluations.
+
+    trafocalc evaluate --rating 10MVA_example < designs.jsonl > results.jsonl
+    trafocalc sweep 10MVA_example --var rc=180:250:8 --var bc=1.5,1.6,1.7 --output-format csv
+    trafocalc optimize 10MVA_example --bound h_in=800:1400 --thermal --fem --fidelity screening
+    trafocalc calibrate 31_5_MVA_example --sci-tolerance 0.5
+    trafocalc serve --port 8765
+
+The input records are read as a stream of JSON lines or CSV rows (with header) from the stdin. A record contains:
+ - a rating: the name of a bundled rating (or one on the TRAFOCALC_DESIGN_PATH), the path of a rating file, or the
+   whole rating inline ('required', 'costs', 'design_params' keys, like in the rating files),
+ - the design variables and cost coefficients to be varied (rc, bc, j_in, ..., core_cost, ...), the missing ones are
+   taken from the rating,
+ - any other labels (e.g. an id), which are copied into the output record.
+
+The records are evaluated in chunks by the columnar model, the chunks are distributed on a pool of worker processes.
+Only a bounded window of chunks is in flight and the results are written in the order of the input, so the memory
+does not depend on the length of the stream. The feasible designs can be checked by the FEM model too (--fem), which
+needs the agrossuite package.
+
+The records which cannot be evaluated (e.g. unknown rating) give an output record with an 'error' field, and the exit
+code is 1 at the end of the stream.
+"""
+
+DESIGN_KEYS = ("required", "costs", "design_params")  # the keys of an inline rating
+VARIABLES = DESIGN_VARIABLES + COST_VARIABLES
+FEM_COLUMNS = ("fem_based_sci", "fem_bax_hv", "fem_brad_hv", "fem_bax_lv", "fem_brad_lv")
+INFEASIBLE_COST = 1e12  # objective of the infeasible designs in the optimization, scaled by the impedance error
+
+app = typer.Typer(help="Batch evaluation and optimization of two winding transformer designs.")
+
+
+# input and output streams ---------------------------------------------------------------------------------------------
+def read_records(stream: typing.TextIO, input_format: str = "auto") -> typing.Iterator[dict]:
+    """
+    Reads the records lazily from a JSON lines or CSV stream.
+
+    :param input_format: 'jsonl', 'csv' or 'auto' (JSON lines if the first non-empty line starts with '{')
+    """
+    if input_format not in ("auto", "jsonl", "csv"):
+        raise ValueError("unknown input format: {}".format(input_format))
+
+    lines = (line for line in iter(stream.readline, "") if line.strip())
+    first = next(lines, None)
+    if first is None:
+        return
+    lines = itertools.chain([first], lines)
+
+    if input_format == "jsonl" or (input_format == "auto" and first.lstrip().startswith("{")):
+        for line in lines:
+            yield json.loads(line)
+    else:
+        for row in csv.DictReader(lines):
+            yield {name: _csv_value(name, value) for name, value in row.items() if value not in (None, "")}
+
+
+def _csv_value(name: str, value: str):
+    return float(value) if name in VARIABLES else value
+
+
+class RecordWriter:
+    """
+    Writes the result records as JSON lines or CSV rows, the output is flushed after every chunk.
+
+    :param columns: the written columns, if it is not given: every column in JSON lines, the columns of the first
+                    record in CSV
+    """
+
+    def __init__(self, stream: typing.TextIO, output_format: str = "jsonl", columns: typing.Sequence[str] = None):
+        if output_format not in ("jsonl", "csv"):
+            raise ValueError("unknown output format: {}".format(output_format))
+
+        self.stream = stream
+        self.output_format = output_format
+        self.columns = list(columns) if columns else None
+        self._csv = None
+
+    def write(self, record: dict):
+        if self.columns is not None:
+            record = {name: record.get(name) for name in self.columns}
+
+        if self.output_format == "jsonl":
+            self.stream.write(json.dumps(record) + "\n")
+            return
+
+        if self._csv is None:
+            self._csv = csv.DictWriter(self.stream, self.columns or list(record), restval="", extrasaction="ignore",
+                                       lineterminator="\n")
+            self._csv.writeheader()
+        self._csv.writerow(record)
+
+    def flush(self):
+        self.stream.flush()
+
+
+# worker pool ----------------------------------------------------------------------------------------------------------
+def ordered_map(function: typing.Callable, items: typing.Iterable, workers: int = 1, window: int = None,
+                executor_class: typing.Type[Executor] = ProcessPoolExecutor) -> typing.Iterator:
+    """
+    Lazy, parallel map, which gives back the results in the order of the items.
+
+    At most window items are submitted to the pool at the same time, the next items are read from the iterable only
+    after the first pending result is given back.
+
+    :param workers: number of the worker processes, the items are evaluated in the current process if it is 1
+    :param window: maximal number of the submitted items, 2 * workers by default
+    """
+    if workers <= 1:
+        yield from map(function, items)
+        return
+
+    window = max(1, window or 2 * workers)
+    with executor_class(workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def chunks(items: typing.Iterable, size: int) -> typing.Iterator[list]:
+    """splits an iterable into lists of the given size"""
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# evaluation -----------------------------------------------------------------------------------------------------------
+class EvaluationOptions(typing.NamedTuple):
+    rating: typing.Optional[str] = None  # rating of the records without rating
+    sc: bool = False  # superconducting model
+    fem: bool = False  # checks the feasible designs by the FEM model
+    fidelity: str = "standard"  # fidelity level of the FEM model
+
+
+def load_rating(spec: typing.Union[str, dict]) -> TransformerDesign:
+    """
+    Loads a rating given by its name, the path of the rating file, or as an inline dictionary.
+    """
+    if isinstance(spec, dict):
+        return validate_design(TransformerDesign.from_dict(spec))
+    if os.path.isfile(spec):
+        return DesignLibrary([spec], bundled=False).get(os.path.basename(spec))
+    return load_design(spec)
+
+
+def _rating_of(record: dict, default: typing.Optional[str]):
+    """the rating spec of a record and its hashable key"""
+    if "required" in record:
+        spec = {name: record[name] for name in ("description",) + DESIGN_KEYS if name in record}
+        spec.setdefault("description", "")
+        return spec, json.dumps(spec, sort_keys=True)
+
+    spec = record.get("rating", default)
+    if spec is None:
+        raise ValueError("the rating of the record is not given")
+    return spec, spec
+
+
+def _labels(record: dict) -> dict:
+    return {name: value for name, value in record.items() if name not in VARIABLES and name not in DESIGN_KEYS}
+
+
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _evaluate(design: TransformerDesign, variables: typing.Mapping[str, typing.Any], sc: bool) -> dict:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if sc:
+            return evaluate_sc_population(design, variables)
+        return evaluate_population(design, variables)
+
+
+def fem_check(design: TransformerDesign, row: dict, sc: bool = False, fidelity: str = "standard") -> dict:
+    """
+    Evaluates a design of the columnar model by the FEM model.
+
+    :return: the FEM based impedance and flux densities, the impedance check, or the error message of the simulation
+    """
+    from src.two_winding_model import TwoWindingModel
+
+    design = load_rating(design.to_dict())
+    design.design_params = IndependentVariables(**{name: float(row[name]) for name in DESIGN_VARIABLES})
+    model = TwoWindingModel(input=design, results=MainResults())
+    try:
+        model.calculate(is_sc=sc)
+        model.fem_simulation(detailed_output=False, fidelity=fidelity)
+    except Exception as error:  # the failed simulations should not stop the stream
+        return {"fem_error": str(error)}
+
+    result = {name: getattr(model.results, name) for name in FEM_COLUMNS}
+    result["fem_sci_feasible"] = bool(sci_feasible(design, model.results.fem_based_sci))
+    return result
+
+
+def evaluate_records(records: typing.Sequence[dict], options: EvaluationOptions = EvaluationOptions()) -> list:
+    """
+    Evaluates a chunk of records, the records of the same rating are evaluated together by the columnar model.
+
+    :return: the output records in the order of the input records
+    """
+    output: list = [None] * len(records)
+    groups: typing.Dict[str, tuple] = {}
+    for i, record in enumerate(records):
+        try:
+            spec, key = _rating_of(record, options.rating)
+        except ValueError as error:
+            output[i] = dict(_labels(record), error=str(error))
+            continue
+        groups.setdefault(key, (spec, []))[1].append(i)
+
+    for spec, indices in groups.values():
+        try:
+            design = load_rating(spec)
+            names = {name for i in indices for name in records[i] if name in VARIABLES}
+            variables = {}
+            for name in VARIABLES:
+                if name in names:
+                    source = design.design_params if name in DESIGN_VARIABLES else design.costs
+                    variables[name] = [float(records[i].get(name, getattr(source, name))) for i in indices]
+            res = _evaluate(design, variables, options.sc)
+        except (KeyError, ValueError, TypeError) as error:
+            for i in indices:
+                output[i] = dict(_labels(records[i]), error=str(error).strip("'\""))
+            continue
+
+        for k, i in enumerate(indices):
+            row = {name: _plain(column[k]) for name, column in res.items()}
+            if options.fem and row["feasible"]:
+                row.update(fem_check(design, row, options.sc, options.fidelity))
+            output[i] = dict(_labels(records[i]), **row)
+
+    return output
+
+
+def stream_evaluation(records: typing.Iterable[dict], writer: RecordWriter, options: EvaluationOptions,
+                      workers: int = 1, chunk_size: int = 256, feasible_only: bool = False) -> int:
+    """
+    Evaluates a stream of records in chunks on the worker pool and writes the results in the input order.
+
+    :return: number of the records with errors
+    """
+    errors = 0
+    evaluate = functools.partial(evaluate_records, options=options)
+    for results in ordered_map(evaluate, chunks(records, chunk_size), workers):
+        for result in results:
+            if "error" in result:
+                errors += 1
+            elif feasible_only and not result["feasible"]:
+                continue
+            writer.write(result)
+        writer.flush()
+
+    return errors
+
+
+# sweep and optimization -----------------------------------------------------------------------------------------------
+def parse_values(spec: str) -> np.ndarray:
+    """
+    Values of a swept variable: 'start:stop:num' equidistant values, or a comma separated list.
+    """
+    try:
+        if ":" in spec:
+            start, stop, num = spec.split(":")
+            return np.linspace(float(start), float(stop), int(num))
+        return np.array([float(value) for value in spec.split(",")])
+    except ValueError:
+        raise ValueError("invalid values: '{}', expected start:stop:num or a comma separated list".format(spec)) from None
+
+
+def parse_bounds(spec: str) -> typing.Tuple[float, float]:
+    """Bounds of an optimized variable: 'lower:upper'."""
+    try:
+        lower, upper = (float(value) for value in spec.split(":"))
+    except ValueError:
+        raise ValueError("invalid bounds: '{}', expected lower:upper".format(spec)) from None
+    if not lower < upper:
+        raise ValueError("invalid bounds: '{}', the lower bound should be smaller".format(spec))
+    return lower, upper
+
+
+def _assignments(specs: typing.Sequence[str]) -> typing.Dict[str, str]:
+    assignments = {}
+    for spec in specs:
+        name, sep, value = spec.partition("=")
+        if not sep or name not in VARIABLES:
+            raise ValueError("invalid variable: '{}', expected name=values, where the name is one of: {}".format(
+                spec, ", ".join(VARIABLES)))
+        assignments[name] = value
+    return assignments
+
+
+def sweep_records(variables: typing.Mapping[str, np.ndarray]) -> typing.Iterator[dict]:
+    """lazily generates the records of the full factorial grid, the last variable changes the fastest"""
+    names = list(variables)
+    for values in itertools.product(*[variables[name].tolist() for name in names]):
+        yield dict(zip(names, values))
+
+
+class OptimizationOptions(typing.NamedTuple):
+    bounds: typing.Dict[str, typing.Tuple[float, float]] = {}  # the other design variables are varied by +/- 30 %
+    sc: bool = False
+    fem: bool = False
+    maxiter: int = 100
+    popsize: int = 15
+    seed: typing.Optional[int] = None
+    thermal: bool = False  # the designs over the temperature limits of the thermal model are penalized
+    fidelity: str = "standard"  # fidelity level of the FEM check
+
+
+def optimize_design(design: TransformerDesign, options: OptimizationOptions = OptimizationOptions()) -> dict:
+    """
+    Minimizes the capitalized cost of a rating by differential evolution, every generation is evaluated in one pass of
+    the columnar model. The designs which are not feasible or miss the required impedance are penalized.
+
+    :return: the result record of the best design
+    """
+    if options.sc and options.thermal:
+        raise ValueError("the thermal model is not valid for the superconducting transformers")
+
+    bounds = {}
+    for name in DESIGN_VARIABLES:
+        value = getattr(design.design_params, name)
+        bounds[name] = tuple(options.bounds.get(name, (0.7 * value, 1.3 * value)))
+
+    req = design.required
+
+    def objective(x):
+        res = _evaluate(design, dict(zip(bounds, x)), options.sc)
+        feasible = res["feasible"] & sci_feasible(design, res["sci"])
+        if options.thermal:
+            feasible &= population_thermal(design, res).feasible
+        penalty = INFEASIBLE_COST * (1.0 + np.nan_to_num(np.abs(res["sci"] - req.sci_req) / req.sci_req, nan=1.0))
+        return np.where(feasible, res["capitalized_cost"], penalty)
+
+    optimum = differential_evolution(objective, list(bounds.values()), maxiter=options.maxiter, popsize=options.popsize,
+                                     seed=options.seed, vectorized=True, updating="deferred", polish=False)
+
+    res = _evaluate(design, dict(zip(bounds, optimum.x)), options.sc)
+    if options.thermal:
+        res.update(population_thermal(design, res).columns())
+    row = {name: _plain(column[0]) for name, column in res.items()}
+    row["sci_feasible"] = bool(sci_feasible(design, row["sci"]))
+    row["evaluations"] = int(optimum.nfev)
+    if options.fem and row["feasible"]:
+        row.update(fem_check(design, row, options.sc, options.fidelity))
+    return row
+
+
+def optimize_record(record: dict, options: OptimizationOptions = OptimizationOptions()) -> dict:
+    try:
+        spec, _ = _rating_of(record, None)
+        row = optimize_design(load_rating(spec), options)
+    except (KeyError, ValueError, TypeError) as error:
+        return dict(_labels(record), error=str(error).strip("'\""))
+    return dict(_labels(record), **row)
+
+
+def stream_optimization(records: typing.Iterable[dict], writer: RecordWriter, options: OptimizationOptions,
+                        workers: int = 1) -> int:
+    """
+    Optimizes the ratings of the records on the worker pool and writes the optimal designs in the input order.
+
+    :return: number of the records with errors
+    """
+    errors = 0
+    for result in ordered_map(functools.partial(optimize_record, options=options), records, workers):
+        errors += "error" in result
+        writer.write(result)
+        writer.flush()
+
+    return errors
+
+
+# commands -------------------------------------------------------------------------------------------------------------
+def _open_input(path: str) -> typing.ContextManager[typing.TextIO]:
+    return contextlib.nullcontext(sys.stdin) if path == "-" else open(path, newline="")
+
+
+def _writer(output_format: str, columns: typing.Optional[str]) -> RecordWriter:
+    return RecordWriter(sys.stdout, output_format, columns.split(",") if columns else None)
+
+
+def _finish(errors: int):
+    if errors:
+        typer.echo("{} record(s) could not be evaluated".format(errors), err=True)
+        raise typer.Exit(code=1)
+
+
+def _fail(message: str):
+    typer.echo(message, err=True)
+    raise typer.Exit(code=2)
+
+
+def _check_fem(fem: bool, fidelity: str = "standard"):
+    try:
+        get_fidelity(fidelity)
+    except ValueError as error:
+        _fail(str(error))
+    if fem:
+        try:
+            import agrossuite  # noqa: F401
+        except ImportError:
+            _fail("the --fem option needs the agrossuite package")
+
+
+@app.command()
+def evaluate(
+        rating: str = typer.Option(None, help="Rating of the records without a 'rating' field (name or file)."),
+        input_path: str = typer.Option("-", "--input", "-i", help="Input file, '-' for the stdin."),
+        input_format: str = typer.Option("auto", help="auto, jsonl or csv"),
+        output_format: str = typer.Option("jsonl", help="jsonl or csv"),
+        columns: str = typer.Option(None, help="Comma separated list of the output columns."),
+        sc: bool = typer.Option(False, "--sc", help="Superconducting transformer model."),
+        fem: bool = typer.Option(False, "--fem", help="Checks the feasible designs by FEM."),
+        fidelity: str = typer.Option("standard", help="Fidelity level of the FEM check: {}.".format(
+            ", ".join(FIDELITY_LEVELS))),
+        workers: int = typer.Option(1, "--workers", "-w", help="Number of the worker processes."),
+        chunk_size: int = typer.Option(256, help="Number of the records evaluated together."),
+):
+    """Evaluates the design records of the input stream."""
+    _check_fem(fem, fidelity)
+    with _open_input(input_path) as stream:
+        errors = stream_evaluation(read_records(stream, input_format), _writer(output_format, columns),
+                                   EvaluationOptions(rating, sc, fem, fidelity), workers, chunk_size)
+    _finish(errors)
+
+
+@app.command()
+def sweep(
+        rating: str = typer.Argument(..., help="Name or file of the rating."),
+        var: typing.List[str] = typer.Option([], "--var", "-v", help="name=start:stop:num or name=v1,v2,..."),
+        output_format: str = typer.Option("jsonl", help="jsonl or csv"),
+        columns: str = typer.Option(None, help="Comma separated list of the output columns."),
+        feasible_only: bool = typer.Option(False, "--feasible-only", help="Writes only the feasible designs."),
+        sc: bool = typer.Option(False, "--sc", help="Superconducting transformer model."),
+        fem: bool = typer.Option(False, "--fem", help="Checks the feasible designs by FEM."),
+        fidelity: str = typer.Option("standard", help="Fidelity level of the FEM check: {}.".format(
+            ", ".join(FIDELITY_LEVELS))),
+        workers: int = typer.Option(1, "--workers", "-w", help="Number of the worker processes."),
+        chunk_size: int = typer.Option(4096, help="Number of the designs evaluated together."),
+):
+    """Evaluates the full factorial grid of the given variables."""
+    _check_fem(fem, fidelity)
+    try:
+        variables = {name: parse_values(values) for name, values in _assignments(var).items()}
+    except ValueError as error:
+        _fail(str(error))
+
+    errors = stream_evaluation(sweep_records(variables), _writer(output_format, columns),
+                               EvaluationOptions(rating, sc, fem, fidelity), workers, chunk_size, feasible_only)
+    _finish(errors)
+
+
+@app.command()
+def optimize(
+        ratings: typing.List[str] = typer.Argument(None, help="Names or files of the ratings, read from the input "
+                                                              "records if not given."),
+        input_path: str = typer.Option("-", "--input", "-i", help="Input file, '-' for the stdin."),
+        input_format: str = typer.Option("auto", help="auto, jsonl or csv"),
+        bound: typing.List[str] = typer.Option([], "--bound", "-b", help="name=lower:upper"),
+        output_format: str = typer.Option("jsonl", help="jsonl or csv"),
+        columns: str = typer.Option(None, help="Comma separated list of the output columns."),
+        sc: bool = typer.Option(False, "--sc", help="Superconducting transformer model."),
+        fem: bool = typer.Option(False, "--fem", help="Checks the optimal designs by FEM."),
+        fidelity: str = typer.Option("standard", help="Fidelity level of the FEM check: {}.".format(
+            ", ".join(FIDELITY_LEVELS))),
+        maxiter: int = typer.Option(100, help="Maximal number of the generations."),
+        popsize: int = typer.Option(15, help="Population size multiplier of the differential evolution."),
+        seed: int = typer.Option(None, help="Seed of the random generator."),
+        thermal: bool = typer.Option(False, "--thermal", help="Enforces the temperature limits of the thermal model."),
+        workers: int = typer.Option(1, "--workers", "-w", help="Number of the worker processes."),
+):
+    """Minimizes the capitalized cost of the ratings."""
+    _check_fem(fem, fidelity)
+    if sc and thermal:
+        _fail("the thermal model is not valid for the superconducting transformers")
+    try:
+        bounds = {name: parse_bounds(values) for name, values in _assignments(bound).items()}
+        if set(bounds) - set(DESIGN_VARIABLES):
+            raise ValueError("only the design variables can be optimized: {}".format(", ".join(DESIGN_VARIABLES)))
+    except ValueError as error:
+        _fail(str(error))
+
+    options = OptimizationOptions(bounds, sc, fem, maxiter, popsize, seed, thermal, fidelity)
+    writer = _writer(output_format, columns)
+    if ratings:
+        errors = stream_optimization(({"rating": rating} for rating in ratings), writer, options, workers)
+    else:
+        with _open_input(input_path) as stream:
+            errors = stream_optimization(read_records(stream, input_format), writer, options, workers)
+    _finish(errors)
+
+
+@app.command()
+def calibrate(
+        rating: str = typer.Argument(..., help="Name or file of the rating."),
+        sci_tolerance: float = typer.Option(1.0, help="Allowed relative error of the impedance [%]."),
+        flux_tolerance: float = typer.Option(2.0, help="Allowed relative error of the peak flux densities [%]."),
+        output_format: str = typer.Option("table", help="table or jsonl"),
+):
+    """Selects the cheapest FEM fidelity level of a rating by a convergence study."""
+    _check_fem(True)
+    try:
+        design = load_rating(rating)
+    except (KeyError, ValueError, TypeError) as error:
+        _fail(str(error).strip("'\""))
+
+    calibration = calibrate_fidelity(design, sci_tolerance, flux_tolerance)
+    if output_format == "table":
+        typer.echo(calibration.report())
+    else:
+        for level in calibration.levels + [calibration.reference]:
+            typer.echo(json.dumps(dict(level=level.name, time=level.time, sci_error=level.sci_error,
+                                       flux_error=level.flux_error, accepted=level.accepted,
+                                       **level.output._asdict(), **level.fidelity._asdict())))
+        typer.echo(json.dumps({"selected": calibration.selected}))
+    if calibration.selected is None:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def serve(
+        host: str = typer.Option("127.0.0.1", help="The listened interface."),
+        port: int = typer.Option(8765, help="The listened port."),
+        max_batch: int = typer.Option(256, help="Maximal number of the designs evaluated together."),
+        max_delay: float = typer.Option(0.002, help="Maximal waiting time [s] for the designs of a batch."),
+        fem_workers: int = typer.Option(1, help="Number of the FEM worker processes."),
+        verbose: bool = typer.Option(False, "--verbose", help="Logs the requests."),
+):
+    """Runs the local evaluation service."""
+    from src.service import EvaluationService
+
+    service = EvaluationService(host, port, max_batch, max_delay, fem_workers, verbose)
+    typer.echo("serving on {}".format(service.url), err=True)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,154 @@
+import typing
+from functools import lru_cache
+
+import numpy as np
+
+from src.superconductor_losses import norris_equation
+
+"""
+Field and temperature dependent critical current of the HTS tapes.
+
+The critical current of the tapes drops with the local flux density, much faster with the perpendicular component,
+than with the parallel one. The anisotropic Kim model is used:
+
+    Ic(B_par, B_perp, T) = Ic0(T) / (1 + sqrt((k * B_par)^2 + B_perp^2) / B0)^alpha
+    Ic0(T) = Ic0 * ((Tc - T) / (Tc - T0))^n
+
+The model (or a measured table) is precomputed on a regular (|B_par|, |B_perp|) grid for the operating temperature, the
+grids are cached per tape type and temperature, and evaluated by linear interpolation over the FEM field samples.
+
+Reference: Y. B. Kim, C. F. Hempstead, A. R. Strnad, Critical Persistent Currents in Hard Superconductors,
+           Phys. Rev. Lett. 9, 306 (1962)
+"""
+
+
+class TapeParameters(typing.NamedTuple):
+    ic0: float = 170.0  # [A] self-field critical current at the reference temperature
+    t0: float = 77.0  # [K] reference temperature
+    tc: float = 108.0  # [K] critical temperature
+    n: float = 1.5  # exponent of the temperature dependence
+    b0: float = 0.04  # [T] characteristic field of the Kim model
+    k: float = 0.2  # anisotropy, the weight of the parallel field
+    alpha: float = 0.6  # exponent of the Kim model
+
+
+# typical parameters of the tapes, the BSCCO tape is the default tape of the loss calculations (Ic = 170 A)
+TAPES = {
+    "BSCCO": TapeParameters(),
+    "YBCO": TapeParameters(ic0=100.0, tc=92.0, n=1.3, b0=0.1, k=0.1, alpha=0.75),
+}
+
+
+def kim_critical_current(b_par, b_perp, temperature: float = 77.0, tape: TapeParameters = TAPES["BSCCO"]):
+    """
+    Anisotropic Kim model of the critical current, the function accepts numpy arrays.
+
+    :param b_par: parallel flux density [T]
+    :param b_perp: perpendicular flux density [T]
+    :param temperature: operating temperature [K]
+    :param tape: parameters of the tape
+    :return: critical current [A], zero above the critical temperature
+    """
+    if temperature >= tape.tc:
+        return np.zeros(np.broadcast(b_par, b_perp).shape)[()]
+
+    ic0 = tape.ic0 * ((tape.tc - temperature) / (tape.tc - tape.t0)) ** tape.n
+    b_eff = np.hypot(tape.k * np.asarray(b_par, dtype=float), np.asarray(b_perp, dtype=float))
+    return ic0 / (1.0 + b_eff / tape.b0) ** tape.alpha
+
+
+class CriticalCurrentMap:
+    """
+    Critical current of a tape on a regular (|B_par|, |B_perp|) grid, at a given temperature.
+
+    The fields are clipped to the grid, therefore the grid should cover the fields of the windings.
+
+    :param b_par: increasing grid points of the parallel field [T]
+    :param b_perp: increasing grid points of the perpendicular field [T]
+    :param ic: critical currents on the grid, with (len(b_par), len(b_perp)) shape [A]
+    """
+
+    def __init__(self, b_par, b_perp, ic):
+        self.b_par = np.asarray(b_par, dtype=float)
+        self.b_perp = np.asarray(b_perp, dtype=float)
+        self.ic = np.asarray(ic, dtype=float)
+
+        if self.ic.shape != (self.b_par.shape[0], self.b_perp.shape[0]):
+            raise ValueError("the shape of the critical current table should be (len(b_par), len(b_perp))")
+
+        if np.any(np.diff(self.b_par) <= 0.0) or np.any(np.diff(self.b_perp) <= 0.0):
+            raise ValueError("the grid points should be increasing")
+
+        # the cells of the equidistant grids are indexed without search
+        self._steps = tuple(_step(grid) for grid in (self.b_par, self.b_perp))
+
+    @classmethod
+    def from_model(cls, temperature: float = 77.0, tape: TapeParameters = TAPES["BSCCO"], b_max: float = 1.0,
+                   n: int = 201) -> "CriticalCurrentMap":
+        """Precomputes the Kim model on an n x n grid up to b_max [T]."""
+        b = np.linspace(0.0, b_max, n)
+        return cls(b, b, kim_critical_current(b[:, None], b[None, :], temperature, tape))
+
+    def __call__(self, b_par, b_perp):
+        """Interpolated critical current [A] of the parallel and perpendicular fields, the sign is neglected."""
+        i, u = _cell(self.b_par, self._steps[0], np.abs(np.asarray(b_par, dtype=float)))
+        j, v = _cell(self.b_perp, self._steps[1], np.abs(np.asarray(b_perp, dtype=float)))
+
+        # bilinear interpolation in the cells of the grid
+        ic = self.ic
+        return ((1.0 - u) * ((1.0 - v) * ic[i, j] + v * ic[i, j + 1]) +
+                u * ((1.0 - v) * ic[i + 1, j] + v * ic[i + 1, j + 1]))[()]
+
+
+def _step(grid: np.ndarray) -> typing.Optional[float]:
+    """the step of an equidistant grid, None otherwise"""
+    step = (grid[-1] - grid[0]) / (grid.shape[0] - 1)
+    return step if np.allclose(np.diff(grid), step, rtol=1e-9, atol=0.0) else None
+
+
+def _cell(grid: np.ndarray, step: typing.Optional[float], x: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """the index of the grid cell and the relative position in the cell, the values are clipped to the grid"""
+    x = np.clip(x, grid[0], grid[-1])
+    if step is None:
+        i = np.clip(np.searchsorted(grid, x, side="right") - 1, 0, grid.shape[0] - 2)
+        return i, (x - grid[i]) / (grid[i + 1] - grid[i])
+
+    u = (x - grid[0]) / step
+    i = np.minimum(u.astype(np.intp), grid.shape[0] - 2)
+    return i, u - i
+
+
+@lru_cache(maxsize=32)
+def critical_current_map(tape: str = "BSCCO", temperature: float = 77.0, b_max: float = 1.0,
+                         n: int = 201) -> CriticalCurrentMap:
+    """Cached critical current map of the tape type (TAPES) at the operating temperature."""
+    try:
+        parameters = TAPES[tape]
+    except KeyError:
+        raise KeyError("unknown tape: {}, available: {}".format(tape, ", ".join(TAPES))) from None
+
+    return CriticalCurrentMap.from_model(temperature, parameters, b_max, n)
+
+
+class LocalCriticalState(typing.NamedTuple):
+    ic: np.ndarray  # [A] local critical current
+    margin: np.ndarray  # 1 - I / Ic, negative if the current exceeds the local critical current
+    self_field: np.ndarray  # [W/m] self-field (Norris) loss with the local critical current, nan if I >= Ic
+
+
+def local_critical_state(b_ax, b_rad, f: float, I: float, ic_map: CriticalCurrentMap) -> LocalCriticalState:
+    """
+    Evaluates the local critical current, the current margin and the self-field loss in the field samples.
+
+    :param b_ax: axial (parallel) flux density in the sample points [T]
+    :param b_rad: radial (perpendicular) flux density in the sample points [T]
+    :param f: frequency
+    :param I: current of the tape [A]
+    :param ic_map: critical current map of the tape at the operating temperature
+    """
+    ic = ic_map(b_ax, b_rad)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        margin = 1.0 - I / ic
+        self_field = np.where(margin > 0.0, norris_equation(f, I, ic), np.nan)
+
+    return LocalCriticalState(ic, margin, self_field)
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import typing
+
+from importlib_resources import files
+
+from src.models import TransformerDesign
+from src.serialization import DESIGN_CODEC
+
+"""
+Library of the transformer ratings.
+
+The bundled ratings (data/*.json) and the user supplied rating files are discovered once, then every file is parsed and
+validated only at the first use. The parsed designs are cached on the module level by the path of the file, the cache
+is invalidated if the modification time and the content hash of the file are changed. The library gives back new
+TransformerDesign objects from the cached flat tuples, which is much faster than the parsing of the files.
+
+The user supplied directories or files can be given in the TRAFOCALC_DESIGN_PATH environment variable too, separated
+by os.pathsep.
+"""
+
+ENV_PATH = "TRAFOCALC_DESIGN_PATH"
+
+
+class _CacheEntry(typing.NamedTuple):
+    mtime_ns: int
+    size: int
+    digest: str
+    values: tuple  # flat tuple of the TransformerDesign
+
+
+_CACHE: typing.Dict[str, _CacheEntry] = {}
+
+
+def validate_design(design: TransformerDesign) -> TransformerDesign:
+    """
+    Checks the technical parameters of a rating.
+
+    :raises ValueError: with the list of the invalid parameters
+    """
+    req = design.required
+    errors = []
+
+    for name in ("power", "freq", "sci_req", "ei", "alpha"):
+        if not getattr(req, name) > 0:
+            errors.append("required.{} should be positive".format(name))
+
+    for name in ("drop_tol", "min_main_gap", "min_core_gap", "phase_distance"):
+        if getattr(req, name) < 0:
+            errors.append("required.{} should not be negative".format(name))
+
+    if not 0 < req.core_fillingf <= 100:
+        errors.append("required.core_fillingf should be in (0, 100] %")
+
+    for name in ("hv", "lv"):
+        winding = getattr(req, name)
+        if str(winding.connection).lower() not in ("y", "d"):
+            errors.append("required.{}.connection should be 'y' or 'd'".format(name))
+        if not winding.line_voltage > 0:
+            errors.append("required.{}.line_voltage should be positive".format(name))
+        if not 0 < winding.filling_factor <= 100:
+            errors.append("required.{}.filling_factor should be in (0, 100] %".format(name))
+
+    for name in ("rc", "bc", "j_in", "j_ou", "h_in", "m_gap"):
+        if not getattr(design.design_params, name) > 0:
+            errors.append("design_params.{} should be positive".format(name))
+
+    if errors:
+        raise ValueError("invalid design '{}': {}".format(design.description, "; ".join(errors)))
+
+    return design
+
+
+def _load(path: str) -> tuple:
+    """Parses and validates a rating file, the result is cached by the modification time and the hash."""
+    stat = os.stat(path)
+    entry = _CACHE.get(path)
+    if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+        return entry.values
+
+    with open(path, "rb") as json_file:
+        content = json_file.read()
+    digest = hashlib.sha1(content).hexdigest()
+
+    if entry is not None and entry.digest == digest:
+        values = entry.values
+    else:
+        design = validate_design(TransformerDesign.from_dict(json.loads(content)))
+        values = DESIGN_CODEC.to_tuple(design)
+
+    _CACHE[path] = _CacheEntry(stat.st_mtime_ns, stat.st_size, digest, values)
+    return values
+
+
+def clear_cache():
+    _CACHE.clear()
+
+
+class DesignLibrary:
+    """
+    Collection of the available rating files.
+
+    :param paths: user supplied rating files or directories of *.json rating files
+    :param bundled: if True, the ratings of the data package are included
+    """
+
+    def __init__(self, paths: typing.Iterable[typing.Union[str, os.PathLike]] = (), bundled: bool = True):
+        self.sources = []
+        if bundled:
+            self.sources.append(os.fspath(files("data")))
+        self.sources += [path for path in os.environ.get(ENV_PATH, "").split(os.pathsep) if path]
+        self.sources += [os.fspath(path) for path in paths]
+
+        self._paths = None
+
+    @property
+    def paths(self) -> typing.Dict[str, str]:
+        """rating name (file name without extension) -> path, the later sources override the earlier ones"""
+        if self._paths is None:
+            self._paths = {}
+            for source in self.sources:
+                if os.path.isdir(source):
+                    candidates = sorted(os.path.join(source, name) for name in os.listdir(source))
+                else:
+                    candidates = [source]
+
+                for path in candidates:
+                    if path.endswith(".json") and os.path.isfile(path):
+                        self._paths[os.path.splitext(os.path.basename(path))[0]] = os.path.abspath(path)
+
+        return self._paths
+
+    def names(self) -> typing.List[str]:
+        return list(self.paths)
+
+    def __contains__(self, name):
+        return _stem(name) in self.paths
+
+    def __iter__(self):
+        return iter(self.paths)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def get(self, name: str) -> TransformerDesign:
+        """
+        Gives back a new TransformerDesign object of the rating, the file is parsed only at the first call.
+
+        :param name: the name of the rating, with or without the .json extension
+        """
+        try:
+            path = self.paths[_stem(name)]
+        except KeyError:
+            raise KeyError("unknown rating: {}, available: {}".format(name, ", ".join(self.names()))) from None
+
+        return DESIGN_CODEC.from_tuple(_load(path))
+
+    def items(self) -> typing.Iterator[typing.Tuple[str, TransformerDesign]]:
+        for name in self.paths:
+            yield name, self.get(name)
+
+
+def _stem(name: str) -> str:
+    return name[:-5] if name.endswith(".json") else name
+
+
+_DEFAULT = None
+
+
+def load_design(name: str) -> TransformerDesign:
+    """Loads a rating from the default library (bundled ratings and the TRAFOCALC_DESIGN_PATH)."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = DesignLibrary()
+    return _DEFAULT.get(name)
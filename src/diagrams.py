@@ -1,15 +1,33 @@
+import typing
+
 import numpy as np
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+
+"""
+Diagrams of the flux distributions and the evaluated designs.
+
+The plot_winding_flux function draws the short flux profiles of the FEM simulation. The dense field samples and the
+design clouds of the batch evaluations are reduced before the rendering:
+
+ - the lines are decimated by the min-max (keeps the peaks of every bin) or by the largest triangle three buckets
+   (LTTB, keeps the visual shape) algorithm,
+ - the scatter plots are aggregated on the pixel grid of the image (count, mean, min or max of a third variable).
 
+If a path is given, the figures are written into files without pyplot, so they can be used without display.
+"""
 
-def plot_winding_flux(fluxes: list, z_min, z_max, label='HV', dev=False):
+
+def plot_winding_flux(fluxes: list, z_min, z_max, label='HV', dev=False, path=None):
     """
     Plots the radial and axial flux along the windings
     :param fluxes: list of tuples which contains the (radial,axial) axial fluxes in the given points
     :param z_min: minimal axial position of the winding
     :param z_max: maximal axial position of the winding
+    :param path: if it is given, the figure is saved into this file instead of showing it
     :return:
     """
 
@@ -28,5 +46,221 @@ def plot_winding_flux(fluxes: list, z_min, z_max, label='HV', dev=False):
                  legend="full")
     axes[0].axhline(data["Radial Flux"].mean(), color='red',)
 
-    if not dev:
+    if path is not None:
+        fig.savefig(path)
+        plt.close(fig)
+    elif not dev:
+        plt.show()
+
+
+def min_max_decimate(x, y, n_bins: int = 1000) -> np.ndarray:
+    """
+    Indices of the points, which keep the minimum and the maximum of every bin of the sorted x values, the first
+    and the last points are kept too.
+
+    :param x: increasing x coordinates
+    :param y: y coordinates
+    :param n_bins: number of the equidistant bins, the result has at most 2 * n_bins + 2 points
+    :return: increasing indices of the selected points
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.shape[0] <= 2 * n_bins + 2:
+        return np.arange(x.shape[0])
+
+    # the bins are contiguous ranges of the sorted points
+    edges = np.searchsorted(x, np.linspace(x[0], x[-1], n_bins + 1)[1:-1])
+    starts = np.unique(np.concatenate(([0], edges)))
+    starts = starts[starts < x.shape[0]]
+    counts = np.diff(np.append(starts, x.shape[0]))
+
+    selected = [np.array([0, x.shape[0] - 1])]
+    for reduce in (np.minimum, np.maximum):
+        extremum = np.repeat(reduce.reduceat(y, starts), counts)
+        # the first position of the extremum in every bin
+        position = np.flatnonzero(y == extremum)
+        _, first = np.unique(np.searchsorted(starts, position, side="right"), return_index=True)
+        selected.append(position[first])
+
+    selected = np.concatenate(selected)
+    return np.unique(selected)
+
+
+def lttb(x, y, n_out: int = 1000) -> np.ndarray:
+    """
+    Largest triangle three buckets downsampling, it selects one point from every bucket, which forms the largest
+    triangle with the selected point of the previous bucket and the average of the next bucket.
+
+    Reference: S. Steinarsson, Downsampling Time Series for Visual Representation, MSc thesis, University of Iceland,
+               2013
+
+    :param x: increasing x coordinates
+    :param y: y coordinates
+    :param n_out: number of the selected points, at least 3
+    :return: increasing indices of the selected points
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.shape[0]
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # the first and the last points are kept, the others are divided into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    # the average points of the buckets, the last point is the next 'bucket' of the last bucket
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # double area of the triangles (a, point, average of the next bucket)
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def pixel_aggregate(x, y, values=None, bins: typing.Tuple[int, int] = (800, 600), extent=None,
+                    agg: str = "count") -> typing.Tuple[np.ndarray, tuple]:
+    """
+    Aggregates a point cloud on a pixel grid.
+
+    :param x: x coordinates of the points
+    :param y: y coordinates of the points
+    :param values: the aggregated values of the points, it is not used by the 'count' aggregation
+    :param bins: number of the (x, y) pixels
+    :param extent: (x_min, x_max, y_min, y_max), the range of the points by default
+    :param agg: 'count', 'mean', 'min' or 'max'
+    :return: (y pixels, x pixels) image, the empty pixels are nan except in the count image, and the extent
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    if extent is None:
+        extent = (np.nanmin(x), np.nanmax(x), np.nanmin(y), np.nanmax(y))
+    nx, ny = bins
+
+    ix = _pixel_index(x, extent[0], extent[1], nx)
+    iy = _pixel_index(y, extent[2], extent[3], ny)
+    inside = (ix >= 0) & (iy >= 0)
+    pixel = iy * nx + ix
+    if not np.all(inside):
+        pixel = pixel[inside]
+
+    count = np.bincount(pixel, minlength=nx * ny)
+    if agg == "count":
+        return count.reshape(ny, nx).astype(float), extent
+
+    values = np.asarray(values, dtype=float).ravel()
+    if not np.all(inside):
+        values = values[inside]
+
+    if agg == "mean":
+        with np.errstate(invalid="ignore", divide="ignore"):
+            image = np.bincount(pixel, weights=values, minlength=nx * ny) / count
+    elif agg in ("min", "max"):
+        ufunc = np.minimum if agg == "min" else np.maximum
+        image = np.full(nx * ny, np.inf if agg == "min" else -np.inf)
+        ufunc.at(image, pixel, values)
+        image[count == 0] = np.nan
+    else:
+        raise ValueError("unknown aggregation: {}".format(agg))
+
+    return image.reshape(ny, nx), extent
+
+
+def _pixel_index(v: np.ndarray, lower: float, upper: float, n: int) -> np.ndarray:
+    """pixel index of the values, -1 outside of the range"""
+    scale = n / (upper - lower) if upper > lower else 0.0
+    index = ((v - lower) * scale).astype(np.intp)
+    # the upper bound belongs to the last pixel
+    index[v == upper] = n - 1
+    index[(v < lower) | (v > upper) | np.isnan(v)] = -1
+    return index
+
+
+def _finish(fig, path):
+    if path is None:
         plt.show()
+    else:
+        fig.savefig(path)
+
+
+def _figure(path, **kwargs):
+    # the figures are not registered in pyplot if they are written into files
+    return plt.figure(**kwargs) if path is None else Figure(**kwargs)
+
+
+def plot_flux_profile(z, b_ax, b_rad, label: str = "HV", path=None, max_points: int = 2000, method: str = "minmax"):
+    """
+    Plots dense axial and radial flux density profiles along a winding.
+
+    :param z: increasing axial positions [mm]
+    :param b_ax: axial flux densities [T]
+    :param b_rad: radial flux densities [T]
+    :param label: name of the winding
+    :param path: the figure is saved into this file, it is shown if it is None
+    :param max_points: approximate number of the drawn points of a line
+    :param method: 'minmax' or 'lttb' decimation
+    :return: the figure
+    """
+    z = np.asarray(z, dtype=float)
+    fig = _figure(path)
+    axes = fig.subplots(2, 1, sharex=True)
+    fig.suptitle("Flux distribution in {} winding".format(label))
+
+    for ax, b, name in ((axes[0], b_rad, "Radial Flux"), (axes[1], b_ax, "Axial Flux")):
+        b = np.asarray(b, dtype=float)
+        index = min_max_decimate(z, b, max_points // 2) if method == "minmax" else lttb(z, b, max_points)
+        ax.plot(z[index], b[index], linewidth=1.5)
+        ax.axhline(np.mean(b), color="red")
+        ax.set_ylabel("{} [T]".format(name))
+        ax.grid(True)
+
+    axes[1].set_xlabel("z [mm]")
+    _finish(fig, path)
+    return fig
+
+
+def plot_design_space(x, y, values=None, agg: str = "count", bins: typing.Tuple[int, int] = (800, 600),
+                      extent=None, xlabel: str = "sci [%]", ylabel: str = "load loss [kW]", clabel: str = None,
+                      path=None):
+    """
+    Plots a design cloud (e.g. cost vs. sci vs. losses) aggregated on the pixel grid.
+
+    :param x: x coordinates of the designs
+    :param y: y coordinates of the designs
+    :param values: the colored values (e.g. the capitalized cost), the number of the designs is colored without
+    :param agg: 'count', 'mean', 'min' or 'max' aggregation of the values in the pixels
+    :param bins: number of the (x, y) pixels
+    :param extent: (x_min, x_max, y_min, y_max), the range of the designs by default
+    :param path: the figure is saved into this file, it is shown if it is None
+    :return: the figure
+    """
+    if values is None:
+        agg = "count"
+    image, extent = pixel_aggregate(x, y, values, bins, extent, agg)
+
+    fig = _figure(path, figsize=(bins[0] / 100.0 + 2.0, bins[1] / 100.0 + 1.0))
+    ax = fig.subplots()
+    if agg == "count":
+        image[image == 0] = np.nan
+        norm = LogNorm()
+    else:
+        norm = None
+
+    mappable = ax.imshow(image, origin="lower", extent=extent, aspect="auto", interpolation="nearest", norm=norm,
+                         cmap="mako_r" if agg == "count" else "viridis")
+    fig.colorbar(mappable, ax=ax, label=clabel or agg)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+
+    _finish(fig, path)
+    return fig
@@ -0,0 +1,130 @@
+import time
+import typing
+
+"""
+Fidelity levels of the FEM model and their calibration.
+
+The discretization of the FemModel is given by a fidelity level: the number of the uniform mesh refinements, the
+polynomial order of the elements and the adaptivity of agros. The named presets are
+
+    screening      coarse mesh, linear elements, for the fast checks of many candidates
+    standard       the former fixed setting of the model (1 refinement, 2nd order)
+    verification   refined mesh, 3rd order elements with hp-adaptivity, for the final designs
+
+The calibration runs a convergence study on a rating: every level is solved and compared with the reference level
+(the most accurate one), the cheapest level is selected, where the errors of the short-circuit impedance and of the
+peak flux densities in the windings are within the tolerances. The simulation is given by the evaluate function, by
+default the FEM simulation of the TwoWindingModel, which needs the agrossuite package.
+"""
+
+
+class FemFidelity(typing.NamedTuple):
+    number_of_refinements: int
+    polynomial_order: int
+    adaptivity_type: str = "disabled"  # disabled, h-adaptivity, p-adaptivity or hp-adaptivity
+    adaptivity_steps: int = 0
+    adaptivity_tolerance: float = 0.0  # [%]
+
+
+FIDELITY_LEVELS = {
+    "screening": FemFidelity(0, 1),
+    "standard": FemFidelity(1, 2),
+    "verification": FemFidelity(2, 3, "hp-adaptivity", 10, 0.5),
+}
+# the fine reference solution of the calibration
+REFERENCE_FIDELITY = FemFidelity(3, 4, "hp-adaptivity", 20, 0.05)
+
+
+def get_fidelity(fidelity: typing.Union[str, FemFidelity]) -> FemFidelity:
+    """gives back the preset of a named fidelity level, or the given setting"""
+    if isinstance(fidelity, FemFidelity):
+        return fidelity
+    try:
+        return FIDELITY_LEVELS[fidelity]
+    except KeyError:
+        raise ValueError("unknown fidelity level: {}, it should be one of {}".format(
+            fidelity, ", ".join(FIDELITY_LEVELS))) from None
+
+
+class FemOutput(typing.NamedTuple):
+    sci: float  # [%] FEM based short-circuit impedance
+    peak_axial: float  # [mT] peak axial flux density in the windings
+    peak_radial: float  # [mT] peak radial flux density in the windings
+
+
+class LevelReport(typing.NamedTuple):
+    name: str
+    fidelity: FemFidelity
+    time: float  # [s] time of the simulation
+    output: FemOutput
+    sci_error: float  # [%] relative error of the impedance
+    flux_error: float  # [%] the larger relative error of the peak axial and radial flux densities
+    accepted: bool
+
+
+class Calibration(typing.NamedTuple):
+    levels: typing.List[LevelReport]
+    reference: LevelReport
+    selected: typing.Optional[str]  # the cheapest accepted level, None if none of the levels is accurate enough
+
+    def report(self) -> str:
+        lines = ["{:<14}{:>10}{:>13}{:>14}{:>10}".format("level", "time [s]", "sci err [%]", "flux err [%]", "accepted")]
+        for level in self.levels + [self.reference]:
+            lines.append("{:<14}{:>10.2f}{:>13.3f}{:>14.3f}{:>10}".format(level.name, level.time, level.sci_error,
+                                                                           level.flux_error, str(level.accepted)))
+        lines.append("selected: {}".format(self.selected))
+        return "\n".join(lines)
+
+
+def fem_output(design, fidelity: typing.Union[str, FemFidelity] = "standard") -> FemOutput:
+    """the FEM simulation of a rating by the TwoWindingModel"""
+    from src.models import MainResults
+    from src.two_winding_model import TwoWindingModel
+
+    model = TwoWindingModel(input=design, results=MainResults())
+    model.calculate()
+    model.fem_simulation(detailed_output=False, fidelity=fidelity)
+    res = model.results
+    # the peak values of the windings are stored by the model
+    return FemOutput(res.fem_based_sci, max(res.fem_bax_hv, res.fem_bax_lv), max(res.fem_brad_hv, res.fem_brad_lv))
+
+
+def _relative_error(value: float, reference: float) -> float:
+    return abs(value - reference) / abs(reference) * 100.0 if reference else abs(value) * 100.0
+
+
+def calibrate(design, sci_tolerance: float = 1.0, flux_tolerance: float = 2.0,
+              levels: typing.Mapping[str, FemFidelity] = None, reference: FemFidelity = REFERENCE_FIDELITY,
+              evaluate: typing.Callable[[typing.Any, FemFidelity], FemOutput] = fem_output) -> Calibration:
+    """
+    Convergence study of the fidelity levels on a rating.
+
+    :param design: the rating (TransformerDesign)
+    :param sci_tolerance: allowed relative error of the short-circuit impedance [%]
+    :param flux_tolerance: allowed relative error of the peak axial and radial flux densities [%]
+    :param levels: the compared levels in the order of their costs, the presets by default
+    :param reference: the fidelity of the reference solution
+    :param evaluate: simulates the design with the given fidelity
+    """
+    levels = FIDELITY_LEVELS if levels is None else levels
+
+    def run(fidelity: FemFidelity) -> typing.Tuple[float, FemOutput]:
+        start = time.perf_counter()
+        output = evaluate(design, fidelity)
+        return time.perf_counter() - start, output
+
+    runs = {name: run(fidelity) for name, fidelity in levels.items()}
+    reference_time, exact = run(reference)
+
+    reports = []
+    for name, (duration, output) in runs.items():
+        fidelity = levels[name]
+        sci_error = _relative_error(output.sci, exact.sci)
+        flux_error = max(_relative_error(output.peak_axial, exact.peak_axial),
+                         _relative_error(output.peak_radial, exact.peak_radial))
+        reports.append(LevelReport(name, fidelity, duration, output, sci_error, flux_error,
+                                   sci_error <= sci_tolerance and flux_error <= flux_tolerance))
+
+    accepted = [report for report in reports if report.accepted]
+    selected = min(accepted, key=lambda report: report.time).name if accepted else None
+    return Calibration(reports, LevelReport("reference", reference, reference_time, exact, 0.0, 0.0, True), selected)
@@ -0,0 +1,64 @@
+import typing
+
+"""
+Mid-plane symmetry of the FEM model.
+
+If every winding is centred in the core window, the axisymmetric field is symmetric to the horizontal mid-plane of
+the window: the axial flux density is even, the radial one is odd, so the flux lines cross the plane perpendicularly.
+In this case only the lower half of the window is modelled, with a zero surface current (Neumann) boundary condition
+on the mid-plane, which halves the number of the degrees of freedom.
+
+The solution of the half model is wrapped by the MirroredSolution, which gives back the field of the whole window:
+the points above the plane are mirrored, and the volume integrals are doubled, so the consumers of the solution
+(impedance, field samples, loss and force integrals) can use the coordinates of the full model.
+"""
+
+# the radial vector components of the local values, which change sign in the mirrored points
+RADIAL_COMPONENTS = ("Brr", "Hrr")
+
+
+def midplane(window_y0: float, window_height: float, windings: typing.Iterable[typing.Tuple[float, float]],
+             tolerance: float = 1e-6) -> typing.Optional[float]:
+    """
+    :param window_y0: axial coordinate of the bottom of the window [mm]
+    :param window_height: height of the window [mm]
+    :param windings: axial coordinates of the bottom and the heights of the windings [mm]
+    :param tolerance: allowed offset of the centres of the windings [mm]
+    :return: the axial coordinate of the symmetry plane [mm], or None if the windings are not centred
+    """
+    plane = window_y0 + window_height / 2.0
+    if all(abs(z0 + height / 2.0 - plane) <= tolerance for z0, height in windings):
+        return plane
+    return None
+
+
+class MirroredSolution:
+    """
+    The solution of the half model in the coordinates of the whole window.
+
+    The volume integrals are doubled, which is valid for the even quantities (energy, losses, volume, currents), the
+    odd ones, e.g. the axial forces, are cancelled in the whole model.
+
+    :param solution: magnetic solution of the half model, with local_values(r, z) in [m]
+    :param plane: axial coordinate of the symmetry plane [mm]
+    """
+
+    def __init__(self, solution, plane: float):
+        self.solution = solution
+        self.plane = plane * 1e-3
+
+    def local_values(self, r: float, z: float) -> dict:
+        if z <= self.plane:
+            return self.solution.local_values(r, z)
+
+        values = dict(self.solution.local_values(r, 2.0 * self.plane - z))
+        for name in RADIAL_COMPONENTS:
+            if name in values:
+                values[name] = -values[name]
+        return values
+
+    def volume_integrals(self, *args, **kwargs) -> dict:
+        return {name: 2.0 * value for name, value in self.solution.volume_integrals(*args, **kwargs).items()}
+
+    def __getattr__(self, name):
+        return getattr(self.solution, name)
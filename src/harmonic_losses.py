@@ -0,0 +1,142 @@
+import typing
+
+import numpy as np
+from numpy import pi
+from scipy.constants import mu_0
+
+from src.short_circuit_forces import WindingCells, WindingSpec, filament_cell_fields
+
+"""
+Harmonic eddy losses of the windings.
+
+The load current of a converter or rectifier transformer contains harmonics, every harmonic order h induces eddy
+currents in the conductors with its own frequency h * f. The stray field of the windings does not depend on the
+frequency: the windings are stranded, their currents are imposed, the core is linear and the other parts are
+non-conducting in the model, so the field of every harmonic is the field of the nominal current scaled by the current
+ratio I_h / I_1. Therefore the frequency sweep does not need a new FEM (or filament) solution per frequency: the field
+is solved and sampled once in the cells of the windings, and the losses of every harmonic order are evaluated in one
+vectorized (n_orders x n_cells) operation.
+
+The eddy loss density of a rectangular conductor in a parallel field is given by the field penetration of a strip
+of thickness d (the dimension perpendicular to the field), with the skin depth delta = sqrt(2 / (omega mu0 sigma)):
+
+    p = sigma omega^2 B^2 d^2 / 12 * G(xi),    G(xi) = 6 / xi^3 * (sinh xi - sin xi) / (cosh xi + cos xi),  xi = d / delta
+
+where B is the rms flux density, and G -> 1 for thin conductors, which gives the classical h^2 scaling of the
+harmonic loss factor. The axial field acts on the radial thickness, the radial field on the axial height of the
+conductors. The harmonic loss factor of IEEE C57.110 / IEC 61378 is the ratio of the eddy losses of the distorted
+current and the eddy loss of the fundamental current with the same rms value:
+
+    F_HL = sum_h P_h / (P_1 * sum_h (I_h / I_1)^2)
+
+The losses are in [kW] for the three phases, as in the WindingDesign.
+"""
+
+COPPER_CONDUCTIVITY = 46.3e6  # [S/m] at 75 C
+HARMONIC_ORDERS = np.arange(1, 51)
+
+
+def skin_depth(f, sigma: float = COPPER_CONDUCTIVITY):
+    """[mm] skin depth of the conductor at the frequency f [Hz]"""
+    return np.sqrt(2.0 / (2.0 * pi * np.asarray(f, dtype=float) * mu_0 * sigma)) * 1e3
+
+
+def strip_eddy_factor(xi):
+    """G(xi), the ratio of the eddy loss of a strip and its low frequency (thin conductor) limit"""
+    xi = np.asarray(xi, dtype=float)
+    # the thin strips are evaluated by the limit, the difference of the exact expression is cancelled numerically
+    thin = xi < 1e-3
+    x = np.where(thin, 1.0, xi)
+    factor = 6.0 / x ** 3 * (np.sinh(x) - np.sin(x)) / (np.cosh(x) + np.cos(x))
+    return np.where(thin, 1.0, factor)
+
+
+def eddy_loss_density(b, thickness: float, f, sigma: float = COPPER_CONDUCTIVITY):
+    """
+    :param b: rms flux density parallel to the strip [T]
+    :param thickness: dimension of the conductor perpendicular to the field [mm]
+    :param f: frequency [Hz], the parameters are broadcasted
+    :return: eddy loss density in the conductor [W/m3]
+    """
+    f = np.asarray(f, dtype=float)
+    omega = 2.0 * pi * f
+    return sigma * omega ** 2 * np.square(b) * (thickness * 1e-3) ** 2 / 12.0 * \
+        strip_eddy_factor(thickness / skin_depth(f, sigma))
+
+
+def six_pulse_spectrum(orders=HARMONIC_ORDERS, pulses: int = 6) -> np.ndarray:
+    """
+    Theoretical current spectrum of a p-pulse rectifier: I_h / I_1 = 1 / h for the characteristic orders h = k p +- 1,
+    the other orders are zero.
+    """
+    orders = np.asarray(orders)
+    return np.where(np.abs((orders + 1) % pulses - 1) == 1, 1.0 / orders, 0.0)
+
+
+class HarmonicLosses(typing.NamedTuple):
+    orders: np.ndarray  # harmonic orders, the first one is the fundamental
+    current_ratios: np.ndarray  # I_h / I_1
+    unit_eddy: np.ndarray  # [kW] eddy losses of the orders with the nominal current (I_h / I_1 = 1)
+    dc_loss: float  # [kW] dc loss of the nominal current
+
+    @property
+    def eddy(self) -> np.ndarray:
+        """[kW] eddy losses of the harmonic currents"""
+        return np.square(self.current_ratios) * self.unit_eddy
+
+    @property
+    def load_loss(self) -> float:
+        """[kW] dc and eddy losses of the distorted current"""
+        return float(self.dc_loss * np.sum(np.square(self.current_ratios)) + np.sum(self.eddy))
+
+    @property
+    def loss_factor(self) -> float:
+        """F_HL, the harmonic loss factor of the eddy losses"""
+        return float(np.sum(self.eddy) / (self.unit_eddy[0] * np.sum(np.square(self.current_ratios))))
+
+
+def winding_harmonics(cells: WindingCells, b_ax, b_rad, filling_factor: float, dc_loss: float, freq: float,
+                      orders=HARMONIC_ORDERS, current_ratios=None, conductor_thickness: float = 2.5,
+                      conductor_height: float = 10.0, sigma: float = COPPER_CONDUCTIVITY) -> HarmonicLosses:
+    """
+    Eddy losses of the harmonic orders in a winding.
+
+    :param cells: cells of one phase of the winding
+    :param b_ax: axial flux densities of the nominal current in the cells [T, rms]
+    :param b_rad: radial flux densities in the cells [T, rms]
+    :param filling_factor: conductor filling factor of the winding
+    :param dc_loss: dc loss of the winding in the three phases [kW]
+    :param freq: fundamental frequency [Hz]
+    :param orders: harmonic orders, starting with the fundamental
+    :param current_ratios: I_h / I_1 of the orders, the six_pulse_spectrum by default
+    :param conductor_thickness: radial dimension of the conductors [mm]
+    :param conductor_height: axial dimension of the conductors [mm]
+    """
+    orders = np.asarray(orders)
+    if orders[0] != 1:
+        raise ValueError("The first harmonic order should be the fundamental.")
+    current_ratios = six_pulse_spectrum(orders) if current_ratios is None else np.asarray(current_ratios, dtype=float)
+
+    # (n_orders, n_cells), the cells are weighted by their conductor volume
+    f = orders[:, np.newaxis] * freq
+    density = eddy_loss_density(np.asarray(b_ax)[np.newaxis, :], conductor_thickness, f, sigma) + \
+        eddy_loss_density(np.asarray(b_rad)[np.newaxis, :], conductor_height, f, sigma)
+    unit_eddy = 3.0 * density @ (cells.volume * filling_factor) * 1e-3
+
+    return HarmonicLosses(orders, current_ratios, unit_eddy, dc_loss)
+
+
+def two_winding_harmonics(inner: WindingSpec, outer: WindingSpec, window_height: float, dc_losses: typing.Sequence[float],
+                          freq: float, orders=HARMONIC_ORDERS, current_ratios=None, n_sections: int = 20, n_r: int = 5,
+                          n_z: int = 2, **kwargs) -> typing.Tuple[HarmonicLosses, HarmonicLosses]:
+    """
+    Harmonic eddy losses of the inner (lv) and the outer (hv) winding of a core window in the field of the ring
+    filament model, the keyword arguments are passed to winding_harmonics.
+
+    :param dc_losses: dc losses of the inner and the outer winding in the three phases [kW]
+    """
+    fields = filament_cell_fields((inner, outer), window_height, n_sections=n_sections, n_r=n_r, n_z=n_z)
+    lv, hv = [winding_harmonics(cells, b_z, b_r, winding.filling_factor, dc_loss, freq, orders, current_ratios,
+                                **kwargs)
+              for winding, (cells, b_r, b_z), dc_loss in zip((inner, outer), fields, dc_losses)]
+    return lv, hv
@@ -0,0 +1,201 @@
+import cProfile
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+import typing
+from contextlib import contextmanager
+
+"""
+Light-weight instrumentation of the model evaluations.
+
+The models mark their stages by named spans and count the expensive operations (e.g. field point queries, solver
+calls). The measurements are recorded only inside of a collect() block, otherwise the spans and the counters cost
+only a function call:
+
+    with collect(sinks=[JsonLinesSink("metrics.jsonl")]) as metrics:
+        model.calculate()
+        model.fem_simulation()
+
+    print(metrics.durations())   # total time of the stages
+    print(metrics.counters)      # {'fem.field_points': 5334, 'fem.solve': 1, ...}
+
+The events (finished spans, results of the models and the counters at the end of the block) are given to the sinks,
+which are callables of one dictionary, e.g. JsonLinesSink writes them into a JSON lines file. cProfile and tracemalloc
+can be enabled for the block too.
+"""
+
+
+class Metrics:
+    """The measurements of a collect() block."""
+
+    def __init__(self):
+        self.spans: typing.List[typing.Tuple[str, float]] = []  # (name, duration [s]) in the order of finishing
+        self.counters: typing.Dict[str, float] = {}
+        self.events: typing.List[dict] = []  # the results recorded by the models
+        self.profile: typing.Optional[pstats.Stats] = None
+        self.memory: typing.Optional[typing.Tuple[int, int]] = None  # (current, peak) traced memory [bytes]
+
+    def durations(self) -> typing.Dict[str, float]:
+        """total duration [s] of the spans by name"""
+        totals = {}
+        for name, duration in self.spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+
+class JsonLinesSink:
+    """Appends the events into a JSON lines file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, event: dict):
+        with open(self.path, "a") as jsonl:
+            jsonl.write(json.dumps(event, default=float) + "\n")
+
+
+class _State(threading.local):
+    def __init__(self):
+        self.metrics = None  # the Metrics of the active collect() block
+        self.sinks = ()
+        self.stack = []  # names of the open spans
+
+
+_STATE = _State()
+
+
+def enabled() -> bool:
+    return _STATE.metrics is not None
+
+
+def _emit(event: dict):
+    for sink in _STATE.sinks:
+        sink(event)
+
+
+@contextmanager
+def span(name: str):
+    """Measures the duration of a stage, the name of the nested spans are prefixed by the names of the outer ones."""
+    if _STATE.metrics is None:
+        yield
+        return
+
+    full_name = "/".join(_STATE.stack + [name])
+    _STATE.stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        _STATE.stack.pop()
+        if _STATE.metrics is not None:
+            _STATE.metrics.spans.append((full_name, duration))
+            _emit({"type": "span", "name": full_name, "duration": duration})
+
+
+class _Stages:
+    """consecutive stages of a span, a call closes the current stage and opens the next one"""
+
+    def __init__(self):
+        self._current = None
+
+    def __call__(self, name: str):
+        self.close()
+        if _STATE.metrics is not None:
+            self._current = span(name)
+            self._current.__enter__()
+
+    def close(self):
+        if self._current is not None:
+            current, self._current = self._current, None
+            current.__exit__(None, None, None)
+
+
+class _NoStages:
+    def __call__(self, name: str):
+        pass
+
+
+_NO_STAGES = _NoStages()
+
+
+@contextmanager
+def stages(name: str):
+    """
+    Span of consecutive stages, the long functions can be divided into stages without nested blocks:
+
+        with stages("calculate") as stage:
+            stage("windings")
+            ...
+            stage("core")
+            ...
+    """
+    if _STATE.metrics is None:
+        yield _NO_STAGES
+        return
+
+    with span(name):
+        current = _Stages()
+        try:
+            yield current
+        finally:
+            current.close()
+
+
+def count(name: str, value: float = 1):
+    """Increases a counter, the counters are summarized at the end of the collect() block."""
+    metrics = _STATE.metrics
+    if metrics is not None:
+        metrics.counters[name] = metrics.counters.get(name, 0) + value
+
+
+def record(name: str, **values):
+    """Records the results of a stage, e.g. the fem based short circuit impedance."""
+    metrics = _STATE.metrics
+    if metrics is not None:
+        event = {"type": "record", "name": name, "values": values}
+        metrics.events.append(event)
+        _emit(event)
+
+
+@contextmanager
+def collect(sinks: typing.Sequence[typing.Callable[[dict], typing.Any]] = (), profile: bool = False,
+            trace_memory: bool = False) -> typing.Iterator[Metrics]:
+    """
+    Records the spans, counters and results of the models in the block.
+
+    :param sinks: callables, which get the events as dictionaries
+    :param profile: if True, the block is profiled by cProfile, the statistics are in Metrics.profile
+    :param trace_memory: if True, the memory allocations are traced, the (current, peak) memory is in Metrics.memory
+    """
+    if _STATE.metrics is not None:
+        raise RuntimeError("the collect() blocks cannot be nested")
+
+    metrics = Metrics()
+    _STATE.metrics = metrics
+    _STATE.sinks = tuple(sinks)
+    _STATE.stack = []
+
+    profiler = cProfile.Profile() if profile else None
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        yield metrics
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            metrics.profile = pstats.Stats(profiler)
+        if trace_memory:
+            metrics.memory = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+        _emit({"type": "counters", "values": dict(metrics.counters)})
+        _STATE.metrics = None
+        _STATE.sinks = ()
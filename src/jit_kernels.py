@@ -0,0 +1,392 @@
+import math
+import typing
+
+import numpy as np
+from scipy.constants import mu_0, pi
+
+from src.base_functions import C_RHO, C_RHO_BSSCO, C_RHO_CU, C_RHO_FE, PRECISION
+from src.batch_model import C_WIN_MIN, CORE_BF, COST_VARIABLES, DESIGN_VARIABLES, SC_WIN_MIN, TAPE_AREA, TAPE_WIDTH, \
+    evaluate_population, evaluate_sc_population, population_inputs
+from src.models import TransformerDesign
+from src.superconductor_losses import thermal_incomes
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+"""
+Scalar kernels of the two winding model with an optional numba backend.
+
+The functions of base_functions, analytical_flux and superconductor_losses accept numpy arrays, which makes them slow
+for a single design: every call goes through the numpy machinery. The kernels of this module are the same formulas on
+python floats with the math module, they are compiled by numba (nopython mode) if it is installed, otherwise they are
+plain python functions. The results are the same as the results of the original functions, the rounding follows the
+rounding of numpy (round half to even of the scaled value), with the same decimals: the kernels use the shared
+constants of base_functions (PRECISION and the material constants), and the parity with the reference functions is
+checked by the tests for both backends.
+
+calculate_population evaluates a population of designs in one fused loop, which follows the steps of
+evaluate_population (and evaluate_sc_population): it is the fastest backend of the columnar model, if numba is
+available. Without numba the columnar (numpy) model is used, the interpreted loop can be selected for debugging.
+
+The compilation can be disabled by the NUMBA_DISABLE_JIT=1 environment variable of numba.
+"""
+
+BACKEND = "numba" if numba is not None else "python"  # backend of the scalar kernels
+
+
+def jit(function):
+    """compiles the function by numba, if it is installed, the compiled functions are cached on the disk"""
+    if numba is None:
+        return function
+    return numba.njit(cache=True)(function)
+
+
+# scalar kernels -------------------------------------------------------------------------------------------------------
+@jit
+def round_to(x: float, digits: int) -> float:
+    """numpy compatible rounding of a float to the given decimals"""
+    scale = 10.0 ** digits
+    y = x * scale
+    if not math.isfinite(y):
+        return x
+    return round(y) / scale
+
+
+@jit
+def turn_voltage(ind: float, r_c: float, ff_c: float, freq: float) -> float:
+    area = r_c ** 2.0 * pi * ff_c
+    return round_to(ind * area * 4.44 * 1e-6 * freq, PRECISION + 1)
+
+
+@jit
+def calc_inner_width(s_p: float, h_: float, ff_w: float, j_: float, u_t: float) -> float:
+    return round_to(s_p / h_ / ff_w / j_ / u_t * 1e3, PRECISION)
+
+
+@jit
+def inner_winding_radius(r_c: float, g_core: float, t_in: float) -> float:
+    return round_to(r_c + g_core + t_in / 2.0, PRECISION)
+
+
+@jit
+def outer_winding_radius(r_in: float, t_in: float, g: float, t_out: float) -> float:
+    return round_to(r_in + t_in / 2.0 + g + t_out / 2.0, PRECISION)
+
+
+@jit
+def window_width(g_core: float, t_in: float, t_out: float, g: float, t_r: float, g_r: float) -> float:
+    return round_to(g_core + t_in + t_out + g + t_r + g_r + g, 1)
+
+
+@jit
+def winding_mass(m: float, r_m: float, t: float, h: float, ff: float, density: float = C_RHO) -> float:
+    """the density is the material density (C_RHO or C_RHO_BSSCO) instead of the material name"""
+    return round_to(m * (r_m + t / 4) * 2.0 * pi * t * h * ff * density, PRECISION)
+
+
+@jit
+def winding_dc_loss(mass: float, j: float) -> float:
+    return round_to(C_RHO_CU * mass * j ** 2.0 * 1e-3, 1)
+
+
+@jit
+def core_mass(r_c: float, ff_c: float, h: float, ei: float, s: float, m: float) -> float:
+    gamma = 1.025
+    a = r_c ** 2.0 * pi * ff_c * C_RHO_FE
+
+    m_corner = a * (6.0 * r_c * gamma + 6.0 * r_c)
+    m_column = a * 3 * (h + ei)
+    m_yoke = a * (s * 8.0 + m * 4.0)
+    return round_to(m_column + m_yoke + m_corner, 1)
+
+
+@jit
+def core_loss_unit(ind: float, m_c: float, f_bf: float) -> float:
+    a = 1.0 * 0.0417580576
+    b = 3.1
+    c = 1.73506161432 * 0.0417580576
+    d = 1.50521940274 * 0.0417580576
+    e = 0.87054946894 * 0.0417580576
+    f = 0.377614241733 * 0.0417580576
+    g = 0.13103679517 * 0.0417580576
+
+    return round_to(
+        m_c * f_bf * (a + c * ind + d * ind ** b + e * ind ** 3.0 + f * ind ** 4.0 + g * ind ** 5.0) * 10 ** (-3.0), 1)
+
+
+@jit
+def short_circuit_impedance(b_pow: float, p_num: float, freq: float, alpha: float, turn_v: float, h: float, s: float,
+                            r_in: float, t_in: float, r_ou: float, t_ou: float, g: float) -> float:
+    p_pow = b_pow / p_num
+    imp_con = 4.0 * pi ** 2.0 * mu_0 * freq * p_pow / turn_v ** 2.0 / (h * (1 + alpha) / 2.0 + 0.32 * s)
+    a = r_in * t_in / 3.0
+    b = r_ou * t_ou / 3.0
+    c = (r_in + t_in / 2.0 + g / 2.0) * g
+
+    return round_to(imp_con * (a + b + c) * 100, PRECISION + 1)
+
+
+@jit
+def homogenous_insulation_ff(ff: float) -> float:
+    return (1.0 - ff) ** 0.5
+
+
+@jit
+def opt_win_eddy_loss(v_k: float, k: float) -> float:
+    return v_k / (3.0 * v_k + 2.0 * k) * 0.5
+
+
+@jit
+def capitalized_cost(c_mass: float, c_material_price: float, w_mass_in: float, w_c_in: float, w_mass_ou: float,
+                     w_c_out: float, ll: float, ll_cost: float, nll: float, nll_cost: float, alpha: float = 1.0) -> float:
+    return alpha * (
+            c_mass * c_material_price + w_mass_in * w_c_in + w_mass_ou * w_c_out) + ll * ll_cost + nll * nll_cost
+
+
+@jit
+def calc_b_parallel(N: float, I: float, h: float, g: float = 1.0) -> float:
+    return 2.0 ** 0.5 * I * N * mu_0 / (g * h)
+
+
+@jit
+def calc_b_perpendicular(N: float, I: float, h: float, w: float, g: float = 1.0) -> float:
+    return mu_0 * N * I / (2.0 ** 0.5 * pi * g * h) * math.log(2.0 * h / w)
+
+
+@jit
+def rogowski(t_lv: float, t_hv: float, gap: float, ls: float) -> float:
+    a = t_hv + t_lv + gap
+    return 1 - a / pi / ls * (1 - math.exp(-ls / a))
+
+
+@jit
+def parallel_loss(bpar: float, f: float, C: float = 0.77, ac: float = 0.31 * 4.1 * 1e-6,
+                  bp: float = 34.4 * 1e-3) -> float:
+    if bpar <= bp:
+        return 2 * f * C * ac * bpar ** 3.0 / (3. * mu_0 * bp)
+    return 2 * f * C * ac * bp / (3. * mu_0) * (3.0 * bpar - 2.0 * bp)
+
+
+@jit
+def perp_loss(f: float, bperp: float, K: float = 1.35, w: float = 4.1 * 1e-3, bc: float = 15. * 1e-3) -> float:
+    beta = bperp / bc
+    if beta == 0.0:
+        return 0.0
+
+    s = abs(beta)
+    logcosh = s + math.log1p(math.exp(-2 * s)) - math.log(2)
+    return K * f * (w ** 2.0) * pi / mu_0 * bc ** 2.0 * beta * (2.0 / beta * logcosh - math.tanh(beta))
+
+
+@jit
+def norris_equation(f: float, I: float, Ic: float) -> float:
+    """nan if the current reaches the critical current"""
+    if I / Ic >= 1.0:
+        return math.nan
+    return f * Ic ** 2 * mu_0 / pi * ((1.0 - I / Ic) * math.log(1.0 - I / Ic) + (I / Ic - I ** 2 / (2 * Ic ** 2)))
+
+
+@jit
+def cryo_surface(r_in: float, r_ou: float, h: float) -> float:
+    a_in = 2. * r_in * pi * h
+    a_ou = 2. * r_ou * pi * h
+    return a_in + a_ou + (r_ou ** 2. - r_in ** 2.) * pi
+
+
+@jit
+def cryostat_losses(Acr: float, dT: float = 228.0) -> float:
+    k_th = 2.0 * 1e-3
+    d_th = 50.0 * 1e-3
+    return round_to(k_th / d_th * Acr * 1e-6 * dT, 2)
+
+
+@jit
+def cooler_cost(cooling_power: float) -> float:
+    return 1.81 * cooling_power ** 0.57 * 1e3
+
+
+# fused population loop ------------------------------------------------------------------------------------------------
+# the result columns of the fused loop, the columns of the superconducting model are appended to the common ones
+WINDING_COLUMNS = ("inner_radius", "thickness", "height", "mass", "dc_loss", "ac_loss", "amper_turns")
+COLUMNS = (("turn_voltage",) + tuple("lv_" + name for name in WINDING_COLUMNS) +
+           tuple("hv_" + name for name in WINDING_COLUMNS) +
+           ("window_width", "wh", "core_mass", "core_loss", "load_loss", "sci", "capitalized_cost", "copper_mass",
+            "feasible"))
+SC_COLUMNS = COLUMNS + ("lv_cable_length", "lv_b_perpendicular", "hv_cable_length", "hv_b_perpendicular", "b_parallel",
+                        "ic_margin", "sc_ac_loss", "cryostat_surface", "cryostat_loss", "current_lead_loss",
+                        "cooler_cost")
+# the parameters of the rating in the order of the rating vector
+RATING_PARAMETERS = ("power", "freq", "core_fillingf", "lv_filling_factor", "hv_filling_factor", "min_core_gap",
+                     "alpha", "ei", "phase_distance", "current_lead_loss")
+
+_WINDING_OFFSET = (1, 1 + len(WINDING_COLUMNS))  # the first lv_ and hv_ columns
+_WINDOW_OFFSET = 1 + 2 * len(WINDING_COLUMNS)
+_SC_OFFSET = len(COLUMNS)
+
+
+@jit
+def _fused_population(x, rating, is_sc, ic, kappa, cooling_factor, out):
+    """
+    Evaluates the designs of the rows of x (DESIGN_VARIABLES + COST_VARIABLES) into the rows of out (COLUMNS or
+    SC_COLUMNS), the rating vector contains the RATING_PARAMETERS.
+    """
+    power = rating[0]
+    freq = rating[1]
+    core_ff = rating[2] / 100.0
+    ph_power = power / 3.0
+
+    for i in range(x.shape[0]):
+        rc = x[i, 0]
+        bc = x[i, 1]
+        h_in = x[i, 4]
+        m_gap = x[i, 5]
+        row = out[i]
+
+        # main dimensions
+        u_t = turn_voltage(bc, rc, core_ff, freq)
+        t_in = calc_inner_width(ph_power, h_in, rating[3] / 100.0, x[i, 2], u_t)
+        r_in = inner_winding_radius(rc, rating[5], t_in)
+        h_ou = h_in * rating[6]
+        t_ou = calc_inner_width(ph_power, h_ou, rating[4] / 100.0, x[i, 3], u_t)
+        r_ou = outer_winding_radius(r_in, t_in, m_gap, t_ou)
+        row[0] = u_t
+
+        amper_turns = 0.0
+        b_par = 0.0
+        margin = 1.0
+        if is_sc:
+            # the ampere-turns of the windings are balanced, the field is calculated from the inner winding
+            amper_turns = t_in * rating[3] / 100.0 * h_in * x[i, 2]
+            b_par = calc_b_parallel(amper_turns, 1.0, h_in * 1e-3) * rogowski(t_in, t_ou, m_gap, h_in)
+
+        # detailed parameters of the windings
+        for k in range(2):
+            if k == 0:
+                r_m, t, h, j, ff = r_in, t_in, h_in, x[i, 2], rating[3]
+            else:
+                r_m, t, h, j, ff = r_ou, t_ou, h_ou, x[i, 3], rating[4]
+
+            inner_radius = round_to(r_m - t / 2.0, 1)
+            if is_sc:
+                mass = winding_mass(3, inner_radius + t / 2.0, t, h, ff / 100.0, C_RHO_BSSCO)
+                cable_length = round_to(mass / C_RHO_BSSCO / TAPE_AREA * 1e-3, 2)
+                b_perp = calc_b_perpendicular(amper_turns, 1.0, h * 1e-3, TAPE_WIDTH * 1e-3)
+                current = j * TAPE_AREA
+                loss = parallel_loss(b_par, freq) + perp_loss(freq, b_perp) / kappa + norris_equation(freq, current, ic)
+                winding_margin = 1.0 - current / ic
+                if winding_margin < margin or winding_margin != winding_margin:
+                    margin = winding_margin
+
+                dc_loss = 0.0
+                ac_loss = round_to(loss * cable_length, 2)
+                row[_SC_OFFSET + 2 * k] = cable_length
+                row[_SC_OFFSET + 2 * k + 1] = b_perp
+            else:
+                mass = winding_mass(3, inner_radius + t / 2.0, t, h, ff / 100.0, C_RHO)
+                dc_loss = winding_dc_loss(mass, j)
+                ac_loss = opt_win_eddy_loss(t * homogenous_insulation_ff(ff / 100.0), t) * dc_loss
+
+            o = _WINDING_OFFSET[k]
+            row[o] = inner_radius
+            row[o + 1] = t
+            row[o + 2] = h
+            row[o + 3] = mass
+            row[o + 4] = dc_loss
+            row[o + 5] = ac_loss
+            row[o + 6] = round_to(t * ff / 100.0 * h * j, 1)
+
+        lv = _WINDING_OFFSET[0]
+        hv = _WINDING_OFFSET[1]
+        lv_mass = row[lv + 3]
+        hv_mass = row[hv + 3]
+
+        # core and short circuit impedance
+        ww = window_width(rating[5], t_in, t_ou, m_gap, 0, 0)
+        c_mass = core_mass(rc, core_ff, h_in, rating[7], ww, rating[8] / 2.0)
+        c_loss = core_loss_unit(bc, c_mass, CORE_BF)
+        load_loss = round_to(row[lv + 5] + row[lv + 4] + row[hv + 5] + row[hv + 4], 2)
+        sci = short_circuit_impedance(power, 3.0, freq, rating[6], u_t, h_in, ww, r_in, t_in, r_ou, t_ou, m_gap)
+
+        extra_cost = 0.0
+        if is_sc:
+            # there are significant losses generated by the cryostat and in the current leads
+            sc_ac_loss = load_loss
+            surface = cryo_surface(r_in, r_ou + m_gap, h_ou)
+            cryostat_loss = cryostat_losses(surface)
+            lead_loss = rating[9]
+            load_loss = cooling_factor * (sc_ac_loss + cryostat_loss + lead_loss)
+            extra_cost = cooler_cost(sc_ac_loss + cryostat_loss + lead_loss)
+
+            row[_SC_OFFSET + 4] = b_par
+            row[_SC_OFFSET + 5] = margin
+            row[_SC_OFFSET + 6] = sc_ac_loss
+            row[_SC_OFFSET + 7] = surface
+            row[_SC_OFFSET + 8] = cryostat_loss
+            row[_SC_OFFSET + 9] = lead_loss
+            row[_SC_OFFSET + 10] = extra_cost
+
+        w = _WINDOW_OFFSET
+        row[w] = ww
+        row[w + 1] = h_in + rating[7]
+        row[w + 2] = c_mass
+        row[w + 3] = c_loss
+        row[w + 4] = load_loss
+        row[w + 5] = sci
+        row[w + 6] = capitalized_cost(c_mass, x[i, 6], lv_mass, x[i, 7], hv_mass, x[i, 8], load_loss, x[i, 9], c_loss,
+                                      x[i, 10]) + extra_cost
+        row[w + 7] = lv_mass + hv_mass
+        if is_sc:
+            feasible = t_in >= SC_WIN_MIN and t_ou >= SC_WIN_MIN and margin > 0.0
+        else:
+            feasible = t_in >= C_WIN_MIN and t_ou >= C_WIN_MIN
+        row[w + 8] = 1.0 if feasible else 0.0
+
+
+def calculate_population(design: TransformerDesign, variables: typing.Mapping[str, typing.Any], is_sc: bool = False,
+                         Ic=170.0, kappa: float = 1.2, cooling_factor: float = 18.0, backend: str = None) -> dict:
+    """
+    Evaluates a population of designs, the results are the same columns as the results of evaluate_population
+    (is_sc=False) or evaluate_sc_population (is_sc=True).
+
+    :param backend: 'numba' (compiled fused loop), 'python' (interpreted fused loop) or 'numpy' (columnar model), the
+                    numba backend is used if it is installed, otherwise the numpy one. The critical current maps are
+                    evaluated only by the numpy backend.
+    """
+    if backend is None:
+        backend = "numba" if numba is not None and not callable(Ic) else "numpy"
+    if backend not in ("numba", "python", "numpy"):
+        raise ValueError("unknown backend: {}".format(backend))
+    if backend == "numba" and numba is None:
+        raise ValueError("the numba backend is not available, numba is not installed")
+
+    if backend == "numpy":
+        if is_sc:
+            return evaluate_sc_population(design, variables, Ic, kappa, cooling_factor)
+        return evaluate_population(design, variables)
+
+    if callable(Ic):
+        raise ValueError("the critical current maps are evaluated only by the numpy backend")
+
+    res = population_inputs(design, variables)
+    x = np.column_stack([res[name] for name in DESIGN_VARIABLES + COST_VARIABLES])
+
+    req = design.required
+    lead_loss = 0.0
+    if is_sc:
+        req.lv.calculate_phase_quantities(req.power)
+        req.hv.calculate_phase_quantities(req.power)
+        lead_loss = float(thermal_incomes(req.lv.ph_current, req.hv.ph_current))
+    rating = np.array([req.power, req.freq, req.core_fillingf, req.lv.filling_factor, req.hv.filling_factor,
+                       req.min_core_gap, req.alpha, req.ei, req.phase_distance, lead_loss], dtype=float)
+
+    columns = SC_COLUMNS if is_sc else COLUMNS
+    out = np.zeros((x.shape[0], len(columns)))
+    loop = _fused_population if backend == "numba" else getattr(_fused_population, "py_func", _fused_population)
+    loop(x, rating, bool(is_sc), float(Ic), float(kappa), float(cooling_factor), out)
+
+    for k, name in enumerate(columns):
+        res[name] = out[:, k]
+    res["feasible"] = res["feasible"] > 0.5
+    return res
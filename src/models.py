@@ -166,6 +166,8 @@ class MainResults:
     core_loss: float = field(default=0.0)
     load_loss: float = field(default=0.0)
     copper_mass: float = field(default=0.0)
+    lv_mass: float = field(default=0.0)
+    hv_mass: float = field(default=0.0)
     sci: float = field(default=0.0)
     window_width: float = field(default=0.0)
     core_mass: float = field(default=0.0)
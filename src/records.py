@@ -0,0 +1,191 @@
+import typing
+from dataclasses import fields
+
+import numpy as np
+
+from src.batch_model import DESIGN_VARIABLES
+from src.models import MainResults, WindingDesign
+
+"""
+Compact representations of the evaluated designs.
+
+The dataclasses of the models store every value in an instance dictionary, which costs kilobytes per design. For the
+post-processing of millions of designs this module gives:
+
+ - immutable, tuple based records (WindingRecord, ResultRecord) for smaller collections,
+ - a numpy structured array based ResultsTable, where a design is one row of fixed size and the rows can be
+   accessed by light-weight, MainResults compatible views.
+"""
+
+# scalar fields of the MainResults, the list fields are stored in the flux profile columns
+RESULT_FIELDS = tuple(f.name for f in fields(MainResults) if f.type in (float, bool))
+# winding fields of the table, in the naming of the columnar model (lv_thickness, hv_dc_loss, ...), the masses of the
+# windings are stored in the lv_mass and hv_mass result fields
+WINDING_FIELDS = ("inner_radius", "thickness", "height", "dc_loss", "ac_loss", "amper_turns")
+
+
+class WindingRecord(typing.NamedTuple):
+    inner_radius: float = 0.0
+    thickness: float = 0.0
+    winding_height: float = 0.0
+    filling_factor: float = 0.0
+    current_density: float = 0.0
+    mass: float = 0.0
+    dc_loss: float = 0.0
+    ac_loss: float = 0.0
+    outer_radius: float = 0.0
+    cable_length: float = 0.0
+    amper_turns: float = 0.0
+
+    @classmethod
+    def from_design(cls, winding: WindingDesign) -> "WindingRecord":
+        return cls(*[getattr(winding, name) for name in cls._fields])
+
+    def to_design(self) -> WindingDesign:
+        return WindingDesign(**self._asdict())
+
+
+class ResultRecord(typing.NamedTuple):
+    wh: float = 0.0
+    feasible: bool = False
+    core_loss: float = 0.0
+    load_loss: float = 0.0
+    copper_mass: float = 0.0
+    lv_mass: float = 0.0
+    hv_mass: float = 0.0
+    sci: float = 0.0
+    window_width: float = 0.0
+    core_mass: float = 0.0
+    turn_voltage: float = 0.0
+    capitalized_cost: float = 0.0
+    fem_based_sci: float = 0.0
+    fem_bax_hv: float = 0.0
+    fem_brad_hv: float = 0.0
+    fem_bax_lv: float = 0.0
+    fem_brad_lv: float = 0.0
+
+    @classmethod
+    def from_results(cls, results: MainResults) -> "ResultRecord":
+        return cls(*[getattr(results, name) for name in cls._fields])
+
+    def to_results(self) -> MainResults:
+        return MainResults(**self._asdict())
+
+
+def table_dtype(n_flux: int = 0, float_type=np.float64) -> np.dtype:
+    """
+    Row type of the results table.
+
+    :param n_flux: number of the stored (axial, radial) flux density pairs along the windings, 0 if not stored
+    :param float_type: np.float64 or np.float32 for more compact tables
+    """
+    columns = [(name, float_type) for name in DESIGN_VARIABLES]
+    columns += [(name, np.bool_ if name == "feasible" else float_type) for name in RESULT_FIELDS]
+    columns += [(prefix + "_" + name, float_type) for prefix in ("lv", "hv") for name in WINDING_FIELDS]
+    if n_flux:
+        columns += [("flux_hv", float_type, (n_flux, 2)), ("flux_lv", float_type, (n_flux, 2))]
+
+    return np.dtype(columns)
+
+
+class ResultRow:
+    """
+    MainResults compatible, read-only view of one row of a results table.
+    """
+
+    __slots__ = ("_data", "_index")
+
+    def __init__(self, data: np.ndarray, index: int):
+        self._data = data
+        self._index = index
+
+    def __getattr__(self, name):
+        if name in ("fem_bax_brad_hv", "fem_bax_brad_lv"):
+            column = "flux_" + name[-2:]
+            if column not in self._data.dtype.names:
+                return 0.0
+            return [tuple(pair) for pair in self._data[column][self._index].tolist()]
+
+        try:
+            return self._data[name][self._index].item()
+        except (KeyError, ValueError):
+            raise AttributeError(name) from None
+
+    def winding(self, prefix: str) -> WindingRecord:
+        """The winding record of the 'lv' or the 'hv' winding."""
+        value = {name: self._data[prefix + "_" + name][self._index].item() for name in WINDING_FIELDS + ("mass",)}
+        value["winding_height"] = value.pop("height")
+        value["outer_radius"] = value["inner_radius"] + value["thickness"]
+        value["current_density"] = self._data["j_in" if prefix == "lv" else "j_ou"][self._index].item()
+        return WindingRecord(**value)
+
+    def to_results(self) -> MainResults:
+        return MainResults(**{name: getattr(self, name) for name in RESULT_FIELDS + ("fem_bax_brad_hv",
+                                                                                     "fem_bax_brad_lv")})
+
+
+class ResultsTable:
+    """
+    Results of many designs in one numpy structured array.
+
+    :param size: number of the rows
+    :param n_flux: number of the stored flux density pairs along the windings
+    :param float_type: np.float64 or np.float32
+    """
+
+    def __init__(self, size: int = 0, n_flux: int = 0, float_type=np.float64, data: np.ndarray = None):
+        self.data = np.zeros(size, dtype=table_dtype(n_flux, float_type)) if data is None else data
+
+    @classmethod
+    def from_columns(cls, columns: typing.Mapping[str, typing.Any], n_flux: int = 0,
+                     float_type=np.float64) -> "ResultsTable":
+        """
+        Creates a table from the result columns of the columnar model (evaluate_population), the missing columns
+        are filled by zeros.
+        """
+        size = len(next(iter(columns.values())))
+        table = cls(size, n_flux, float_type)
+        for name in table.data.dtype.names:
+            if name in columns:
+                table.data[name] = columns[name]
+
+        return table
+
+    @classmethod
+    def from_results(cls, results: typing.Sequence[MainResults], windings: typing.Sequence[tuple] = None,
+                     n_flux: int = 0, float_type=np.float64) -> "ResultsTable":
+        """
+        Creates a table from MainResults objects and the optional (lv, hv) WindingDesign pairs.
+        """
+        table = cls(len(results), n_flux, float_type)
+        for name in RESULT_FIELDS:
+            table.data[name] = [getattr(res, name) for res in results]
+
+        if n_flux:
+            for prefix in ("hv", "lv"):
+                table.data["flux_" + prefix] = [getattr(res, "fem_bax_brad_" + prefix) for res in results]
+
+        if windings is not None:
+            for i, prefix in enumerate(("lv", "hv")):
+                for name in WINDING_FIELDS:
+                    attribute = "winding_height" if name == "height" else name
+                    table.data[prefix + "_" + name] = [getattr(pair[i], attribute) for pair in windings]
+
+        return table
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def __getitem__(self, item):
+        if isinstance(item, str):
+            return self.data[item]
+        if isinstance(item, (int, np.integer)):
+            return ResultRow(self.data, int(item) % len(self))
+        return ResultsTable(data=self.data[item])
+
+    def __iter__(self):
+        return (ResultRow(self.data, i) for i in range(len(self)))
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
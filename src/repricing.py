@@ -0,0 +1,105 @@
+import typing
+
+import numpy as np
+
+from src.batch_model import COST_VARIABLES
+from src.models import MainResults, MaterialCosts
+
+"""
+Re-pricing of the already evaluated designs.
+
+The capitalized cost is linear in the cost coefficients (MaterialCosts):
+
+    cost = core_mass * core_cost + lv_mass * lv_cost + hv_mass * hv_cost + load_loss * ll_cost + core_loss * nll_cost
+
+Therefore, if the physical components of the designs are stored, the capitalized cost of n designs under k cost
+scenarios is one (n, 5) x (5, k) matrix product, no model evaluation is needed.
+"""
+
+# physical components of the capitalized cost, in the order of the COST_VARIABLES
+COST_COMPONENTS = ("core_mass", "lv_mass", "hv_mass", "load_loss", "core_loss")
+
+
+def cost_components(results: typing.Union[typing.Mapping[str, typing.Any], typing.Sequence[MainResults]]) -> np.ndarray:
+    """
+    Collects the physical components of the capitalized cost into an (n, 5) matrix.
+
+    :param results: result columns of the columnar model (dict of arrays) or a list of MainResults
+    :return: (n, 5) array, the columns are in the order of COST_COMPONENTS
+    """
+    if isinstance(results, typing.Mapping):
+        return np.column_stack([np.asarray(results[name], dtype=float) for name in COST_COMPONENTS])
+
+    return np.array([[getattr(res, name) for name in COST_COMPONENTS] for res in results], dtype=float).reshape(-1, 5)
+
+
+def cost_vector(costs: MaterialCosts, alpha: float = 1.0) -> np.ndarray:
+    """
+    The cost coefficients in the order of the COST_COMPONENTS.
+
+    :param alpha: the ratio of the total cost and the cost of the active part of the transformer
+    """
+    material = alpha * np.array([costs.core_cost, costs.lv_cost, costs.hv_cost])
+    return np.concatenate((material, [costs.ll_cost, costs.nll_cost]))
+
+
+def scenario_matrix(scenarios: typing.Sequence[typing.Union[MaterialCosts, typing.Mapping[str, float]]],
+                    alpha: float = 1.0) -> np.ndarray:
+    """
+    Creates the (k, 5) matrix of the cost scenarios from MaterialCosts objects or dictionaries.
+    """
+    rows = []
+    for scenario in scenarios:
+        if isinstance(scenario, typing.Mapping):
+            scenario = MaterialCosts(**{name: scenario.get(name, 0.0) for name in COST_VARIABLES})
+        rows.append(cost_vector(scenario, alpha))
+
+    return np.array(rows, dtype=float).reshape(-1, 5)
+
+
+def reprice(components: np.ndarray, scenarios: np.ndarray) -> np.ndarray:
+    """
+    Capitalized cost of every design under every cost scenario.
+
+    :param components: (n, 5) physical components of the designs
+    :param scenarios: (k, 5) cost coefficients, or a single (5,) cost vector
+    :return: (n, k) capitalized costs, or (n,) for a single cost vector
+    """
+    return np.asarray(components, dtype=float) @ np.asarray(scenarios, dtype=float).T
+
+
+def cheapest_designs(components: np.ndarray, scenarios: np.ndarray, feasible: np.ndarray = None,
+                     chunk_size: int = 1 << 18):
+    """
+    Selects the cost-optimal design for every cost scenario.
+
+    The designs are processed in chunks, so the full (n, k) cost matrix is not stored.
+
+    :param components: (n, 5) physical components of the designs
+    :param scenarios: (k, 5) cost coefficients
+    :param feasible: optional boolean mask of the feasible designs, the infeasible designs are skipped
+    :param chunk_size: number of designs in one chunk
+    :return: the index and the capitalized cost of the cheapest design for every scenario, (k,) arrays,
+             the index is -1 if there is no feasible design
+    """
+    components = np.asarray(components, dtype=float)
+    scenarios = np.atleast_2d(np.asarray(scenarios, dtype=float))
+
+    best_cost = np.full(scenarios.shape[0], np.inf)
+    best_index = np.full(scenarios.shape[0], -1, dtype=np.int64)
+
+    for start in range(0, components.shape[0], chunk_size):
+        cost = reprice(components[start:start + chunk_size], scenarios)
+        if feasible is not None:
+            cost[~np.asarray(feasible[start:start + chunk_size], dtype=bool)] = np.inf
+        if cost.shape[0] == 0:
+            continue
+
+        idx = np.argmin(cost, axis=0)
+        chunk_best = cost[idx, np.arange(scenarios.shape[0])]
+        better = chunk_best < best_cost
+
+        best_cost[better] = chunk_best[better]
+        best_index[better] = idx[better] + start
+
+    return best_index, best_cost
@@ -0,0 +1,198 @@
+import json
+import operator
+import os
+import typing
+import uuid
+from time import time_ns
+
+import numpy as np
+
+"""
+Columnar, memory-mapped store of design campaigns.
+
+A store is a directory, every append creates a new part directory, which contains one .npy file per column:
+
+    campaign/
+        store.json                 column names and types
+        part-<timestamp>-<id>/     one appended chunk
+            rc.npy
+            sci.npy
+            ...
+
+The parts are written into a temporary directory and renamed in one step, therefore more workers (processes) can
+append into the same store without locking and the readers never see incomplete parts. The columns are read by
+memory mapping, only the selected columns (projection) and the rows of the filter (predicate) are loaded into memory.
+"""
+
+SCHEMA_FILE = "store.json"
+PART_PREFIX = "part-"
+
+# comparison operators of the filters, e.g. ("sci", "<", 7.8)
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+
+class ResultsStore:
+    """
+    Append-only columnar store.
+
+    :param path: directory of the store, it is created if it does not exist
+    """
+
+    def __init__(self, path: typing.Union[str, os.PathLike]):
+        self.path = os.fspath(path)
+        os.makedirs(self.path, exist_ok=True)
+
+    # schema -----------------------------------------------------------------------------------------------------------
+    @property
+    def schema(self) -> dict:
+        """column name -> numpy type string, empty until the first append"""
+        path = os.path.join(self.path, SCHEMA_FILE)
+        if not os.path.exists(path):
+            return {}
+
+        with open(path) as json_file:
+            return json.load(json_file)
+
+    def _check_schema(self, columns: typing.Mapping[str, np.ndarray]):
+        schema = {name: np.asarray(value).dtype.str for name, value in columns.items()}
+        current = self.schema
+
+        if not current:
+            tmp = os.path.join(self.path, ".{}-{}".format(SCHEMA_FILE, uuid.uuid4().hex))
+            with open(tmp, "w") as json_file:
+                json.dump(schema, json_file)
+            try:
+                # the first writer creates the schema, the others have to use the same
+                os.link(tmp, os.path.join(self.path, SCHEMA_FILE))
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(tmp)
+            current = self.schema
+
+        if set(current) != set(schema):
+            raise ValueError("the columns are not matching with the store: {}".format(sorted(current)))
+
+    # writing ----------------------------------------------------------------------------------------------------------
+    def append(self, columns: typing.Mapping[str, typing.Any]) -> str:
+        """
+        Appends a chunk of rows to the store.
+
+        :param columns: column name -> array, all of the columns has to be given with the same length, or a numpy
+                        structured array (e.g. the data of a ResultsTable)
+        :return: the name of the new part
+        """
+        if isinstance(columns, np.ndarray):
+            columns = {name: columns[name] for name in columns.dtype.names}
+        columns = {name: np.ascontiguousarray(value) for name, value in columns.items()}
+        lengths = {value.shape[0] for value in columns.values()}
+        if len(lengths) != 1:
+            raise ValueError("the columns should have the same length")
+
+        self._check_schema(columns)
+        schema = self.schema
+
+        name = "{}{:020d}-{}".format(PART_PREFIX, time_ns(), uuid.uuid4().hex[:8])
+        tmp = os.path.join(self.path, "." + name)
+        os.makedirs(tmp)
+        for column, value in columns.items():
+            np.save(os.path.join(tmp, column + ".npy"), value.astype(schema[column], copy=False))
+
+        os.rename(tmp, os.path.join(self.path, name))
+        return name
+
+    # reading ----------------------------------------------------------------------------------------------------------
+    def parts(self) -> typing.List[str]:
+        """the names of the finished parts in the order of the appends"""
+        return sorted(name for name in os.listdir(self.path) if name.startswith(PART_PREFIX))
+
+    def columns(self) -> typing.List[str]:
+        return list(self.schema)
+
+    def __len__(self):
+        return sum(self._column(part, self.columns()[0]).shape[0] for part in self.parts()) if self.schema else 0
+
+    def _column(self, part: str, column: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, part, column + ".npy"), mmap_mode="r")
+
+    def scan(self, columns: typing.Sequence[str] = None, where=None) -> typing.Iterator[dict]:
+        """
+        Iterates over the parts of the store.
+
+        :param columns: selected columns, all columns by default
+        :param where: filter, a list of (column, operator, value) tuples, which are joined by 'and', or a function,
+                      which gets the dictionary of the memory mapped columns and gives back a boolean mask
+        :return: dictionaries of the selected columns for every part, without filter (None or an empty list) these are
+                 memory mapped arrays
+        """
+        columns = self.columns() if columns is None else list(columns)
+
+        for part in self.parts():
+            mapped = {}
+
+            def column(name):
+                if name not in mapped:
+                    mapped[name] = self._column(part, name)
+                return mapped[name]
+
+            # an empty list of conditions selects every row
+            if not callable(where) and not where:
+                yield {name: column(name) for name in columns}
+                continue
+
+            mask = self._mask(where, column)
+            if np.any(mask):
+                yield {name: column(name)[mask] for name in columns}
+
+    @staticmethod
+    def _mask(where, column) -> np.ndarray:
+        if callable(where):
+            return np.asarray(where(_LazyColumns(column)), dtype=bool)
+
+        mask = None
+        for name, op, value in where:
+            condition = OPERATORS[op](column(name), value)
+            mask = condition if mask is None else mask & condition
+        return mask
+
+    def read(self, columns: typing.Sequence[str] = None, where=None) -> dict:
+        """
+        Reads the selected columns and rows of the whole store into memory.
+
+        :param columns: selected columns, all columns by default
+        :param where: filter, see the scan function
+        :return: column name -> array
+        """
+        columns = self.columns() if columns is None else list(columns)
+        chunks = {name: [] for name in columns}
+        for part in self.scan(columns, where):
+            for name in columns:
+                chunks[name].append(part[name])
+
+        schema = self.schema
+        return {name: np.concatenate(values) if values else np.empty(0, dtype=schema.get(name, float))
+                for name, values in chunks.items()}
+
+
+class _LazyColumns(typing.Mapping):
+    """Dictionary-like access of the columns of a part for the filter functions, the columns are mapped on demand."""
+
+    def __init__(self, column):
+        self._column = column
+
+    def __getitem__(self, name):
+        return self._column(name)
+
+    def __iter__(self):
+        raise TypeError("the columns of the filter can be accessed by name")
+
+    def __len__(self):
+        raise TypeError("the columns of the filter can be accessed by name")
+
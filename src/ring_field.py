@@ -0,0 +1,224 @@
+import typing
+
+import numpy as np
+from scipy.constants import mu_0, pi
+from scipy.special import ellipe, ellipk
+
+"""
+Magnetic field of air-core (axisymmetric) coils by the superposition of filamentary ring currents.
+
+The field of a circular filament with radius a, at the axial position z0, carrying the current I is given by the complete
+elliptic integrals of the first and the second kind (K, E) with the parameter m = 4ar / ((a + r)^2 + (z - z0)^2):
+
+    Br = mu0 I / (2 pi) * dz / (r sqrt((a + r)^2 + dz^2)) * (-K + (a^2 + r^2 + dz^2) / ((a - r)^2 + dz^2) * E)
+    Bz = mu0 I / (2 pi) / sqrt((a + r)^2 + dz^2) * (K + (a^2 - r^2 - dz^2) / ((a - r)^2 + dz^2) * E)
+
+The windings are divided into filaments in the centers of n_r x n_z cells, the field is summed over the (filaments x
+field points) matrix in chunks of the field points to bound the memory. If the coil system is symmetric to a
+horizontal plane, the field is evaluated only in one half of the points and mirrored (Bz is even, Br is odd). The
+coil systems of a population of designs can be stacked into the leading axis, they are evaluated together in chunks
+of the systems.
+
+There is no iron in the model, so the results are valid for air-core (e.g. HTS) coils. The coordinates are in [mm]
+like in the other parts of the model, the flux density is in [T].
+
+Reference: J. Simpson et al., Simple Analytic Expressions for the Magnetic Field of a Circular Current Loop,
+           NASA/TM-2013-217919
+"""
+
+CHUNK_ELEMENTS = 1 << 20  # the maximal size of the (filaments x field points) matrices
+
+
+class Filaments(typing.NamedTuple):
+    r: np.ndarray  # [mm] radii of the filaments
+    z: np.ndarray  # [mm] axial positions of the filaments
+    current: np.ndarray  # [A] currents of the filaments
+
+    @staticmethod
+    def concatenate(*filaments: "Filaments") -> "Filaments":
+        return Filaments(*[np.concatenate([f[i] for f in filaments], axis=-1) for i in range(3)])
+
+    def is_symmetric(self, plane: float) -> bool:
+        """True if the filaments are symmetric to the z = plane horizontal plane"""
+        original = np.lexsort((self.current, self.z - plane, self.r))
+        mirrored = np.lexsort((self.current, plane - self.z, self.r))
+        return bool(np.allclose(self.r[original], self.r[mirrored]) and
+                    np.allclose(self.z[original] - plane, plane - self.z[mirrored]) and
+                    np.allclose(self.current[original], self.current[mirrored]))
+
+
+def coil_filaments(inner_radius: float, thickness: float, height: float, z0: float, amper_turns: float,
+                   n_r: int = 5, n_z: int = 20) -> Filaments:
+    """
+    Divides a winding with uniform current density into n_r x n_z filaments.
+
+    :param inner_radius: inner radius of the winding [mm]
+    :param thickness: thickness of the winding [mm]
+    :param height: height of the winding [mm]
+    :param z0: axial coordinate of the bottom of the winding [mm]
+    :param amper_turns: total current of the winding cross-section [A], negative for the opposite direction
+    :param n_r: number of the radial filaments
+    :param n_z: number of the axial filaments
+    :return: the filaments in the last axis, the dimensions of the array parameters are kept in the leading axes
+    """
+    if n_r < 1 or n_z < 1:
+        raise ValueError("the number of the filaments should be positive")
+
+    i_r, i_z = np.meshgrid(np.arange(n_r) + 0.5, np.arange(n_z) + 0.5, indexing="ij")
+    r = np.asarray(inner_radius, dtype=float)[..., np.newaxis] + np.asarray(thickness)[..., np.newaxis] / n_r * i_r.ravel()
+    z = np.asarray(z0, dtype=float)[..., np.newaxis] + np.asarray(height)[..., np.newaxis] / n_z * i_z.ravel()
+    current = np.asarray(amper_turns, dtype=float)[..., np.newaxis] / (n_r * n_z)
+
+    return Filaments(*np.broadcast_arrays(r, z, current))
+
+
+def ring_field(a, z0, current, r, z) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Flux density of circular filaments, the parameters are broadcasted.
+
+    The field is singular on the filament, the contribution of a filament in its own position is neglected.
+
+    :param a: radius of the filaments [mm]
+    :param z0: axial position of the filaments [mm]
+    :param current: current of the filaments [A]
+    :param r: radial coordinates of the field points [mm]
+    :param z: axial coordinates of the field points [mm]
+    :return: Br, Bz [T]
+    """
+    # mm -> m
+    a = np.asarray(a, dtype=float) * 1e-3
+    r = np.asarray(r, dtype=float) * 1e-3
+    dz = (np.asarray(z, dtype=float) - np.asarray(z0, dtype=float)) * 1e-3
+
+    dz2 = dz * dz
+    a2_r2 = a * a - r * r
+    alpha2 = (a - r) ** 2 + dz2  # squared distance from the closest point of the filament
+    beta2 = (a + r) ** 2 + dz2
+    on_filament = alpha2 == 0.0
+    if np.any(on_filament):
+        alpha2 = np.where(on_filament, 1.0, alpha2)
+
+    m = 4.0 * a * r / beta2
+    c = mu_0 / (2.0 * pi) * np.asarray(current, dtype=float) / np.sqrt(beta2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        k = ellipk(m)
+        e_alpha = ellipe(m) / alpha2
+        bz = c * (k + (a2_r2 - dz2) * e_alpha)
+        # the radial component is zero on the axis
+        br = c * dz / r * ((beta2 - 2.0 * a * r) * e_alpha - k)
+
+    on_axis = r == 0.0
+    if np.any(on_axis) or np.any(on_filament):
+        br = np.where(on_axis | on_filament, 0.0, br)
+        bz = np.where(on_filament, 0.0, bz)
+
+    return br, bz
+
+
+def filament_field(filaments: Filaments, r, z, chunk_elements: int = CHUNK_ELEMENTS) -> typing.Tuple[np.ndarray,
+                                                                                                        np.ndarray]:
+    """
+    Flux density of a set of filaments in the given field points.
+
+    :param filaments: the source filaments
+    :param r: radial coordinates of the field points [mm]
+    :param z: axial coordinates of the field points [mm]
+    :param chunk_elements: maximal number of the (filament, field point) pairs in one step
+    :return: Br, Bz [T] in the shape of the field points
+    """
+    r, z = np.broadcast_arrays(np.asarray(r, dtype=float), np.asarray(z, dtype=float))
+    shape = r.shape
+    r = r.ravel()
+    z = z.ravel()
+
+    br = np.empty(r.shape[0])
+    bz = np.empty(r.shape[0])
+    chunk = max(1, chunk_elements // max(1, filaments.r.shape[0]))
+    sources = [value[:, None] for value in filaments]
+    for start in range(0, r.shape[0], chunk):
+        end = start + chunk
+        br_chunk, bz_chunk = ring_field(*sources, r[None, start:end], z[None, start:end])
+        br[start:end] = br_chunk.sum(axis=0)
+        bz[start:end] = bz_chunk.sum(axis=0)
+
+    return br.reshape(shape), bz.reshape(shape)
+
+
+def stacked_filament_field(filaments: Filaments, r, z, chunk_elements: int = CHUNK_ELEMENTS
+                           ) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Flux density of stacked filament systems, e.g. of the designs of a population, the k-th system is evaluated in the
+    k-th row of the field points. The (systems x filaments x field points) tensor is summed in chunks of the systems.
+
+    :param filaments: the source filaments with (n_systems, n_filaments) arrays
+    :param r: radial coordinates of the field points [mm], (n_systems, n_points)
+    :param z: axial coordinates of the field points [mm], (n_systems, n_points)
+    :param chunk_elements: maximal number of the (filament, field point) pairs in one step
+    :return: Br, Bz [T] with (n_systems, n_points) shape
+    """
+    r, z = np.broadcast_arrays(np.asarray(r, dtype=float), np.asarray(z, dtype=float))
+    n_systems = r.shape[0]
+
+    br = np.empty(r.shape)
+    bz = np.empty(r.shape)
+    chunk = max(1, chunk_elements // max(1, filaments.r.shape[-1] * r.shape[-1]))
+    for start in range(0, n_systems, chunk):
+        end = start + chunk
+        sources = [value[start:end, :, None] for value in filaments]
+        br_chunk, bz_chunk = ring_field(*sources, r[start:end, None, :], z[start:end, None, :])
+        br[start:end] = br_chunk.sum(axis=1)
+        bz[start:end] = bz_chunk.sum(axis=1)
+
+    return br, bz
+
+
+def field_map(filaments: Filaments, r, z, symmetry_plane: float = None,
+              chunk_elements: int = CHUNK_ELEMENTS) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Flux density on the regular grid of the r and z axes.
+
+    :param filaments: the source filaments
+    :param r: radial axis of the grid [mm]
+    :param z: axial axis of the grid [mm]
+    :param symmetry_plane: axial position of the horizontal symmetry plane of the filaments, if it is given, the field
+                           is evaluated only at the distinct distances from the plane
+    :param chunk_elements: maximal number of the (filament, field point) pairs in one step
+    :return: Br, Bz [T] with (len(r), len(z)) shape
+    """
+    r = np.asarray(r, dtype=float)
+    z = np.asarray(z, dtype=float)
+
+    if symmetry_plane is None:
+        return filament_field(filaments, r[:, None], z[None, :], chunk_elements)
+
+    if not filaments.is_symmetric(symmetry_plane):
+        raise ValueError("the filaments are not symmetric to the z = {} plane".format(symmetry_plane))
+
+    offset = z - symmetry_plane
+    distance, inverse = np.unique(np.abs(offset), return_inverse=True)
+    br, bz = filament_field(filaments, r[:, None], symmetry_plane + distance[None, :], chunk_elements)
+
+    # Bz is even, Br is odd to the symmetry plane
+    return br[:, inverse] * np.sign(offset), bz[:, inverse]
+
+
+def flux_profile(filaments: Filaments, inner_radius: float, thickness: float, height: float, z0: float,
+                 n_slices: int = 21, n_r: int = 10, chunk_elements: int = CHUNK_ELEMENTS) -> np.ndarray:
+    """
+    Maximal axial and radial flux densities on horizontal slices of a winding, like the flux profiles of the FEM
+    simulation, it can be used directly by supra_winding_ac_loss.
+
+    :param filaments: the source filaments
+    :param inner_radius: inner radius of the winding [mm]
+    :param thickness: thickness of the winding [mm]
+    :param height: height of the winding [mm]
+    :param z0: axial coordinate of the bottom of the winding [mm]
+    :param n_slices: number of the equidistant slices from the bottom to the top of the winding
+    :param n_r: number of the points in a slice
+    :return: (n_slices, 2) array of the (|Bax|, |Brad|) maxima [T]
+    """
+    r = np.linspace(inner_radius, inner_radius + thickness, n_r)
+    z = np.linspace(z0, z0 + height, n_slices)
+    br, bz = field_map(filaments, r, z, chunk_elements=chunk_elements)
+
+    return np.stack((np.max(np.abs(bz), axis=0), np.max(np.abs(br), axis=0)), axis=-1)
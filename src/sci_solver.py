@@ -0,0 +1,182 @@
+import typing
+
+import numpy as np
+from scipy.constants import mu_0, pi
+from scipy.optimize import brentq
+
+from src.batch_model import evaluate_population, population_inputs
+from src.models import TransformerDesign
+
+"""
+Elimination of the short circuit impedance equality constraint.
+
+The analytical impedance (short_circuit_impedance) is expressed as a continuous function of the design variables
+(without the manufacturing rounding of the base functions). For a target impedance:
+
+ - the main gap (m_gap) has a closed form solution, the impedance is a ratio of a quadratic and a linear polynomial
+   of the main gap,
+ - the height of the inner winding (h_in) is found by a bracketed root finder.
+
+Then the optimization can be done in the remaining 5D space, where every point meets the impedance requirement.
+"""
+
+
+def _chain(design: TransformerDesign, res: dict):
+    """
+    The parts of the impedance calculation which are independent from the main gap.
+
+    :return: impedance constant (without the geometry dependent denominator), t_in, r_in, t_ou, denominator without
+             the main gap
+    """
+    req = design.required
+    ph_power = req.power / 3.0
+
+    u_t = res["bc"] * res["rc"] ** 2.0 * pi * req.core_fillingf / 100.0 * 4.44 * 1e-6 * req.freq
+    t_in = ph_power / res["h_in"] / (req.lv.filling_factor / 100.0) / res["j_in"] / u_t * 1e3
+    t_ou = ph_power / (res["h_in"] * req.alpha) / (req.hv.filling_factor / 100.0) / res["j_ou"] / u_t * 1e3
+    r_in = res["rc"] + req.min_core_gap + t_in / 2.0
+
+    imp_con = 4.0 * pi ** 2.0 * mu_0 * req.freq * ph_power / u_t ** 2.0 * 100.0
+    den = res["h_in"] * (1 + req.alpha) / 2.0 + 0.32 * (req.min_core_gap + t_in + t_ou)
+    return imp_con, t_in, r_in, t_ou, den
+
+
+def continuous_sci(design: TransformerDesign, variables: typing.Mapping[str, typing.Any]) -> np.ndarray:
+    """
+    Analytical short circuit impedance [%] without the rounding of the intermediate results.
+    """
+    res = population_inputs(design, variables)
+    imp_con, t_in, r_in, t_ou, den = _chain(design, res)
+    g = res["m_gap"]
+
+    r_ou = r_in + t_in / 2.0 + g + t_ou / 2.0
+    num = r_in * t_in / 3.0 + r_ou * t_ou / 3.0 + (r_in + t_in / 2.0 + g / 2.0) * g
+    return imp_con * num / (den + 0.64 * g)
+
+
+def solve_m_gap(design: TransformerDesign, variables: typing.Mapping[str, typing.Any], sci: float = None) -> np.ndarray:
+    """
+    Closed form main gap for the required short circuit impedance.
+
+        sci(g) = K * (n0 + n1 * g + g^2 / 2) / (d0 + 0.64 * g)
+
+    :param variables: the other design variables (columns or scalars)
+    :param sci: the target impedance [%], by default the required impedance of the design (sci_req)
+    :return: the main gap [mm], nan if there is no positive solution
+    """
+    sci = design.required.sci_req if sci is None else sci
+    res = population_inputs(design, variables)
+    imp_con, t_in, r_in, t_ou, den = _chain(design, res)
+
+    q = r_in + t_in / 2.0
+    n0 = r_in * t_in / 3.0 + (q + t_ou / 2.0) * t_ou / 3.0
+    n1 = t_ou / 3.0 + q
+
+    # g^2 / 2 + b * g + c = 0
+    b = n1 - sci * 0.64 / imp_con
+    c = n0 - sci * den / imp_con
+    disc = b ** 2.0 - 2.0 * c
+
+    with np.errstate(invalid="ignore"):
+        g = -b + np.sqrt(disc)
+
+    return np.where((disc >= 0.0) & (g > 0.0), g, np.nan)
+
+
+def solve_h_in(design: TransformerDesign, bounds: typing.Sequence[float], sci: float = None, xtol: float = 1e-3):
+    """
+    Height of the inner winding for the required impedance by the Brent method, for one design.
+
+    :param bounds: (lower, upper) bracket of the winding height [mm]
+    :param sci: the target impedance [%], by default the required impedance of the design (sci_req)
+    :return: the winding height [mm], nan if the bracket does not contain a solution
+    """
+    sci = design.required.sci_req if sci is None else sci
+
+    def residual(h):
+        return continuous_sci(design, {"h_in": h})[0] - sci
+
+    lower, upper = bounds
+    if residual(lower) * residual(upper) > 0.0:
+        return np.nan
+
+    return brentq(residual, lower, upper, xtol=xtol)
+
+
+def solve_h_in_batch(design: TransformerDesign, variables: typing.Mapping[str, typing.Any],
+                     bounds: typing.Sequence[float], sci: float = None, xtol: float = 1e-3) -> np.ndarray:
+    """
+    Height of the inner winding for the required impedance by vectorized bisection for a population.
+
+    :param variables: the other design variables (columns or scalars)
+    :param bounds: (lower, upper) bracket of the winding height [mm]
+    :param sci: the target impedance [%], by default the required impedance of the design (sci_req)
+    :return: the winding heights [mm], nan where the bracket does not contain a solution
+    """
+    sci = design.required.sci_req if sci is None else sci
+    columns = population_inputs(design, variables)
+
+    def residual(h):
+        columns["h_in"] = h
+        return continuous_sci(design, columns) - sci
+
+    n = columns["rc"].shape[0]
+    lower = np.full(n, float(bounds[0]))
+    upper = np.full(n, float(bounds[1]))
+    f_lower = residual(lower)
+    valid = f_lower * residual(upper) <= 0.0
+
+    for _ in range(int(np.ceil(np.log2((bounds[1] - bounds[0]) / xtol)))):
+        mid = 0.5 * (lower + upper)
+        f_mid = residual(mid)
+        left = f_lower * f_mid <= 0.0
+
+        upper = np.where(left, mid, upper)
+        lower = np.where(left, lower, mid)
+        f_lower = np.where(left, f_lower, f_mid)
+
+    return np.where(valid, 0.5 * (lower + upper), np.nan)
+
+
+def sci_feasible(design: TransformerDesign, sci) -> np.ndarray:
+    """
+    Vectorized version of the TransformerRequirements.check_sci_requrements.
+    """
+    req = design.required
+    sci = np.asarray(sci)
+    return (sci < req.sci_req * (1.0 + req.drop_tol / 100)) & (sci > req.sci_req * (1.0 - req.drop_tol / 100))
+
+
+def evaluate_on_sci_target(design: TransformerDesign, variables: typing.Mapping[str, typing.Any],
+                           solve_for: str = "h_in", bounds: typing.Sequence[float] = None) -> dict:
+    """
+    Evaluates a population in the reduced (5D) design space: the eliminated variable is calculated from the required
+    impedance, then the whole population is evaluated by the columnar model.
+
+    The designs without solution, or where the rounded model misses the required impedance tolerance are marked
+    as infeasible.
+
+    :param variables: the 5 remaining design variables (and optional cost coefficients)
+    :param solve_for: 'h_in' or 'm_gap'
+    :param bounds: bracket of the winding height, needed for the 'h_in'
+    :return: result columns of the columnar model
+    """
+    if solve_for not in ("h_in", "m_gap"):
+        raise ValueError("the impedance can be solved for 'h_in' or 'm_gap'")
+    if solve_for == "h_in" and bounds is None:
+        raise ValueError("the bracket of the winding height should be given")
+
+    variables = {name: value for name, value in variables.items() if name != solve_for}
+    if solve_for == "h_in":
+        solved = solve_h_in_batch(design, variables, bounds)
+    else:
+        solved = solve_m_gap(design, variables)
+
+    missing = np.isnan(solved)
+    variables[solve_for] = np.where(missing, getattr(design.design_params, solve_for), solved)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        res = evaluate_population(design, variables)
+    res["feasible"] = res["feasible"] & ~missing & sci_feasible(design, res["sci"])
+    return res
+
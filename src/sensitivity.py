@@ -0,0 +1,150 @@
+import typing
+from dataclasses import dataclass, field
+from math import ceil, log2
+
+import numpy as np
+from scipy.stats import qmc
+
+from src.batch_model import evaluate_population
+from src.models import TransformerDesign
+
+"""
+Global (variance based) sensitivity analysis of the two winding model.
+
+The Sobol indices are estimated by the Saltelli sampling scheme: two independent quasi-random sample matrices (A, B)
+and d mixed matrices (AB_i, the i-th column of A is replaced by the i-th column of B) are evaluated in one batched
+call of the columnar model, which needs N * (d + 2) model evaluations.
+
+References: - Saltelli, A. et al. Variance based sensitivity analysis of model output. Design and estimator for the
+              total sensitivity index, Computer Physics Communications, 181(2), pp. 259-270, 2010.
+"""
+
+DEFAULT_OUTPUTS = ("capitalized_cost", "load_loss", "core_loss", "sci")
+
+
+@dataclass
+class SobolIndices:
+    parameters: tuple  # names of the varied parameters
+    n_samples: int  # base sample size (N), the number of model evaluations is N * (d + 2)
+    first_order: dict = field(default_factory=dict)  # output name -> S1 indices, in the order of the parameters
+    total: dict = field(default_factory=dict)  # output name -> ST indices
+    first_order_conf: dict = field(default_factory=dict)  # output name -> (2, d) array of the lower and upper bounds
+    total_conf: dict = field(default_factory=dict)  # output name -> (2, d) array of the lower and upper bounds
+    feasible_ratio: float = 0.0  # the ratio of the feasible designs in the evaluated samples
+
+
+def saltelli_matrices(bounds: typing.Mapping[str, typing.Sequence[float]], n: int, seed=None):
+    """
+    Creates the A and B sample matrices from a scrambled Sobol sequence, the samples are scaled into the given bounds.
+
+    :param bounds: parameter name -> (lower, upper) bounds
+    :param n: number of the base samples, it is rounded up to the next power of 2 for the balance properties of the
+              Sobol sequence
+    :param seed: seed of the scrambling
+    :return: A, B matrices with (N, d) shape
+    """
+    d = len(bounds)
+    lower, upper = np.array(list(bounds.values()), dtype=float).T
+
+    sampler = qmc.Sobol(d=2 * d, scramble=True, seed=seed)
+    base = sampler.random_base2(m=max(ceil(log2(n)), 1))
+
+    a = qmc.scale(base[:, :d], lower, upper)
+    b = qmc.scale(base[:, d:], lower, upper)
+    return a, b
+
+
+def stack_saltelli(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Stacks the A, B and the AB_i matrices into one (N * (d + 2), d) matrix for one batched model evaluation.
+    The order of the blocks: A, B, AB_1, ..., AB_d.
+    """
+    n, d = a.shape
+    stacked = np.empty(((d + 2) * n, d))
+    stacked[:n] = a
+    stacked[n:2 * n] = b
+    for i in range(d):
+        block = stacked[(i + 2) * n:(i + 3) * n]
+        block[:] = a
+        block[:, i] = b[:, i]
+
+    return stacked
+
+
+def sobol_estimates(f_a: np.ndarray, f_b: np.ndarray, f_ab: np.ndarray):
+    """
+    First order (Saltelli 2010) and total (Jansen) sensitivity indices.
+
+    :param f_a: model output on the A matrix (N,)
+    :param f_b: model output on the B matrix (N,)
+    :param f_ab: model outputs on the AB_i matrices (d, N)
+    :return: S1, ST arrays with (d,) shape
+    """
+    variance = np.var(np.concatenate((f_a, f_b)))
+    if variance == 0.0:
+        zeros = np.zeros(f_ab.shape[0])
+        return zeros, zeros
+
+    s1 = np.mean(f_b * (f_ab - f_a), axis=1) / variance
+    st = 0.5 * np.mean((f_a - f_ab) ** 2.0, axis=1) / variance
+    return s1, st
+
+
+def bootstrap_confidence(f_a, f_b, f_ab, n_bootstrap=100, confidence=0.95, seed=None):
+    """
+    Percentile bootstrap confidence intervals of the first order and total indices.
+
+    :return: (2, d) arrays of the lower and the upper bounds of S1 and ST
+    """
+    rng = np.random.default_rng(seed)
+    n = f_a.shape[0]
+    s1 = np.empty((n_bootstrap, f_ab.shape[0]))
+    st = np.empty_like(s1)
+
+    for k in range(n_bootstrap):
+        idx = rng.integers(0, n, n)
+        s1[k], st[k] = sobol_estimates(f_a[idx], f_b[idx], f_ab[:, idx])
+
+    q = [(1.0 - confidence) / 2.0 * 100.0, (1.0 + confidence) / 2.0 * 100.0]
+    return np.percentile(s1, q, axis=0), np.percentile(st, q, axis=0)
+
+
+def sobol_analysis(
+        design: TransformerDesign,
+        bounds: typing.Mapping[str, typing.Sequence[float]],
+        n: int = 1024,
+        outputs: typing.Sequence[str] = DEFAULT_OUTPUTS,
+        n_bootstrap: int = 100,
+        confidence: float = 0.95,
+        seed=None,
+) -> SobolIndices:
+    """
+    Sobol sensitivity analysis of the two winding model around the given design.
+
+    :param design: base design, the parameters which are not in the bounds are taken from this design
+    :param bounds: parameter name -> (lower, upper), design variables (rc, bc, j_in, ...) and cost coefficients
+                   (core_cost, ll_cost, ...) can be used
+    :param n: number of the base samples, rounded up to the next power of 2
+    :param outputs: analysed result columns of the model
+    :param n_bootstrap: number of bootstrap resamples for the confidence intervals
+    :param confidence: confidence level of the intervals
+    :param seed: seed of the sampling and the bootstrap
+    :return: SobolIndices
+    """
+    names = tuple(bounds)
+    a, b = saltelli_matrices(bounds, n, seed=seed)
+    n, d = a.shape
+
+    samples = stack_saltelli(a, b)
+    results = evaluate_population(design, {name: samples[:, i] for i, name in enumerate(names)})
+
+    indices = SobolIndices(parameters=names, n_samples=n, feasible_ratio=float(np.mean(results["feasible"])))
+    for output in outputs:
+        y = np.asarray(results[output], dtype=float)
+        f_a, f_b, f_ab = y[:n], y[n:2 * n], y[2 * n:].reshape(d, n)
+
+        indices.first_order[output], indices.total[output] = sobol_estimates(f_a, f_b, f_ab)
+        indices.first_order_conf[output], indices.total_conf[output] = bootstrap_confidence(
+            f_a, f_b, f_ab, n_bootstrap=n_bootstrap, confidence=confidence, seed=seed)
+
+    return indices
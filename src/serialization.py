@@ -0,0 +1,195 @@
+import json
+import struct
+import typing
+from dataclasses import fields, is_dataclass
+
+import numpy as np
+
+from src.models import MainResults, TransformerDesign
+
+"""
+Fast serialization of the model dataclasses.
+
+The dataclasses_json based to_dict/from_dict functions inspect the type hints of the classes in every call. The codecs
+of this module inspect the (nested) dataclass only once, and generate specialized python functions for the conversion:
+
+ - flat tuples, the fields of the nested dataclasses are listed in depth-first order,
+ - dictionaries and JSON, which are compatible with the dataclasses_json format (to_dict/to_json),
+ - binary records by the struct module and numpy structured arrays for many objects.
+"""
+
+# kind of the leaf fields
+FLOAT = "float"
+BOOL = "bool"
+STR = "str"
+JSON = "json"  # lists and other values, which are stored as json text in the binary formats
+
+_LENGTH = struct.Struct("<I")
+
+
+def _kind(annotation) -> str:
+    if annotation is bool:
+        return BOOL
+    if annotation in (float, int):
+        return FLOAT
+    if annotation is str:
+        return STR
+    return JSON
+
+
+class FastCodec:
+    """
+    Generated encoder/decoder of a dataclass.
+
+    :param cls: the (nested) dataclass
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.leaves = []  # (dotted path, kind) of the leaf fields in depth-first order
+        self._namespace = {"_fallback": cls.from_dict if hasattr(cls, "from_dict") else None}
+
+        self._collect(cls, ())
+        self.names = tuple(path for path, _ in self.leaves)
+
+        self.to_tuple = self._compile("to_tuple", "obj", "return ({},)".format(
+            ", ".join("obj." + path for path in self.names)))
+        self.from_tuple = self._compile("from_tuple", "t", "return " + self._constructor(cls, (), iter(range(len(
+            self.names))), "t[{}]"))
+        self.to_dict = self._compile("to_dict", "obj", "return " + self._dict_literal(cls, ()))
+        self.from_dict = self._compile("from_dict", "d", "try:\n        return {}\n    except (KeyError, TypeError):\n"
+                                                         "        return _fallback(d)".format(
+            self._constructor(cls, (), None, None)))
+
+        self._numeric = [i for i, (_, kind) in enumerate(self.leaves) if kind in (FLOAT, BOOL)]
+        self._variable = [i for i, (_, kind) in enumerate(self.leaves) if kind in (STR, JSON)]
+        self._struct = struct.Struct("<" + "".join("?" if self.leaves[i][1] == BOOL else "d" for i in self._numeric))
+
+    def _collect(self, cls, prefix):
+        hints = typing.get_type_hints(cls)
+        for f in fields(cls):
+            annotation = hints[f.name]
+            if is_dataclass(annotation):
+                self._collect(annotation, prefix + (f.name,))
+            else:
+                self.leaves.append((".".join(prefix + (f.name,)), _kind(annotation)))
+
+    def _compile(self, name, arg, body):
+        source = "def {}({}):\n    {}\n".format(name, arg, body)
+        exec(source, self._namespace)
+        return self._namespace[name]
+
+    def _constructor(self, cls, prefix, counter, template):
+        """Source of the nested constructor call, from a flat tuple (template) or from a nested dict (d[..][..])."""
+        hints = typing.get_type_hints(cls)
+        self._namespace[cls.__name__] = cls
+
+        args = []
+        for f in fields(cls):
+            path = prefix + (f.name,)
+            if is_dataclass(hints[f.name]):
+                value = self._constructor(hints[f.name], path, counter, template)
+            elif template is not None:
+                value = template.format(next(counter))
+            else:
+                value = "d" + "".join("[{!r}]".format(key) for key in path)
+            args.append("{}={}".format(f.name, value))
+
+        return "{}({})".format(cls.__name__, ", ".join(args))
+
+    def _dict_literal(self, cls, prefix):
+        hints = typing.get_type_hints(cls)
+        items = []
+        for f in fields(cls):
+            path = prefix + (f.name,)
+            if is_dataclass(hints[f.name]):
+                value = self._dict_literal(hints[f.name], path)
+            else:
+                value = "obj." + ".".join(path)
+            items.append("{!r}: {}".format(f.name, value))
+
+        return "{" + ", ".join(items) + "}"
+
+    # json -------------------------------------------------------------------------------------------------------------
+    def to_json(self, obj) -> str:
+        return json.dumps(self.to_dict(obj))
+
+    def from_json(self, text: str):
+        return self.from_dict(json.loads(text))
+
+    # binary -----------------------------------------------------------------------------------------------------------
+    def to_bytes(self, obj) -> bytes:
+        """
+        Binary record: the numeric fields are packed by a fixed struct, the strings and the json fields are
+        appended with a length prefix.
+        """
+        values = self.to_tuple(obj)
+        parts = [self._struct.pack(*[values[i] for i in self._numeric])]
+        for i in self._variable:
+            value = values[i] if self.leaves[i][1] == STR else json.dumps(values[i])
+            data = value.encode("utf-8")
+            parts.append(_LENGTH.pack(len(data)))
+            parts.append(data)
+
+        return b"".join(parts)
+
+    def from_bytes(self, data: bytes):
+        values = [None] * len(self.leaves)
+        for i, value in zip(self._numeric, self._struct.unpack_from(data)):
+            values[i] = value
+
+        offset = self._struct.size
+        for i in self._variable:
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            text = bytes(data[offset:offset + length]).decode("utf-8")
+            values[i] = text if self.leaves[i][1] == STR else json.loads(text)
+            offset += length
+
+        return self.from_tuple(values)
+
+    # numpy ------------------------------------------------------------------------------------------------------------
+    def dtype(self, str_length: int = 128) -> np.dtype:
+        """
+        Numpy structured dtype of the flat records, the strings and json fields are stored in fixed length
+        unicode fields.
+        """
+        formats = {FLOAT: "f8", BOOL: "?", STR: "U{}".format(str_length), JSON: "U{}".format(str_length)}
+        return np.dtype([(path, formats[kind]) for path, kind in self.leaves])
+
+    def to_array(self, objs: typing.Sequence, str_length: int = 128) -> np.ndarray:
+        rows = []
+        for obj in objs:
+            values = list(self.to_tuple(obj))
+            for i in self._variable:
+                if self.leaves[i][1] == JSON:
+                    values[i] = json.dumps(values[i])
+            rows.append(tuple(values))
+
+        return np.array(rows, dtype=self.dtype(str_length))
+
+    def from_array(self, array: np.ndarray) -> list:
+        json_fields = [i for i in self._variable if self.leaves[i][1] == JSON]
+        objs = []
+        for row in array.tolist():
+            if json_fields:
+                row = list(row)
+                for i in json_fields:
+                    row[i] = json.loads(row[i])
+            objs.append(self.from_tuple(row))
+
+        return objs
+
+
+_CODECS = {}
+
+
+def codec_for(cls) -> FastCodec:
+    """Gives back the (cached) generated codec of the dataclass."""
+    if cls not in _CODECS:
+        _CODECS[cls] = FastCodec(cls)
+    return _CODECS[cls]
+
+
+DESIGN_CODEC = codec_for(TransformerDesign)
+RESULTS_CODEC = codec_for(MainResults)
@@ -0,0 +1,296 @@
+import importlib.util
+import json
+import queue
+import threading
+import time
+import typing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from src.cli import EvaluationOptions, evaluate_records
+from src.design_library import DesignLibrary
+
+"""
+Local HTTP service of the model evaluations.
+
+The service is a long-running process, which keeps the parsed ratings and the FEM worker processes warm, so the
+interactive tools do not pay the start-up of python, scipy and agros on every call. The requests are JSON records (or
+lists of records) in the format of the command line interface (src.cli):
+
+    POST /evaluate     analytical evaluation of the two winding model
+    POST /hts-losses   evaluation of the superconducting model with the ac, cryostat and current lead losses
+    POST /fem          analytical evaluation, and FEM simulation of the feasible designs (needs agrossuite)
+    GET  /ratings      names of the available ratings
+    GET  /metrics      number of the requests, p50/p99 latencies per endpoint and the batch sizes
+    GET  /health
+
+The single-design requests, which arrive in the same time, are coalesced: a batcher thread collects the records until
+max_batch records or max_delay seconds, then evaluates them in one pass of the columnar model. The FEM simulations are
+run on a pool of worker processes, where the FEM model is imported at the start of the workers.
+
+The service listens only on the given (by default the loopback) interface:
+
+    with EvaluationService(port=0) as service:
+        print(service.url)
+"""
+
+LATENCY_WINDOW = 10000  # number of the latest requests in the latency statistics
+BATCH_TIMEOUT = 60.0  # [s] maximal waiting time of a request for its batch
+
+
+class Batcher:
+    """
+    Collects the records of the concurrent requests and evaluates them in batches on a background thread.
+
+    :param evaluate: evaluates a list of records, gives back the list of the results
+    :param max_batch: maximal number of the records in a batch
+    :param max_delay: maximal waiting time [s] for the next records after the first record of a batch
+    """
+
+    def __init__(self, evaluate: typing.Callable[[list], list], max_batch: int = 256, max_delay: float = 0.002):
+        self.evaluate = evaluate
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batch_sizes = deque(maxlen=LATENCY_WINDOW)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, record: dict) -> Future:
+        future = Future()
+        self._queue.put((record, future))
+        return future
+
+    def evaluate_many(self, records: typing.Sequence[dict], timeout: float = BATCH_TIMEOUT) -> list:
+        """submits the records one by one and waits for the results"""
+        futures = [self.submit(record) for record in records]
+        return [future.result(timeout) for future in futures]
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        stopped = False
+        while not stopped:
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.perf_counter() + self.max_delay
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopped = True
+                    break
+                batch.append(item)
+
+            self.batch_sizes.append(len(batch))
+            try:
+                results = self.evaluate([record for record, _ in batch])
+            except Exception as error:  # the requests of the batch get the error, the service keeps running
+                for _, future in batch:
+                    future.set_exception(error)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+
+class LatencyStats:
+    """Latencies of the latest requests of an endpoint."""
+
+    def __init__(self):
+        self.count = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def add(self, latency: float):
+        with self._lock:
+            self.count += 1
+            self._latencies.append(latency)
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = np.array(self._latencies)
+
+        summary = {"count": self.count}
+        if latencies.shape[0]:
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+            summary.update(p50_ms=round(p50, 3), p99_ms=round(p99, 3), max_ms=round(latencies.max() * 1e3, 3))
+        return summary
+
+
+def fem_available() -> bool:
+    return importlib.util.find_spec("agrossuite") is not None
+
+
+def _warm_fem_worker():
+    # the FEM model is imported once per worker process
+    import src.two_winding_model  # noqa: F401
+
+
+def evaluate_fem_record(record: dict) -> dict:
+    return evaluate_records([record], EvaluationOptions(fem=True))[0]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.service.handle(self, "GET")
+
+    def do_POST(self):
+        self.server.service.handle(self, "POST")
+
+    def log_message(self, format, *args):
+        if self.server.service.verbose:
+            super().log_message(format, *args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    service: "EvaluationService"
+
+
+class EvaluationService:
+    """
+    HTTP service of the analytical, FEM and HTS loss evaluations.
+
+    :param host: the listened interface, the loopback by default
+    :param port: the listened port, 0 for a free port
+    :param max_batch: maximal number of the records in a batch
+    :param max_delay: maximal waiting time [s] for the records of a batch
+    :param fem_workers: number of the FEM worker processes, 0 disables the FEM endpoint
+    :param verbose: logs the requests to the stderr
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, max_batch: int = 256, max_delay: float = 0.002,
+                 fem_workers: int = 1, verbose: bool = False):
+        self.verbose = verbose
+        self.started = time.time()
+
+        # the rating files are parsed and validated once, at the start of the service
+        self.library = DesignLibrary()
+        for _ in self.library.items():
+            pass
+
+        self.batchers = {
+            "/evaluate": Batcher(evaluate_records, max_batch, max_delay),
+            "/hts-losses": Batcher(lambda records: evaluate_records(records, EvaluationOptions(sc=True)), max_batch,
+                                   max_delay),
+        }
+        self.fem_pool = None
+        if fem_workers > 0 and fem_available():
+            self.fem_pool = ProcessPoolExecutor(fem_workers, initializer=_warm_fem_worker)
+
+        self.latencies = {path: LatencyStats() for path in ("/evaluate", "/hts-losses", "/fem")}
+        self._server = _Server((host, port), _Handler)
+        self._server.service = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def start(self) -> "EvaluationService":
+        """serves the requests on a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        try:
+            self._server.serve_forever()
+        finally:
+            self.stop()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        for batcher in self.batchers.values():
+            batcher.close()
+        if self.fem_pool is not None:
+            self.fem_pool.shutdown()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def metrics(self) -> dict:
+        batches = {}
+        for path, batcher in self.batchers.items():
+            sizes = np.array(batcher.batch_sizes)
+            batches[path] = {"count": int(sizes.shape[0]),
+                             "mean_size": round(float(sizes.mean()), 2) if sizes.shape[0] else 0.0,
+                             "max_size": int(sizes.max()) if sizes.shape[0] else 0}
+
+        return {"uptime": round(time.time() - self.started, 3),
+                "endpoints": {path: stats.summary() for path, stats in self.latencies.items()},
+                "batches": batches}
+
+    def handle(self, request: BaseHTTPRequestHandler, method: str):
+        path = request.path.split("?")[0].rstrip("/") or "/"
+        start = time.perf_counter()
+        try:
+            status, body = self._dispatch(request, method, path)
+        except Exception as error:  # the service should answer, the error is given back to the client
+            status, body = 500, {"error": str(error)}
+
+        payload = json.dumps(body).encode()
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(payload)))
+        request.end_headers()
+        request.wfile.write(payload)
+
+        if path in self.latencies:
+            self.latencies[path].add(time.perf_counter() - start)
+
+    def _dispatch(self, request: BaseHTTPRequestHandler, method: str, path: str) -> typing.Tuple[int, typing.Any]:
+        if method == "GET":
+            if path == "/health":
+                return 200, {"status": "ok", "fem": self.fem_pool is not None}
+            if path == "/ratings":
+                return 200, self.library.names()
+            if path == "/metrics":
+                return 200, self.metrics()
+            return 404, {"error": "unknown path: {}".format(path)}
+
+        if path not in self.latencies:
+            return 404, {"error": "unknown path: {}".format(path)}
+
+        length = int(request.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(request.rfile.read(length) or b"null")
+        except ValueError:
+            return 400, {"error": "the body should be a JSON record or a list of records"}
+        single = isinstance(body, dict)
+        records = [body] if single else body
+        if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+            return 400, {"error": "the body should be a JSON record or a list of records"}
+
+        if path == "/fem":
+            if self.fem_pool is None:
+                return 503, {"error": "the FEM evaluation is not available (agrossuite is not installed)"}
+            results = list(self.fem_pool.map(evaluate_fem_record, records))
+        else:
+            results = self.batchers[path].evaluate_many(records)
+
+        if single:
+            return (422 if "error" in results[0] else 200), results[0]
+        return 200, results
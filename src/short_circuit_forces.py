@@ -0,0 +1,292 @@
+import typing
+
+import numpy as np
+from numpy import pi
+
+from src.base_functions import SC_FACTOR_X, SC_FACTOR_Y
+from src.ring_field import CHUNK_ELEMENTS, Filaments, coil_filaments, filament_field, stacked_filament_field
+
+"""
+Short-circuit forces and stresses of the windings from the J x B force density.
+
+The windings carry azimuthal current density, therefore the force density in the cross-section of a winding is
+
+    f_r = J * Bz  (radial, positive outwards),    f_z = -J * Br  (axial, positive upwards)
+
+The force densities are integrated over a regular grid of cells, which covers the cross-section of the winding
+(dV = 2 pi r dr dz), the cell forces are summed into axial sections by a (cells x sections) matrix product. The field
+of the cells can be given by the FEM solution or by the vectorized ring filament model (src.ring_field), where the
+effect of the yokes can be approximated by mirror images. The geometry of the windings can be given by arrays, then
+the cells, the filaments and the forces of the designs are stacked into the leading axis, and the filament model
+evaluates the whole population in one (chunked) tensor operation, which is fast enough for the mechanical screening
+of every candidate design.
+
+The forces are calculated with the nominal current density and scaled by the square of the ratio of the
+short-circuit peak current (sc_current) and the nominal current. From the section forces:
+
+ - the hoop stress is the mean tangential stress of the conductors of the section: F_r / (2 pi A), where A is the
+   conductor cross-section of the section, it is positive (tension) in the outer and negative in the inner winding,
+ - the axial compressive force at the section boundaries is accumulated from the bottom, the resultant axial force
+   is held by the clamping at the end where it points, the compressive stress is given on the conductor area of a
+   horizontal cross-section of the winding.
+
+The coordinates are in [mm], the forces in [N], the stresses in [MPa].
+"""
+
+
+class WindingCells(typing.NamedTuple):
+    r: np.ndarray  # [mm] radial coordinates of the cell centers
+    z: np.ndarray  # [mm] axial coordinates of the cell centers
+    volume: np.ndarray  # [m3] volume of the rings of the cells
+    section: np.ndarray  # index of the axial section of the cells
+    section_z: np.ndarray  # [mm] axial coordinates of the section boundaries (n_sections + 1)
+    inner_radius: typing.Union[float, np.ndarray]  # [mm]
+    thickness: typing.Union[float, np.ndarray]  # [mm]
+
+
+class WindingForces(typing.NamedTuple):
+    z: np.ndarray  # [mm] axial coordinates of the section centers
+    radial: np.ndarray  # [N] radial force of the sections, positive outwards
+    axial: np.ndarray  # [N] axial force of the sections, positive upwards
+    hoop_stress: np.ndarray  # [MPa] mean hoop stress of the sections, positive in tension
+    compressive_force: np.ndarray  # [N] axial compression at the section boundaries, from the bottom to the top
+    compressive_stress: np.ndarray  # [MPa] axial compressive stress at the section boundaries
+
+    @property
+    def max_hoop_stress(self) -> typing.Union[float, np.ndarray]:
+        """[MPa] hoop stress of the largest magnitude, for every design of the stacked forces"""
+        largest = np.argmax(np.abs(self.hoop_stress), axis=-1)[..., np.newaxis]
+        return np.take_along_axis(self.hoop_stress, largest, axis=-1)[..., 0][()]
+
+    @property
+    def max_compressive_stress(self) -> typing.Union[float, np.ndarray]:
+        return np.max(self.compressive_stress, axis=-1)[()]
+
+
+def winding_cells(inner_radius: float, thickness: float, height: float, z0: float, n_sections: int = 20,
+                  n_r: int = 5, n_z: int = 2) -> WindingCells:
+    """
+    Divides the cross-section of a winding into n_sections axial sections and every section into n_r x n_z cells. The
+    geometry parameters are broadcasted, the cells of the designs are given in the last axis.
+
+    :param inner_radius: inner radius of the winding [mm]
+    :param thickness: thickness of the winding [mm]
+    :param height: height of the winding [mm]
+    :param z0: axial coordinate of the bottom of the winding [mm]
+    :param n_sections: number of the axial sections
+    :param n_r: number of the radial cells
+    :param n_z: number of the axial cells in one section
+    """
+    if n_sections < 1 or n_r < 1 or n_z < 1:
+        raise ValueError("the number of the sections and the cells should be positive")
+
+    inner = np.asarray(inner_radius, dtype=float)[..., np.newaxis]
+    dr = np.asarray(thickness, dtype=float)[..., np.newaxis] / n_r
+    dz = np.asarray(height, dtype=float)[..., np.newaxis] / (n_sections * n_z)
+    bottom = np.asarray(z0, dtype=float)[..., np.newaxis]
+
+    # r-major order of the cells, the section of the cells is the same for every design
+    i_r, i_z = np.meshgrid(np.arange(n_r) + 0.5, np.arange(n_sections * n_z) + 0.5, indexing="ij")
+    r, z = np.broadcast_arrays(inner + dr * i_r.ravel(), bottom + dz * i_z.ravel())
+
+    # mm3 -> m3
+    volume = 2.0 * pi * r * dr * dz * 1e-9
+    section = np.tile(np.arange(n_sections * n_z) // n_z, n_r)
+    section_z = bottom + dz * n_z * np.arange(n_sections + 1)
+
+    return WindingCells(r, z, volume, section, section_z, inner_radius, thickness)
+
+
+def winding_forces(cells: WindingCells, b_r, b_z, current_density: float, filling_factor: float,
+                   current_ratio: float = 1.0) -> WindingForces:
+    """
+    Integrates the force density over the cells of a winding, the stacked cells of a population are integrated
+    together, the parameters are broadcasted to the designs.
+
+    :param cells: the cells of the winding
+    :param b_r: radial flux density in the cell centers [T]
+    :param b_z: axial flux density in the cell centers [T]
+    :param current_density: current density of the conductors [A/mm2], negative for the opposite direction
+    :param filling_factor: conductor filling of the winding cross-section [0-1]
+    :param current_ratio: ratio of the calculated and the nominal current, e.g. the short-circuit peak factor
+    """
+    n_sections = cells.section_z.shape[-1] - 1
+    filling_factor = np.asarray(filling_factor, dtype=float)[..., np.newaxis]
+    # [A/m2] mean current density of the cross-section
+    j = np.asarray(current_density, dtype=float)[..., np.newaxis] * filling_factor * 1e6
+    scale = np.asarray(current_ratio, dtype=float)[..., np.newaxis] ** 2.0
+    sections = (cells.section[:, np.newaxis] == np.arange(n_sections)).astype(float)
+
+    radial = (j * np.asarray(b_z) * cells.volume) @ sections * scale
+    axial = (-j * np.asarray(b_r) * cells.volume) @ sections * scale
+
+    # conductor area of a section and of a horizontal cross-section [mm2]
+    thickness = np.asarray(cells.thickness, dtype=float)[..., np.newaxis]
+    section_area = thickness * np.diff(cells.section_z, axis=-1) * filling_factor
+    horizontal_area = 2.0 * pi * (np.asarray(cells.inner_radius)[..., np.newaxis] + thickness / 2.0) * thickness * \
+        filling_factor
+
+    # the resultant axial force is held by the clamping at the end, where it points
+    total = np.sum(axial, axis=-1, keepdims=True)
+    compressive_force = np.concatenate((np.zeros_like(total), np.cumsum(axial, axis=-1)), axis=-1) + \
+        np.maximum(0.0, -total)
+
+    return WindingForces((cells.section_z[..., :-1] + cells.section_z[..., 1:]) / 2.0, radial, axial,
+                         radial / (2.0 * pi * section_area), compressive_force, compressive_force / horizontal_area)
+
+
+def yoke_images(filaments: Filaments, window_height: float, n_images: int = 2) -> Filaments:
+    """
+    Mirror images of the filaments in the yokes, which are approximated by infinitely permeable planes at z = 0 and
+    z = window_height. The images are z + 2 m h and -z + 2 m h, they are taken in n_images periods on both sides.
+    """
+    window_height = np.asarray(window_height, dtype=float)[..., np.newaxis]
+    images = [filaments, Filaments(filaments.r, -filaments.z, filaments.current)]
+    for m in range(1, n_images + 1):
+        shift = 2.0 * window_height * m
+        for z in (filaments.z + shift, filaments.z - shift, shift - filaments.z, -shift - filaments.z):
+            images.append(Filaments(filaments.r, z, filaments.current))
+
+    return Filaments.concatenate(*images)
+
+
+def peak_current_ratio(i_n: float, sci, load_loss, power: float) -> typing.Union[float, np.ndarray]:
+    """
+    Ratio of the peak short-circuit current (sc_current) and the nominal (rms) current of the windings, the impedances
+    and the losses can be the arrays of a population.
+
+    :param i_n: nominal phase current [A]
+    :param sci: short-circuit impedance [%]
+    :param load_loss: dc and ac losses of the windings [kW], without the cooling terms of the superconducting designs
+    :param power: nominal power [kVA]
+    """
+    z = np.asarray(sci, dtype=float) / 100.0
+    r = np.asarray(load_loss, dtype=float) / power
+    x = np.sqrt(np.maximum(z * z - r * r, 0.0))
+    # the peak factor is fitted on the 1 <= x / r <= 100 range
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_r = np.where(r > 0.0, np.clip(x / r, 1.0, 100.0), 100.0)
+    # rounded like sc_factor and sc_current
+    factor = np.round(np.interp(x_r, SC_FACTOR_X, SC_FACTOR_Y), 2)
+    return (np.round(factor * 1.41 * i_n / z, 0) / i_n)[()]
+
+
+class WindingSpec(typing.NamedTuple):
+    # the fields can be the arrays of a population
+    inner_radius: float  # [mm]
+    thickness: float  # [mm]
+    height: float  # [mm]
+    z0: float  # [mm] axial coordinate of the bottom of the winding
+    current_density: float  # [A/mm2] negative for the opposite direction
+    filling_factor: float  # [0-1]
+
+
+def filament_cell_fields(windings: typing.Sequence[WindingSpec], window_height: float = None, n_images: int = 2,
+                         n_sections: int = 20, n_r: int = 5, n_z: int = 2, chunk_elements: int = CHUNK_ELEMENTS
+                         ) -> typing.List[typing.Tuple[WindingCells, np.ndarray, np.ndarray]]:
+    """
+    Flux densities of the ring filament model in the cells of the windings.
+
+    :param windings: the windings, the ampere-turns of the windings should be balanced, the array fields are
+                     evaluated as a stacked population
+    :param window_height: height of the core window [mm], the windings are placed from z = 0, if it is given, the
+                          yokes are considered by n_images mirror images
+    :return: the cells, the radial and the axial flux densities [T] of the windings
+    """
+    sources = []
+    cells = []
+    for winding in windings:
+        amper_turns = winding.current_density * winding.filling_factor * winding.thickness * winding.height
+        # the filaments are placed at the half axial pitch of the cells, the field of a filament is singular in its own
+        # position, and it would be neglected in the coinciding cell centers
+        sources.append(coil_filaments(winding.inner_radius, winding.thickness, winding.height, winding.z0, amper_turns,
+                                      n_r, 2 * n_sections * n_z))
+        cells.append(winding_cells(winding.inner_radius, winding.thickness, winding.height, winding.z0, n_sections,
+                                   n_r, n_z))
+
+    filaments = Filaments.concatenate(*sources)
+    if window_height is not None and n_images > 0:
+        filaments = yoke_images(filaments, window_height, n_images)
+
+    # the cells of all of the windings are evaluated in one pass, the designs of a population in one stacked pass
+    shapes = [np.shape(value)[:-1] for value in [filaments.r] + [c.r for c in cells]]
+    stack = np.broadcast_shapes(*shapes)
+    if stack:
+        def stacked(value):
+            return np.broadcast_to(value, stack + value.shape[-1:])
+
+        filaments = Filaments(*[stacked(value) for value in filaments])
+        b_r, b_z = stacked_filament_field(filaments, np.concatenate([stacked(c.r) for c in cells], axis=-1),
+                                          np.concatenate([stacked(c.z) for c in cells], axis=-1), chunk_elements)
+    else:
+        b_r, b_z = filament_field(filaments, np.concatenate([c.r for c in cells]), np.concatenate([c.z for c in cells]),
+                                  chunk_elements)
+    fields = []
+    start = 0
+    for winding_cells_ in cells:
+        end = start + winding_cells_.r.shape[-1]
+        fields.append((winding_cells_, b_r[..., start:end], b_z[..., start:end]))
+        start = end
+
+    return fields
+
+
+def filament_forces(windings: typing.Sequence[WindingSpec], window_height: float = None, current_ratio: float = 1.0,
+                    n_images: int = 2, n_sections: int = 20, n_r: int = 5, n_z: int = 2,
+                    chunk_elements: int = CHUNK_ELEMENTS) -> typing.List[WindingForces]:
+    """
+    Short-circuit forces of the windings in the field of the ring filament model.
+
+    :param windings: the windings, the ampere-turns of the windings should be balanced
+    :param window_height: height of the core window [mm], the windings are placed from z = 0, if it is given, the
+                          yokes are considered by n_images mirror images
+    :param current_ratio: ratio of the short-circuit peak and the nominal current
+    :return: the forces of the windings
+    """
+    fields = filament_cell_fields(windings, window_height, n_images, n_sections, n_r, n_z, chunk_elements)
+    return [winding_forces(cells, b_r, b_z, winding.current_density, winding.filling_factor, current_ratio)
+            for winding, (cells, b_r, b_z) in zip(windings, fields)]
+
+
+def two_winding_forces(inner: WindingSpec, outer: WindingSpec, window_height: float, current_ratio: float = 1.0,
+                       **kwargs) -> typing.Tuple[WindingForces, WindingForces]:
+    """the forces of the inner (lv) and the outer (hv) winding of a core window"""
+    lv, hv = filament_forces((inner, outer), window_height, current_ratio, **kwargs)
+    return lv, hv
+
+
+def population_forces(design, res: typing.Mapping[str, np.ndarray], n_sections: int = 10, n_r: int = 3,
+                      n_z: int = 2) -> dict:
+    """
+    Short-circuit forces and stresses of the windings for every design of a population, which is evaluated by
+    src.batch_model.evaluate_population. The windings are placed in the core window as in the FEM model, the default
+    discretization is coarser than in filament_forces for the screening, the axial compression is less accurate.
+
+    :param design: the base design, which contains the requirements
+    :param res: the columns of the evaluated population
+    :return: dictionary of the force and stress columns
+    """
+    req = design.required
+    req.lv.calculate_phase_quantities(req.power)
+
+    # the currents of the windings are opposite, the designs are stacked into the leading axis of the cells
+    windings = [WindingSpec(np.asarray(res[prefix + "_inner_radius"], dtype=float),
+                            np.asarray(res[prefix + "_thickness"], dtype=float),
+                            np.asarray(res[prefix + "_height"], dtype=float), req.ei / 2.0,
+                            sign * np.asarray(res[j], dtype=float), ff / 100.0)
+                for prefix, j, sign, ff in (("lv", "j_in", 1.0, req.lv.filling_factor),
+                                            ("hv", "j_ou", -1.0, req.hv.filling_factor))]
+
+    winding_loss = sum(np.asarray(res[prefix + "_dc_loss"]) + np.asarray(res[prefix + "_ac_loss"])
+                       for prefix in ("lv", "hv"))
+    ratio = peak_current_ratio(req.lv.ph_current, res["sci"], winding_loss, req.power)
+    forces = filament_forces(windings, np.asarray(res["wh"], dtype=float), ratio, n_sections=n_sections, n_r=n_r,
+                             n_z=n_z)
+
+    columns = {"sc_peak_ratio": np.asarray(ratio, dtype=float)}
+    for prefix, winding in zip(("lv", "hv"), forces):
+        columns[prefix + "_radial_force"] = np.sum(winding.radial, axis=-1)
+        columns[prefix + "_hoop_stress"] = winding.max_hoop_stress
+        columns[prefix + "_compressive_stress"] = winding.max_compressive_stress
+
+    return columns
@@ -18,6 +18,8 @@ def parallel_loss(bpar, f, C=0.77, ac=0.31 * 4.1 * 1e-6, bp=34.4 * 1e-3):
     Calculates the parallel component of the AC losses.
     BSCCO cable from Magnussons' paper
 
+    The function accepts numpy arrays, the parameters are broadcasted.
+
     :param f: frequency of the AC current [Hz]
     :param C: empirical factor, 0.75
     :param ac: ac is an effective area of the tape which depends on the geometrical configuration of the tape.
@@ -25,11 +27,11 @@ def parallel_loss(bpar, f, C=0.77, ac=0.31 * 4.1 * 1e-6, bp=34.4 * 1e-3):
     :param bp: is the full penetration field, it is fitted on experimental data
     :return:
     """
-    if bpar <= bp:
-        P_par = 2 * f * C * ac * bpar ** 3. / (3. * mu_0 * bp)
-    else:
-        P_par = 2 * f * C * ac * bp / (3. * mu_0) * (3.0 * bpar - 2.0 * bp)
-    return P_par
+    bpar = np.asarray(bpar, dtype=float)
+    P_par = np.where(bpar <= bp,
+                     2 * f * C * ac * np.float_power(bpar, 3.) / (3. * mu_0 * bp),
+                     2 * f * C * ac * bp / (3. * mu_0) * (3.0 * bpar - 2.0 * bp))
+    return P_par[()]
 
 
 def logcosh(x):
@@ -43,6 +45,9 @@ def perp_loss(f, bperp, K=1.35, w=4.1 * 1e-3, bc=15. * 1e-3):
     """
     Default parameters set acc to 10.1109/TASC.2003.813123.
     Ac losses, which generated by the perpendicular component of the magnetic field.
+
+    The function accepts numpy arrays, the loss is zero at zero field.
+
     :param K: geometrical parameters
     :param f: frequency
     :param w: width of the tape
@@ -50,15 +55,19 @@ def perp_loss(f, bperp, K=1.35, w=4.1 * 1e-3, bc=15. * 1e-3):
     :param bperp:
     :return:
     """
-    beta = bperp / bc
+    beta = np.asarray(bperp, dtype=float) / bc
+    zero = beta == 0.0
+    beta = np.where(zero, 1.0, beta)
+
     P_perp = K * f * (w ** 2.0) * pi / mu_0 * bc ** 2.0 * beta * (2.0 / beta * logcosh(beta) - tanh(beta))
 
-    return P_perp
+    return np.where(zero, 0.0, P_perp)[()]
 
 
 def norris_equation(f, I, Ic):
     """
-    Norris equation describes the self-field losses of the conductor for elliptical cross section:
+    Norris equation describes the self-field losses of the conductor for elliptical cross section, the function
+    accepts numpy arrays.
     :param f: frequency
     :param I:
     :param Ic: critical current of the conductor.
@@ -80,24 +89,30 @@ def magnusson_ac_loss(b_ax, b_rad, f, I, Ic=170):
     return parallel_loss(b_ax, f) + perp_loss(f, b_rad) + norris_equation(f, I, Ic)
 
 
-def supra_winding_ac_loss(b_list: list, f, I, Ic=170, kappa=1.2):
+def supra_winding_ac_loss(b_list, f, I, Ic=170, kappa=1.2):
     """
     This calculation is based on the ac loss calculation of the superconducting winding by the Magnusson formula.
 
-    :param b: (bax, brad) list of b pairs
+    More windings can be evaluated at once: b_list can be an (m, n, 2) array of the flux profiles of m windings,
+    then I (and Ic) can be given for every winding as (m,) arrays.
+
+    :param b: (bax, brad) list of b pairs, or array with (..., n, 2) shape
     :param f: frequency
     :param I: current
     :param Ic:critical current of the conductor.
     :param kappa: considers the winding layout, which can reduce the radial losses in the conductors
     :return:
     """
-    pax = 0
-    prad = 0
-    for elem in b_list:
-        pax += parallel_loss(elem[0], f)
-        prad += perp_loss(f, elem[1]) / kappa
+    b = np.asarray(b_list, dtype=float)
+
+    # the cumulative sums are accumulated in the order of the points like the summation in a python loop
+    pax = np.add.accumulate(parallel_loss(b[..., 0], f), axis=-1)[..., -1]
+    prad = np.add.accumulate(perp_loss(f, b[..., 1]) / kappa, axis=-1)[..., -1]
 
-    return round((pax + prad) / len(b_list) + norris_equation(f, I, Ic), 3)
+    loss = (pax + prad) / b.shape[-2] + norris_equation(f, I, Ic)
+    if np.ndim(loss) == 0:
+        return round(float(loss), 3)
+    return np.round(loss, 3)
 
 
 def cryostat_losses(Acr, dT=228.0):
@@ -111,7 +126,7 @@ def cryostat_losses(Acr, dT=228.0):
     k_th = 2.0 * 1e-3  # W/(mK)
     d_th = 50.0 * 1e-3  # mm - thermal insulation thickness
     # the windings considered to work at 65 K -> dT = 293 - 65 = 228
-    return round(k_th / d_th * Acr * 1e-6 * dT, 2)
+    return np.round(k_th / d_th * Acr * 1e-6 * dT, 2)
 
 
 def cryo_surface(r_in, r_ou, h):
@@ -138,7 +153,7 @@ def thermal_incomes(I1p, I2p):
     """
     q_cl = 45.0 * 1e-3  # W/A
 
-    return round(6. * q_cl * (I1p + I2p), 2)
+    return np.round(6. * q_cl * (I1p + I2p), 2)
 
 
 def sc_load_loss(p_ac, pcr, pcl, C=18.0):
@@ -0,0 +1,131 @@
+import typing
+
+import numpy as np
+from numpy import pi
+
+from src.winding_loss_integration import sample_field
+
+"""
+Superposition of the unit-current fields of the windings.
+
+With constant permeabilities the magnetic field is linear in the current densities of the windings, so the field of
+any load case (tap positions, overloads, unbalanced ampere-turns) is the linear combination of the basis fields, where
+the current density of one winding is 1 A/mm2 and the others are zero:
+
+    B(j) = sum_k j_k B_k,        W(j) = j^T E j
+
+The energy matrix E is quadratic in the currents, its diagonal is given by the energies of the basis solutions, the
+off-diagonal (mutual) terms by the solutions of the winding pairs with unit currents:
+
+    E_kk = W_k,    E_kl = (W_kl - W_k - W_l) / 2
+
+The basis fields are sampled once in the cells of the windings, after that the energies, the impedances and the flux
+profiles of any number of load cases are matrix products. The current densities are signed, the hv winding carries
+negative current in the nominal load case.
+"""
+
+
+def energy_matrix(self_energies: typing.Sequence[float],
+                  pair_energies: typing.Mapping[typing.Tuple[int, int], float] = None) -> np.ndarray:
+    """
+    :param self_energies: magnetic energies of the basis solutions [J]
+    :param pair_energies: magnetic energies of the solutions, where both windings of the (k, l) pair carry unit
+                          current density [J], the missing pairs are not coupled
+    :return: the energy matrix [J/(A/mm2)^2]
+    """
+    energy = np.diag(np.asarray(self_energies, dtype=float))
+    for (k, l), value in (pair_energies or {}).items():
+        energy[k, l] = energy[l, k] = (value - energy[k, k] - energy[l, l]) / 2.0
+    return energy
+
+
+class BasisField(typing.NamedTuple):
+    energy: float  # [J] magnetic energy of the solution
+    b_ax: typing.Dict[str, np.ndarray]  # [T] axial flux densities in the sample points of the windings
+    b_rad: typing.Dict[str, np.ndarray]  # [T] radial flux densities
+
+
+def sample_basis(solution, grids: typing.Mapping[str, typing.Any]) -> BasisField:
+    """
+    Reads the energy and samples the flux densities of a FEM solution, the solution is valid only until the next
+    problem is created in agros, so it should be sampled right after the solution.
+
+    :param solution: magnetic solution of the FemModel
+    :param grids: sample points of the windings (with r, z [mm] attributes)
+    """
+    b_ax = {}
+    b_rad = {}
+    for name, grid in grids.items():
+        b_ax[name], b_rad[name] = sample_field(solution, grid)
+    return BasisField(solution.volume_integrals()["Wm"], b_ax, b_rad)
+
+
+class Superposition:
+    """
+    Basis fields of the windings.
+
+    :param names: names of the windings
+    :param basis: the fields of the unit current densities in the order of the windings
+    :param pair_energies: energies of the solutions, where both windings of the (k, l) pair carry unit current density
+    :param grids: sample points of the windings (with r, z [mm] attributes), ordered by radial columns of n_z
+                  points, like the cells of short_circuit_forces.winding_cells
+    :param n_z: number of the axial rows of the grids
+    """
+
+    def __init__(self, names: typing.Sequence[str], basis: typing.Sequence[BasisField],
+                 pair_energies: typing.Mapping[typing.Tuple[int, int], float], grids: typing.Mapping[str, typing.Any],
+                 n_z: int):
+        self.names = list(names)
+        self.energy_matrix = energy_matrix([field.energy for field in basis], pair_energies)
+        self.n_z = n_z
+        self.z = {name: np.asarray(grid.z)[:n_z] for name, grid in grids.items()}
+        # basis fields of the sample points: (n_windings, n_points)
+        self.b_ax = {name: np.array([field.b_ax[name] for field in basis]) for name in grids}
+        self.b_rad = {name: np.array([field.b_rad[name] for field in basis]) for name in grids}
+
+    def energy(self, j) -> np.ndarray:
+        """
+        :param j: current densities of the windings [A/mm2], in the shape of (..., n_windings)
+        :return: the magnetic energies of the load cases [J]
+        """
+        j = np.asarray(j, dtype=float)
+        return np.einsum("...k,kl,...l->...", j, self.energy_matrix, j)
+
+    def flux(self, j, name: str) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """the axial and the radial flux densities [T] in the sample points of a winding, (..., n_points)"""
+        j = np.asarray(j, dtype=float)
+        return j @ self.b_ax[name], j @ self.b_rad[name]
+
+    def flux_profile(self, j, name: str) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """the maximal absolute axial and radial flux densities [T] of the axial rows of a winding, (..., n_z)"""
+        b_ax, b_rad = self.flux(j, name)
+        shape = b_ax.shape[:-1] + (-1, self.n_z)
+        return np.abs(b_ax.reshape(shape)).max(axis=-2), np.abs(b_rad.reshape(shape)).max(axis=-2)
+
+
+def load_case_columns(basis: Superposition, j_lv, j_hv, hv_factor, freq: float, power: float,
+                      hv_line_voltage: float) -> dict:
+    """
+    Energies, short-circuit impedances and peak flux densities of the load cases of a two winding transformer, the
+    parameters are broadcasted.
+
+    :param j_lv: current density of the lv winding [A/mm2]
+    :param j_hv: current density of the hv winding [A/mm2], negative for the opposite direction
+    :param hv_factor: the ratio of the hv current and the nominal current, the impedance is referred to this current
+    :param freq: frequency [Hz]
+    :param power: nominal power [kVA]
+    :param hv_line_voltage: line voltage of the hv winding [kV]
+    """
+    j = np.stack(np.broadcast_arrays(np.asarray(j_lv, dtype=float), np.asarray(j_hv, dtype=float)), axis=-1)
+    res = {"magnetic_energy": basis.energy(j)}
+
+    # the base quantities of TwoWindingModel.fem_simulation
+    z_b = hv_line_voltage ** 2.0 / (power / 1000.0)
+    i_b = power / hv_line_voltage / 3. ** 0.5 * np.asarray(hv_factor, dtype=float)
+    res["fem_based_sci"] = 2.0 * pi * freq * 2.0 * res["magnetic_energy"] / i_b ** 2.0 / z_b * 100.0
+
+    for name in basis.names:
+        b_ax, b_rad = basis.flux_profile(j, name)
+        res["fem_bax_" + name] = b_ax.max(axis=-1) * 1e3  # [mT]
+        res["fem_brad_" + name] = b_rad.max(axis=-1) * 1e3
+    return res
@@ -0,0 +1,169 @@
+import typing
+from dataclasses import dataclass, field
+
+import numpy as np
+from dataclasses_json import dataclass_json
+from numpy import pi
+
+from src.models import TransformerDesign, WindingDesign
+
+"""
+Lumped thermal model of the oil immersed, naturally cooled (ONAN) transformers.
+
+The thermal network has three levels, which are connected in series, therefore it is solved in closed form for every
+design of a population:
+
+ - tank and radiators: the total loss is dissipated from the oil to the ambient air,
+       P = h_t * A_t * dT_mo^(1 / x)      -> mean oil rise dT_mo = (P / (h_t A_t))^x
+   the cooling surface A_t is the side surface of the tank, which is estimated from the active part, multiplied by the
+   cooling factor of the radiators, the top-oil rise is dT_to = k_to * dT_mo,
+ - winding to oil: the loss of a winding leaves on its wetted vertical surfaces (the inner and outer surfaces, and the
+   two sides of the axial oil ducts, which are placed at every duct_pitch of the winding build, less the spacers),
+       q = P_w / A_w,   g = (q / h_w)^y      -> average winding to oil gradient
+ - hot-spot: dT_hs = dT_to + H * g, by the hot-spot factor H of IEC 60076-7.
+
+The average winding rise is dT_mo + g. The losses are in [kW] for the three phases (as in the WindingDesign and the
+columnar model), the geometry in [mm], the temperatures in [K] / [C].
+"""
+
+
+@dataclass_json
+@dataclass
+class ThermalParameters:
+    ambient: float = field(default=20.0)  # [C] ambient temperature
+    tank_htc: float = field(default=2.6)  # [W/m2/K^(1/x)] heat transfer coefficient of the tank and the radiators
+    cooling_factor: float = field(default=14.0)  # the ratio of the cooling surface and the side surface of the tank
+    tank_clearance: float = field(default=200.0)  # [mm] distance between the active part and the tank walls
+    oil_exponent: float = field(default=0.8)  # x, exponent of the mean oil rise
+    top_oil_factor: float = field(default=1.2)  # the ratio of the top-oil and the mean oil rise
+    winding_htc: float = field(default=60.0)  # [W/m2/K^(1/y)] heat transfer coefficient of the winding surfaces
+    winding_exponent: float = field(default=0.8)  # y, exponent of the winding gradient
+    duct_pitch: float = field(default=40.0)  # [mm] radial build of the winding between two axial oil ducts
+    wetted_fraction: float = field(default=0.7)  # the part of the winding surfaces, which is not covered by spacers
+    hot_spot_factor: float = field(default=1.3)  # H
+    # the limits of the temperature rises of IEC 60076-2 and the hot-spot temperature of the normal ageing
+    top_oil_rise_max: float = field(default=60.0)  # [K]
+    winding_rise_max: float = field(default=65.0)  # [K]
+    hot_spot_max: float = field(default=98.0)  # [C]
+
+
+class WindingTemperatures(typing.NamedTuple):
+    gradient: typing.Any  # [K] average winding to oil gradient
+    winding_rise: typing.Any  # [K] average winding temperature rise
+    hot_spot: typing.Any  # [C] hot-spot temperature
+
+
+class ThermalResults(typing.NamedTuple):
+    mean_oil_rise: typing.Any  # [K]
+    top_oil_rise: typing.Any  # [K]
+    lv: WindingTemperatures
+    hv: WindingTemperatures
+    feasible: typing.Any
+
+    @property
+    def hot_spot(self):
+        """[C] the hottest point of the windings"""
+        return np.maximum(self.lv.hot_spot, self.hv.hot_spot)
+
+    def columns(self) -> dict:
+        """the results in the column format of the batch model"""
+        res = {"mean_oil_rise": self.mean_oil_rise, "top_oil_rise": self.top_oil_rise, "hot_spot": self.hot_spot,
+               "thermal_feasible": self.feasible}
+        for prefix, winding in (("lv", self.lv), ("hv", self.hv)):
+            res.update({prefix + "_" + name: value for name, value in winding._asdict().items()})
+        return res
+
+
+def tank_cooling_surface(hv_outer_radius, wh, rc, phase_distance: float,
+                         params: ThermalParameters = ThermalParameters()):
+    """
+    Cooling surface [m2] of the tank and the radiators. The tank is fitted to the three phases of the active part with
+    the clearance, its height contains the two yokes.
+
+    :param hv_outer_radius: outer radius of the hv winding [mm]
+    :param wh: height of the core window [mm]
+    :param rc: radius of the core [mm]
+    :param phase_distance: distance between the hv windings of the neighbouring phases [mm]
+    """
+    length = 6.0 * hv_outer_radius + 2.0 * phase_distance + 2.0 * params.tank_clearance
+    width = 2.0 * hv_outer_radius + 2.0 * params.tank_clearance
+    height = wh + 4.0 * rc + params.tank_clearance
+    return 2.0 * (length + width) * height * 1e-6 * params.cooling_factor
+
+
+def winding_cooling_surface(inner_radius, thickness, height, params: ThermalParameters = ThermalParameters()):
+    """
+    Wetted surface [m2] of one phase of a winding: the inner and the outer surfaces, and the two sides of the axial
+    ducts, which divide the winding into the sections of duct_pitch.
+    """
+    n_ducts = np.maximum(np.ceil(np.asarray(thickness) / params.duct_pitch) - 1.0, 0.0)
+    # the mean radius of the uniformly placed ducts is the mean radius of the winding, both sides are cooled
+    return 2.0 * pi * (2.0 * inner_radius + thickness) * (1.0 + n_ducts) * height * 1e-6 * params.wetted_fraction
+
+
+def oil_rise(total_loss, cooling_surface, params: ThermalParameters = ThermalParameters()) -> tuple:
+    """
+    :param total_loss: the sum of the no-load and the load losses [kW]
+    :param cooling_surface: cooling surface of the tank and the radiators [m2]
+    :return: the mean oil and the top-oil rise [K]
+    """
+    mean_oil_rise = (np.asarray(total_loss) * 1e3 / (params.tank_htc * cooling_surface)) ** params.oil_exponent
+    return mean_oil_rise, params.top_oil_factor * mean_oil_rise
+
+
+def winding_temperatures(loss, cooling_surface, mean_oil_rise, top_oil_rise,
+                         params: ThermalParameters = ThermalParameters()) -> WindingTemperatures:
+    """
+    :param loss: the dc and ac losses of the winding in the three phases [kW]
+    :param cooling_surface: the wetted surface of one phase of the winding [m2]
+    """
+    heat_flux = np.asarray(loss) * 1e3 / 3.0 / cooling_surface
+    gradient = (heat_flux / params.winding_htc) ** params.winding_exponent
+    return WindingTemperatures(gradient, mean_oil_rise + gradient,
+                               params.ambient + top_oil_rise + params.hot_spot_factor * gradient)
+
+
+def thermal_network(core_loss, lv: typing.Mapping[str, typing.Any], hv: typing.Mapping[str, typing.Any], wh, rc,
+                    phase_distance: float, params: ThermalParameters = ThermalParameters()) -> ThermalResults:
+    """
+    Temperature rises of a design or of a population of designs, the parameters are broadcasted.
+
+    :param core_loss: no-load loss [kW]
+    :param lv: inner_radius, thickness, height [mm] and loss [kW] of the lv winding
+    :param hv: the same parameters of the hv winding
+    :param wh: height of the core window [mm]
+    :param rc: radius of the core [mm]
+    :param phase_distance: distance between the hv windings of the neighbouring phases [mm]
+    """
+    tank = tank_cooling_surface(hv["inner_radius"] + hv["thickness"], wh, rc, phase_distance, params)
+    mean_oil_rise, top_oil_rise = oil_rise(core_loss + lv["loss"] + hv["loss"], tank, params)
+
+    windings = [winding_temperatures(w["loss"], winding_cooling_surface(w["inner_radius"], w["thickness"],
+                                                                        w["height"], params),
+                                     mean_oil_rise, top_oil_rise, params) for w in (lv, hv)]
+
+    feasible = top_oil_rise <= params.top_oil_rise_max
+    for winding in windings:
+        feasible = feasible & (winding.winding_rise <= params.winding_rise_max) & \
+                   (winding.hot_spot <= params.hot_spot_max)
+
+    return ThermalResults(mean_oil_rise, top_oil_rise, windings[0], windings[1], feasible)
+
+
+def population_thermal(design: TransformerDesign, res: typing.Mapping[str, typing.Any],
+                       params: ThermalParameters = ThermalParameters()) -> ThermalResults:
+    """the thermal model of a population, which is evaluated by src.batch_model.evaluate_population"""
+    windings = [{"inner_radius": res[prefix + "_inner_radius"], "thickness": res[prefix + "_thickness"],
+                 "height": res[prefix + "_height"], "loss": res[prefix + "_dc_loss"] + res[prefix + "_ac_loss"]}
+                for prefix in ("lv", "hv")]
+    return thermal_network(res["core_loss"], windings[0], windings[1], res["wh"], res["rc"],
+                           design.required.phase_distance, params)
+
+
+def design_thermal(design: TransformerDesign, lv: WindingDesign, hv: WindingDesign, core_loss: float, wh: float,
+                   params: ThermalParameters = ThermalParameters()) -> ThermalResults:
+    """the thermal model of a single design, from the calculated windings (e.g. of the TwoWindingModel)"""
+    windings = [{"inner_radius": w.inner_radius, "thickness": w.thickness, "height": w.winding_height,
+                 "loss": w.dc_loss + w.ac_loss} for w in (lv, hv)]
+    return thermal_network(core_loss, windings[0], windings[1], wh, design.design_params.rc,
+                           design.required.phase_distance, params)
@@ -1,10 +1,18 @@
+import typing
+
 from agrossuite import agros
 
+from src.fem_fidelity import FemFidelity, get_fidelity
+
 
 class FemModel:
     """The goal of this class is to build a basic 2d axisymmetric model for transformer simulation in Agros Suite"""
 
-    def __init__(self):
+    def __init__(self, fidelity: typing.Union[str, FemFidelity] = "standard"):
+        """
+        @param fidelity: name of a fidelity level (screening, standard, verification) or a FemFidelity setting
+        """
+        fidelity = get_fidelity(fidelity)
 
         self.problem = agros.problem(clear=True)
         self.geo = self.problem.geometry()
@@ -14,13 +22,18 @@ class FemModel:
 
         self.magnetic = self.problem.field("magnetic")
         self.magnetic.analysis_type = "steadystate"
-        self.magnetic.number_of_refinements = 1
-        self.magnetic.polynomial_order = 2
-        self.magnetic.adaptivity_type = "disabled"
+        self.magnetic.number_of_refinements = fidelity.number_of_refinements
+        self.magnetic.polynomial_order = fidelity.polynomial_order
+        self.magnetic.adaptivity_type = fidelity.adaptivity_type
+        if fidelity.adaptivity_type != "disabled":
+            self.magnetic.adaptivity_parameters["steps"] = fidelity.adaptivity_steps
+            self.magnetic.adaptivity_parameters["tolerance"] = fidelity.adaptivity_tolerance
         self.magnetic.solver = "linear"
 
         # boundaries
         self.magnetic.add_boundary("A = 0", "magnetic_potential", {"magnetic_potential_real": 0})
+        # the flux lines are perpendicular to the symmetry plane
+        self.magnetic.add_boundary("Symmetry", "magnetic_surface_current", {"magnetic_surface_current_real": 0})
 
         # materials
         self.magnetic.add_material(
@@ -55,7 +68,8 @@ class FemModel:
             },
         )
 
-    def create_rectangle(self, x0: float, y0: float, width: float, height: float, boundary: dict = None):
+    def create_rectangle(self, x0: float, y0: float, width: float, height: float, boundary: dict = None,
+                         open_top: bool = False):
         """
         A rectangle class to define the windings and the working window of the transformer.
 
@@ -65,6 +79,7 @@ class FemModel:
         @param height: height of the rectangle
         @param width: width of the rectangle
         @param boundary: boundary conditions, dictionary like that: {"magnetic":"A = 0"}
+        @param open_top: the top edge is not created, it is the part of the symmetry line of a half model
 
         The rectangle has the same bondary condition in all edges.
         """
@@ -80,19 +95,33 @@ class FemModel:
 
             self.geo.add_edge(x0, y0, x0 + width, y0, boundaries=boundary)
             self.geo.add_edge(x0 + width, y0, x0 + width, y0 + height, boundaries=boundary)
-            self.geo.add_edge(x0 + width, y0 + height, x0, y0 + height, boundaries=boundary)
+            if not open_top:
+                self.geo.add_edge(x0 + width, y0 + height, x0, y0 + height, boundaries=boundary)
             self.geo.add_edge(x0, y0 + height, x0, y0, boundaries=boundary)
 
         else:
 
             self.geo.add_edge(x0, y0, x0 + width, y0)
             self.geo.add_edge(x0 + width, y0, x0 + width, y0 + height)
-            self.geo.add_edge(x0 + width, y0 + height, x0, y0 + height)
+            if not open_top:
+                self.geo.add_edge(x0 + width, y0 + height, x0, y0 + height)
             self.geo.add_edge(x0, y0 + height, x0, y0)
 
         return x0 + width / 2.0, y0 + height / 2.0  # gives back the center of the rectangle in [m]-s
 
-    def create_winding(self, x0: float, y0: float, width: float, height: float, name: str, filling_f: float, j: float):
+    def create_symmetry_line(self, y: float, x_points: typing.Iterable[float]):
+        """
+        Horizontal symmetry line of a half model, it is divided at the corners of the open rectangles.
+
+        @param y: y coordinate of the line
+        @param x_points: x coordinates of the end points and the corners on the line
+        """
+        x_points = sorted(set(x_points))
+        for x_start, x_end in zip(x_points[:-1], x_points[1:]):
+            self.geo.add_edge(x_start * 1e-3, y * 1e-3, x_end * 1e-3, y * 1e-3, boundaries={"magnetic": "Symmetry"})
+
+    def create_winding(self, x0: float, y0: float, width: float, height: float, name: str, filling_f: float, j: float,
+                       open_top: bool = False):
         """
         @param geo: geometry object
         @param x0: x coordinate of the bottom - left node
@@ -102,9 +131,10 @@ class FemModel:
         @param name: name of the winding
         @param filling_f: filling factor, between [0--1]
         @param j: current density in A/mm2
+        @param open_top: the winding is cut by the symmetry line of a half model
         """
 
-        x_label, y_label = self.create_rectangle(x0, y0, width, height)
+        x_label, y_label = self.create_rectangle(x0, y0, width, height, open_top=open_top)
         # print(x0, y0, width, height)
         self.magnetic.add_material(
             name,
@@ -2,6 +2,7 @@ import typing
 from dataclasses import dataclass, field
 from math import pi
 
+import numpy as np
 from dataclasses_json import dataclass_json
 
 from src.base_functions import turn_voltage, calc_inner_width, inner_winding_radius, outer_winding_radius, \
@@ -9,13 +10,23 @@ from src.base_functions import turn_voltage, calc_inner_width, inner_winding_rad
 
 from src.models import MainResults, TransformerDesign, WindingDesign
 from src.transformer_fem_model import FemModel
+from src.fem_fidelity import FemFidelity
+from src.fem_symmetry import MirroredSolution, midplane
+from src.superposition import Superposition, load_case_columns, sample_basis
 from src.superconductor_losses import cryostat_losses, sc_load_loss, cryo_surface, thermal_incomes
+from src.winding_loss_integration import PancakeLosses, pancake_losses, sample_field, winding_grid
+from src.harmonic_losses import HARMONIC_ORDERS, HarmonicLosses, winding_harmonics
+from src.short_circuit_forces import WindingForces, peak_current_ratio, winding_cells, winding_forces
+from src.instrumentation import count, record, stages
 from src.diagrams import plot_winding_flux
 
 C_WIN_MIN = 10.0  # [mm] technological limit for the thickness of the windings, it should be larger than 10 mm-s
 SC_WIN_MIN = 8.0  # [mm] sc_transformer winding minimum
+PANCAKE_PITCH = 5.0  # [mm] axial pitch of the pancakes, tape width + spacer
 INFEASIBLE = -1
 CORE_BF = 1.2  # building factor of the core
+WINDING_LABELS = {"lv": 2, "hv": 3}  # indices of the winding labels in the FEM model, after the air and the core
+RADIAL_FORCE_INTEGRAL = "Flr"  # [N] volume integral of the radial Lorentz force of a label
 
 
 @dataclass_json
@@ -34,6 +45,11 @@ class TwoWindingModel:
         :param is_sc: True if superconducting transformer considered
         :return: feasible (boolean)
         """
+        with stages("calculate") as stage:
+            self._calculate(is_sc, stage)
+
+    def _calculate(self, is_sc, stage):
+        stage("dimensions")
         # 1) phase power, assumes a 3 phased 3 legged transformer core
         ph_power = self.input.required.power / 3.0  # [kVA]
 
@@ -70,6 +86,7 @@ class TwoWindingModel:
         r_ou = outer_winding_radius(r_in, t_in, self.input.design_params.m_gap, t_ou)
 
         # calculating the detailed parameters of the winding
+        stage("windings")
         self.lv_winding = WindingDesign(
             inner_radius=round(r_in - t_in / 2.0, 1),
             thickness=t_in,
@@ -105,6 +122,7 @@ class TwoWindingModel:
             self.hv_winding.calc_properties()
 
         # window width and window heights
+        stage("core")
         self.results.window_width = window_width(
             self.input.required.min_core_gap, t_in, t_ou, self.input.design_params.m_gap, 0, 0
         )
@@ -122,11 +140,8 @@ class TwoWindingModel:
         )
         self.results.core_loss = core_loss_unit(self.input.design_params.bc, self.results.core_mass, CORE_BF)
 
-        self.results.load_loss = round(
-            self.lv_winding.ac_loss + self.lv_winding.dc_loss + self.hv_winding.ac_loss + self.hv_winding.dc_loss, 2
-        )
-
         # short circuit impedance calculation with analytical formulas
+        stage("sci")
         self.results.sci = short_circuit_impedance(
             self.input.required.power,
             3.0,
@@ -142,10 +157,28 @@ class TwoWindingModel:
             self.input.design_params.m_gap,
         )
 
+        stage("cost")
+        self._load_loss_and_cost(is_sc)
+
+        self.results.lv_mass = self.lv_winding.mass
+        self.results.hv_mass = self.hv_winding.mass
+        self.results.copper_mass = self.lv_winding.mass + self.hv_winding.mass
+        self.results.feasible = True
+
+    def _load_loss_and_cost(self, is_sc: bool):
+        """updates the load loss and the capitalized cost from the losses of the windings"""
+        self.results.load_loss = round(
+            self.lv_winding.ac_loss + self.lv_winding.dc_loss + self.hv_winding.ac_loss + self.hv_winding.dc_loss, 2
+        )
+
         if is_sc:
             # there are significant losses generated by the cryostat and in the current leads
-            # the approximate surface of the cryostat
-            a_cs = cryo_surface(r_in, r_ou + self.input.design_params.m_gap, h_ou)  # [m2]
+            # the approximate surface of the cryostat, from the mean radii of the windings
+            m_gap = self.input.design_params.m_gap
+            r_in = inner_winding_radius(self.input.design_params.rc, self.input.required.min_core_gap,
+                                        self.lv_winding.thickness)
+            r_ou = outer_winding_radius(r_in, self.lv_winding.thickness, m_gap, self.hv_winding.thickness)
+            a_cs = cryo_surface(r_in, r_ou + m_gap, self.hv_winding.winding_height)  # [m2]
             cryo_loss = cryostat_losses(a_cs)
             thermal_loss = thermal_incomes(self.input.required.lv.ph_current, self.input.required.hv.ph_current)
 
@@ -164,28 +197,50 @@ class TwoWindingModel:
             self.results.core_loss,
             self.input.costs.nll_cost,
         )
-        self.results.copper_mass = self.lv_winding.mass + self.hv_winding.mass
-        self.results.feasible = True
 
-    def fem_simulation(self, detailed_output=True):
+    def fem_simulation(self, detailed_output=True, fidelity: typing.Union[str, FemFidelity] = "standard",
+                       symmetry: bool = False):
+        """
+        :param detailed_output: plots the flux densities along the windings
+        :param fidelity: fidelity level of the FEM model (screening, standard, verification) or a FemFidelity
+        :param symmetry: only the lower half of the window is modelled, if the windings are centred in the window
+        """
         if not self.results.feasible:
             raise ValueError("Invalid Transformer Geometry")
 
+        with stages("fem_simulation") as stage:
+            self._fem_simulation(detailed_output, fidelity, symmetry, stage)
+
+    def _build_fem_model(self, fidelity, symmetry: bool, j_lv: float,
+                         j_hv: float) -> typing.Tuple[FemModel, typing.Optional[float]]:
+        """
+        Builds the FEM model of the core window with the given current densities of the windings [A/mm2].
+
+        :return: the model and the axial coordinate of the symmetry plane of the half model (None for the full model)
+        """
         # initializing the model
-        simulation = FemModel()
+        simulation = FemModel(fidelity)
+
+        rc = self.input.design_params.rc
+        z0 = self.input.required.ei / 2.0 + rc
+        plane = None
+        if symmetry:
+            plane = midplane(rc, self.results.wh, [(z0, self.lv_winding.winding_height),
+                                                   (z0, self.hv_winding.winding_height)])
+        half = plane is not None
+        record("fem_symmetry", half_model=half)
+        # the heights are cut by the symmetry plane in the half model
+        scale = 0.5 if half else 1.0
 
         # # creating the core window and the two windings
-        simulation.create_rectangle(self.input.design_params.rc, self.input.design_params.rc, self.results.window_width,
-                                    self.results.wh, None)
+        simulation.create_rectangle(rc, rc, self.results.window_width, self.results.wh * scale, None, open_top=half)
 
         # label for the air/oil region in the transformer
-        simulation.geo.add_label((self.input.design_params.rc + 20) * 1e-3, (self.input.design_params.rc + 10) * 1e-3,
-                                 materials={"magnetic": "Air"})
+        simulation.geo.add_label((rc + 20) * 1e-3, (rc + 10) * 1e-3, materials={"magnetic": "Air"})
 
         # core
-        simulation.create_rectangle(0, 0, self.results.window_width + 2 * self.input.design_params.rc,
-                                    self.results.wh + 2 * self.input.design_params.rc,
-                                    {"magnetic": "A = 0"})
+        simulation.create_rectangle(0, 0, self.results.window_width + 2 * rc, (self.results.wh + 2 * rc) * scale,
+                                    {"magnetic": "A = 0"}, open_top=half)
 
         # label for the air/oil region in the transformer
         simulation.geo.add_label(0.01, 1e-3, materials={"magnetic": "Core"})
@@ -193,27 +248,54 @@ class TwoWindingModel:
         # windings
         simulation.create_winding(
             self.lv_winding.inner_radius,
-            self.input.required.ei / 2.0 + self.input.design_params.rc,
+            z0,
             self.lv_winding.thickness,
-            self.lv_winding.winding_height,
+            self.lv_winding.winding_height * scale,
             "lv",
             self.lv_winding.filling_factor / 100.0,
-            self.lv_winding.current_density,
+            j_lv,
+            open_top=half,
         )
 
         simulation.create_winding(
             self.hv_winding.inner_radius,
-            self.input.required.ei / 2.0 + self.input.design_params.rc,
+            z0,
             self.hv_winding.thickness,
-            self.hv_winding.winding_height,
+            self.hv_winding.winding_height * scale,
             "hv",
             self.hv_winding.filling_factor / 100.0,
-            -self.hv_winding.current_density,
+            j_hv,
+            open_top=half,
         )
 
+        if half:
+            simulation.create_symmetry_line(plane, (0, rc, self.lv_winding.inner_radius,
+                                                    self.lv_winding.inner_radius + self.lv_winding.thickness,
+                                                    self.hv_winding.inner_radius,
+                                                    self.hv_winding.inner_radius + self.hv_winding.thickness,
+                                                    rc + self.results.window_width,
+                                                    2 * rc + self.results.window_width))
+
+        return simulation, plane
+
+    def _solve_fem_model(self, simulation: FemModel, plane: typing.Optional[float]):
         computation = simulation.problem.computation()
         computation.solve()
+        count("fem.solve")
         solution = computation.solution("magnetic")
+        if plane is not None:
+            # the field and the integrals of the whole window
+            solution = MirroredSolution(solution, plane)
+        return solution
+
+    def _fem_simulation(self, detailed_output, fidelity, symmetry, stage):
+        stage("build")
+        simulation, plane = self._build_fem_model(fidelity, symmetry, self.lv_winding.current_density,
+                                                  -self.hv_winding.current_density)
+
+        stage("solve")
+        solution = self._solve_fem_model(simulation, plane)
+        self.fem_solution = solution
 
         # calculate the base quantites for the LV winding
         self.input.required.lv.calculate_phase_quantities(self.input.required.power)
@@ -224,16 +306,19 @@ class TwoWindingModel:
         z_b = u_b ** 2.0 / s_b  # base impedance
         i_b = self.input.required.power / u_b / 3. ** 0.5
 
+        stage("volume_integrals")
         omega = 2.0 * pi * self.input.required.freq
-        L = 2 * solution.volume_integrals()["Wm"] / i_b ** 2.0
-        print('Magnetic Energy', solution.volume_integrals()["Wm"])
-        print('zb, ib:', round(z_b, 2), 'ohm', round(i_b, 2), 'A')
+        magnetic_energy = solution.volume_integrals()["Wm"]
+        count("fem.volume_integrals")
+        L = 2 * magnetic_energy / i_b ** 2.0
 
         self.results.fem_based_sci = round(omega * L / z_b * 100.0, 2)  # the short-circuit impedance in [%] values
-        print('SCI:', self.results.fem_based_sci, '[%]')
+        record("fem_sci", magnetic_energy=magnetic_energy, z_b=z_b, i_b=i_b, fem_based_sci=self.results.fem_based_sci)
         # axial and radial components of the magnetic flux densities along the inner radius of the hv winding
 
         # iterates over on horizontal slices in the hv winding and the lv winding to collect the required flux data
+        stage("sample_hv")
+        n_points = 0
         self.results.fem_bax_hv = []
         self.results.fem_brad_hv = []
 
@@ -249,6 +334,7 @@ class TwoWindingModel:
             for j in range(int(self.hv_winding.inner_radius),
                            int(self.hv_winding.inner_radius + self.hv_winding.thickness), 1):
                 point = solution.local_values(j * 1e-3, i * 1e-3)
+                n_points += 1
 
                 max_rad = max(abs(point["Brr"]), max_rad)
                 max_ax = max(abs(point["Brz"]), max_ax)
@@ -262,7 +348,11 @@ class TwoWindingModel:
         # create a common list from bax and brad values
         self.results.br_bax_hv = list(zip(self.results.fem_bax_hv, self.results.fem_brad_hv))
 
+        count("fem.field_points", n_points)
+
         # collecting the critical points from the lv winding
+        stage("sample_lv")
+        n_points = 0
         self.results.fem_bax_lv = []
         self.results.fem_brad_lv = []
 
@@ -278,6 +368,7 @@ class TwoWindingModel:
             for j in range(int(self.lv_winding.inner_radius),
                            int(self.lv_winding.inner_radius + self.lv_winding.thickness), 5):
                 point = solution.local_values(j * 1e-3, i * 1e-3)
+                n_points += 1
                 max_rad = max(abs(point["Brr"]), max_rad)
                 max_ax = max(abs(point["Brz"]), max_ax)
 
@@ -287,6 +378,8 @@ class TwoWindingModel:
 
             i += dz
 
+        count("fem.field_points", n_points)
+
         # create a common list from bax and brad values
         self.results.br_bax_lv = list(zip(self.results.fem_bax_lv, self.results.fem_brad_lv))
 
@@ -297,14 +390,171 @@ class TwoWindingModel:
         self.results.fem_brad_lv = max(self.results.fem_brad_lv)
         self.results.fem_bax_lv = max(self.results.fem_bax_lv)
 
-        print('Bax  [HV] =', self.results.fem_bax_hv, '[mT]')
-        print('Brad [HV] =', self.results.fem_brad_hv, '[mT]')
-
-        print('Bax  [LV] =', self.results.fem_bax_lv, '[mT]')
-        print('Brad [Lv] =', self.results.fem_brad_lv, '[mT]')
+        record("fem_flux", fem_bax_hv=self.results.fem_bax_hv, fem_brad_hv=self.results.fem_brad_hv,
+               fem_bax_lv=self.results.fem_bax_lv, fem_brad_lv=self.results.fem_brad_lv)  # [mT]
 
         if detailed_output:
+            stage("plot")
             # print('Values along the hv winding:', list(self.results.br_bax_hv))
             # print('Values along the lv winding:', list(self.results.br_bax_lv))
             plot_winding_flux(self.results.br_bax_lv, 0, self.lv_winding.winding_height, label='LV')
             plot_winding_flux(self.results.br_bax_hv, 0, self.hv_winding.winding_height, label='HV')
+
+    def fem_basis(self, fidelity: typing.Union[str, FemFidelity] = "standard", symmetry: bool = False,
+                  n_sections: int = 20, n_r: int = 5, n_z: int = 1) -> Superposition:
+        """
+        Solves the FEM model with unit current density in each of the windings, and in both windings for the mutual
+        energy. The basis fields are sampled in the cells of the windings, the load cases are evaluated by
+        superposed_load_cases.
+
+        :param fidelity: fidelity level of the FEM model
+        :param symmetry: only the lower half of the window is modelled, if the windings are centred in the window
+        :param n_sections: number of the axial sections of the windings
+        :param n_r: number of the radial sample points
+        :param n_z: number of the axial sample points in one section
+        """
+        if not self.results.feasible:
+            raise ValueError("Invalid Transformer Geometry")
+
+        z0 = self.input.design_params.rc + self.input.required.ei / 2.0
+        grids = {name: winding_cells(winding.inner_radius, winding.thickness, winding.winding_height, z0, n_sections,
+                                     n_r, n_z) for name, winding in (("lv", self.lv_winding), ("hv", self.hv_winding))}
+
+        basis = []
+        with stages("fem_basis") as stage:
+            for j_lv, j_hv, sampled in ((1.0, 0.0, grids), (0.0, 1.0, grids), (1.0, 1.0, {})):
+                stage("solve")
+                simulation, plane = self._build_fem_model(fidelity, symmetry, j_lv, j_hv)
+                solution = self._solve_fem_model(simulation, plane)
+                stage("sample")
+                basis.append(sample_basis(solution, sampled))
+
+        return Superposition(("lv", "hv"), basis[:2], {(0, 1): basis[2].energy}, grids, n_sections * n_z)
+
+    def superposed_load_cases(self, basis: Superposition, lv_factor: typing.Any = 1.0,
+                              hv_factor: typing.Any = 1.0) -> dict:
+        """
+        Energies, impedances and peak flux densities of load cases from the basis fields, the load cases are given by
+        the ratios of the winding currents and the nominal currents (scalars or arrays), e.g. overloads by equal
+        factors, tap positions and unbalanced ampere-turns by different factors.
+
+        :return: dictionary of the magnetic_energy, fem_based_sci, fem_bax_lv, ... columns
+        """
+        return load_case_columns(basis, np.multiply(lv_factor, self.lv_winding.current_density),
+                                 np.multiply(hv_factor, -self.hv_winding.current_density), hv_factor,
+                                 self.input.required.freq, self.input.required.power,
+                                 self.input.required.hv.line_voltage)
+
+    def sc_winding_losses(self, I_lv: float, I_hv: float, Ic: typing.Any = 170.0, n_r: int = 20,
+                          n_z: int = 5) -> typing.Tuple[PancakeLosses, PancakeLosses]:
+        """
+        Integrates the ac losses of the superconducting windings over the field of the last FEM solution, the ac
+        losses of the windings are updated by the sum of the pancake losses of the three phases, the load loss and the
+        capitalized cost are recalculated like in calculate(is_sc=True).
+
+        :param I_lv: current of the tapes in the lv winding [A]
+        :param I_hv: current of the tapes in the hv winding [A]
+        :param Ic: critical current of the tape, or a CriticalCurrentMap for the field dependent critical current
+        :param n_r: number of the radial sample points
+        :param n_z: number of the axial sample points in one pancake
+        :return: the pancake losses of the lv and the hv windings
+        :raises ValueError: if the tape current reaches the critical current in a winding, the model is not modified
+        """
+        if getattr(self, "fem_solution", None) is None:
+            raise ValueError("The FEM simulation should be performed before the loss integration.")
+
+        z0 = self.input.design_params.rc + self.input.required.ei / 2.0
+        losses = []
+        for winding, current in ((self.lv_winding, I_lv), (self.hv_winding, I_hv)):
+            grid = winding_grid(winding.inner_radius, winding.thickness, winding.winding_height, z0,
+                                winding.filling_factor / 100.0, max(1, int(winding.winding_height / PANCAKE_PITCH)),
+                                n_r, n_z)
+            b_ax, b_rad = sample_field(self.fem_solution, grid)
+            ic = Ic(b_ax, b_rad) if callable(Ic) else Ic
+            pancakes = pancake_losses(grid, b_ax, b_rad, self.input.required.freq, current, ic)
+            if pancakes.over_critical:
+                raise ValueError("The tape current exceeds the critical current, ic margin: {:.3f}".format(
+                    float(np.min(pancakes.ic_margin))))
+            losses.append(pancakes)
+
+        for winding, pancakes in zip((self.lv_winding, self.hv_winding), losses):
+            winding.ac_loss = round(3.0 * pancakes.winding_loss, 2)
+        self._load_loss_and_cost(is_sc=True)
+
+        return losses[0], losses[1]
+
+    def sc_forces(self, n_sections: int = 20, n_r: int = 5, n_z: int = 2) -> typing.Tuple[WindingForces, WindingForces]:
+        """
+        Integrates the short-circuit forces and stresses of the windings over the field of the last FEM solution, the
+        currents are scaled to the peak short-circuit current (sc_current).
+
+        The resultant radial force of a winding is given by the agros volume integral of the Lorentz force over the
+        winding label, where the solution provides it (it is an even quantity, so it is valid in the half model too).
+        The winding is one label in the model, so the axial distribution of the forces into the sections is given by
+        the field sampled in the cell centers, which is scaled to the integrated radial force. If the integral is not
+        available, the forces are given by the point sampling alone.
+
+        :param n_sections: number of the axial sections of the windings
+        :param n_r: number of the radial cells
+        :param n_z: number of the axial cells in one section
+        :return: the forces of the lv and the hv windings
+        """
+        if getattr(self, "fem_solution", None) is None:
+            raise ValueError("The FEM simulation should be performed before the force integration.")
+
+        # the resistance of the impedance is given by the winding losses, the load loss of the superconducting
+        # designs contains the cooling penalty, the cryostat and the current lead losses
+        winding_loss = self.lv_winding.dc_loss + self.lv_winding.ac_loss + self.hv_winding.dc_loss + \
+            self.hv_winding.ac_loss
+        ratio = peak_current_ratio(self.input.required.lv.ph_current, self.results.sci, winding_loss,
+                                   self.input.required.power)
+        z0 = self.input.design_params.rc + self.input.required.ei / 2.0
+        forces = []
+        for name, winding, sign in (("lv", self.lv_winding, 1.0), ("hv", self.hv_winding, -1.0)):
+            cells = winding_cells(winding.inner_radius, winding.thickness, winding.winding_height, z0, n_sections, n_r,
+                                  n_z)
+            b_ax, b_rad = sample_field(self.fem_solution, cells)
+            count("fem.force_cells", cells.r.shape[0])
+            j = sign * winding.current_density
+            ff = winding.filling_factor / 100.0
+
+            integrals = self.fem_solution.volume_integrals([WINDING_LABELS[name]])
+            count("fem.volume_integrals")
+            if RADIAL_FORCE_INTEGRAL in integrals:
+                # the radial forces are given by the axial field, it is scaled to the integral of the nominal current
+                sampled = np.sum(winding_forces(cells, b_rad, b_ax, j, ff).radial)
+                if sampled != 0.0:
+                    b_ax = b_ax * integrals[RADIAL_FORCE_INTEGRAL] / sampled
+            forces.append(winding_forces(cells, b_rad, b_ax, j, ff, ratio))
+
+        return forces[0], forces[1]
+
+    def harmonic_losses(self, orders=HARMONIC_ORDERS, current_ratios=None, conductor_thickness: float = 2.5,
+                        conductor_height: float = 10.0, n_sections: int = 20, n_r: int = 5,
+                        n_z: int = 2) -> typing.Tuple[HarmonicLosses, HarmonicLosses]:
+        """
+        Eddy losses of the harmonic orders in the windings from the field of the last FEM solution, the field is
+        sampled once and scaled to the harmonic currents, the skin effect of the conductors is considered by the
+        harmonic frequencies.
+
+        :param orders: harmonic orders, starting with the fundamental
+        :param current_ratios: I_h / I_1 of the orders, the spectrum of a six-pulse rectifier by default
+        :param conductor_thickness: radial dimension of the conductors [mm]
+        :param conductor_height: axial dimension of the conductors [mm]
+        :return: the harmonic losses of the lv and the hv windings
+        """
+        if getattr(self, "fem_solution", None) is None:
+            raise ValueError("The FEM simulation should be performed before the harmonic loss calculation.")
+
+        z0 = self.input.design_params.rc + self.input.required.ei / 2.0
+        losses = []
+        for winding in (self.lv_winding, self.hv_winding):
+            cells = winding_cells(winding.inner_radius, winding.thickness, winding.winding_height, z0, n_sections, n_r,
+                                  n_z)
+            b_ax, b_rad = sample_field(self.fem_solution, cells)
+            count("fem.harmonic_cells", cells.r.shape[0])
+            losses.append(winding_harmonics(cells, b_ax, b_rad, winding.filling_factor / 100.0, winding.dc_loss,
+                                            self.input.required.freq, orders, current_ratios, conductor_thickness,
+                                            conductor_height))
+
+        return losses[0], losses[1]
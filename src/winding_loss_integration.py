@@ -0,0 +1,145 @@
+import typing
+
+import numpy as np
+from numpy import pi
+
+from src.instrumentation import count
+from src.superconductor_losses import norris_equation, parallel_loss, perp_loss
+
+"""
+Integration of the AC losses of the superconducting windings over the field distribution of the FEM solution.
+
+The supra_winding_ac_loss function averages the losses over the maxima of some horizontal slices, this module evaluates
+the Magnusson loss terms in every point of a grid, which covers the cross-section of the winding:
+
+ - the winding is divided into pancakes along its height, every pancake is sampled by n_r x n_z cell centers,
+ - every sample point represents the tape length of its cell (tape turns in the cell x circumference),
+ - the losses of the points [W/m] are weighted by these lengths and summed by pancakes with np.bincount.
+
+The windings are placed like in the FEM model, the tape width is parallel to the axis, therefore the axial component
+of the flux density is the parallel and the radial component is the perpendicular field of the tape.
+
+The self-field (Norris) loss is defined only below the critical current. The sample points, where the tape current
+reaches the local critical current, are excluded from the self-field losses, and they are reported by the current
+margin (1 - I / Ic) of the pancakes, which is not positive in the over-critical pancakes.
+"""
+
+TAPE_AREA = 0.31 * 4.1  # [mm2] cross-section of the BSCCO tape, like in WindingDesign.calc_sc_properties
+
+
+class WindingGrid(typing.NamedTuple):
+    r: np.ndarray  # [mm] radial coordinates of the sample points
+    z: np.ndarray  # [mm] axial coordinates of the sample points
+    pancake: np.ndarray  # index of the pancake of the sample points
+    length: np.ndarray  # [m] tape length represented by the sample points
+    n_pancakes: int
+
+
+class PancakeLosses(typing.NamedTuple):
+    parallel: np.ndarray  # [W] losses of the parallel field in the pancakes
+    perpendicular: np.ndarray  # [W] losses of the perpendicular field in the pancakes
+    self_field: np.ndarray  # [W] self-field (Norris) losses in the pancakes
+    length: np.ndarray  # [m] tape length in the pancakes
+    ic_margin: np.ndarray  # the smallest current margin (1 - I / Ic) of the sample points in the pancakes
+
+    @property
+    def total(self) -> np.ndarray:
+        """[W] total ac loss of the pancakes"""
+        return self.parallel + self.perpendicular + self.self_field
+
+    @property
+    def winding_loss(self) -> float:
+        """[W] total ac loss of the winding"""
+        return float(np.sum(self.total))
+
+    @property
+    def over_critical(self) -> bool:
+        """the tape current reaches the critical current in some points of the winding"""
+        return bool(np.any(self.ic_margin <= 0.0))
+
+
+def winding_grid(inner_radius: float, thickness: float, height: float, z0: float, filling_factor: float,
+                 n_pancakes: int, n_r: int = 20, n_z: int = 10, tape_area: float = TAPE_AREA) -> WindingGrid:
+    """
+    Sample points in the cell centers of a winding, which is divided into n_pancakes along its height.
+
+    :param inner_radius: inner radius of the winding [mm]
+    :param thickness: thickness of the winding [mm]
+    :param height: height of the winding [mm]
+    :param z0: axial coordinate of the bottom of the winding [mm]
+    :param filling_factor: tape filling of the winding cross-section [0-1]
+    :param n_pancakes: number of pancakes
+    :param n_r: number of the radial sample points
+    :param n_z: number of the axial sample points in one pancake
+    :param tape_area: cross-section of the tape [mm2]
+    """
+    if n_pancakes < 1 or n_r < 1 or n_z < 1:
+        raise ValueError("the number of the pancakes and the sample points should be positive")
+
+    dr = thickness / n_r
+    dz = height / (n_pancakes * n_z)
+
+    r = inner_radius + dr * (np.arange(n_r) + 0.5)
+    z = z0 + dz * (np.arange(n_pancakes * n_z) + 0.5)
+    rr, zz = np.meshgrid(r, z, indexing="ij")
+    rr = rr.ravel()
+    zz = zz.ravel()
+
+    pancake = np.tile(np.arange(n_pancakes * n_z) // n_z, n_r)
+    # tape turns in the cell x the length of one turn, mm -> m
+    length = dr * dz * filling_factor / tape_area * 2.0 * pi * rr * 1e-3
+
+    return WindingGrid(rr, zz, pancake, length, n_pancakes)
+
+
+def sample_field(solution, grid: WindingGrid) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads the axial and the radial flux density [T] of the FEM solution in the points of the grid.
+
+    :param solution: magnetic solution of the FemModel (agros), with local_values(r, z) in [m]
+    :return: b_ax, b_rad arrays
+    """
+    b_ax = np.empty(grid.r.shape[0])
+    b_rad = np.empty(grid.r.shape[0])
+    for i, (r, z) in enumerate(zip(grid.r.tolist(), grid.z.tolist())):
+        point = solution.local_values(r * 1e-3, z * 1e-3)
+        b_ax[i] = point["Brz"]
+        b_rad[i] = point["Brr"]
+    count("fem.field_points", grid.r.shape[0])
+
+    return b_ax, b_rad
+
+
+def pancake_losses(grid: WindingGrid, b_ax, b_rad, f: float, I: float, Ic=170.0, kappa: float = 1.2) -> PancakeLosses:
+    """
+    Integrates the Magnusson loss terms over the pancakes of a winding.
+
+    :param grid: the sample points of the winding
+    :param b_ax: axial (parallel) flux density in the sample points [T]
+    :param b_rad: radial (perpendicular) flux density in the sample points [T]
+    :param f: frequency
+    :param I: current of the tape
+    :param Ic: critical current of the tape, a scalar or an array of the sample points, the points with I >= Ic are
+               excluded from the self-field losses and flagged by the ic_margin of the pancakes
+    :param kappa: considers the winding layout, which can reduce the radial losses in the conductors
+    """
+    n = grid.n_pancakes
+    length = np.bincount(grid.pancake, weights=grid.length, minlength=n)
+
+    parallel = np.bincount(grid.pancake, weights=parallel_loss(np.abs(b_ax), f) * grid.length, minlength=n)
+    perpendicular = np.bincount(grid.pancake, weights=perp_loss(f, np.abs(b_rad)) / kappa * grid.length,
+                                minlength=n)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        margin = np.broadcast_to(1.0 - I / np.asarray(Ic, dtype=float), grid.pancake.shape)
+    ic_margin = np.full(n, np.inf)
+    np.minimum.at(ic_margin, grid.pancake, margin)
+
+    # the self-field loss is not defined in the over-critical points, they are evaluated with a finite placeholder
+    # critical current and masked out
+    below = margin > 0.0
+    ic = np.where(below, Ic, 2.0 * I)
+    self_field = np.bincount(grid.pancake, weights=np.where(below, norris_equation(f, I, ic), 0.0) * grid.length,
+                             minlength=n)
+
+    return PancakeLosses(parallel, perpendicular, self_field, length, ic_margin)
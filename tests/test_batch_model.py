@@ -0,0 +1,106 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.batch_model import evaluate_population, evaluate_sc_population
+from src.critical_current import critical_current_map
+from src.design_library import load_design
+from src.superconductor_losses import cooler_cost, cryo_surface, cryostat_losses, thermal_incomes
+
+"""10 MVA Transformer from Karsai, Nagytranszformátorok """
+
+
+class TestPopulationModel(TestCase):
+    def test_single_design(self):
+        # the same values as in the scalar two winding model
+        res = evaluate_population(load_design("10MVA_example.json"), {})
+
+        self.assertAlmostEqual(res["turn_voltage"][0], 46.64, 1)
+        self.assertAlmostEqual(res["lv_thickness"][0], 35.0, 0)
+        self.assertAlmostEqual(res["hv_thickness"][0], 43.4, 0)
+        self.assertAlmostEqual(res["hv_amper_turns"][0], 71406.8, 0)
+        self.assertAlmostEqual(res["window_width"][0], 198.4, 0)
+        self.assertAlmostEqual(res["core_mass"][0], 7751.0, 0)
+        self.assertAlmostEqual(res["core_loss"][0], 8.2, 1)
+        self.assertAlmostEqual(res["hv_mass"][0], 1620., 0)
+        self.assertAlmostEqual(res["load_loss"][0], 49.18, 0)
+        self.assertAlmostEqual(res["sci"][0], 7.5, 0)
+        self.assertAlmostEqual(res["capitalized_cost"][0], 161503, 0)
+        self.assertTrue(res["feasible"][0])
+
+    def test_population(self):
+        design = load_design("10MVA_example.json")
+        rc = np.array([180.0, 210.0, 250.0])
+        res = evaluate_population(design, {"rc": rc, "ll_cost": 0.0})
+
+        self.assertEqual(res["capitalized_cost"].shape, (3,))
+        np.testing.assert_array_equal(res["rc"], rc)
+        self.assertAlmostEqual(res["core_mass"][1], 7751.0, 0)
+        # the larger core radius gives larger turn voltage
+        self.assertTrue(np.all(np.diff(res["turn_voltage"]) > 0))
+
+    def test_infeasible_designs(self):
+        design = load_design("10MVA_example.json")
+        res = evaluate_population(design, {"j_in": [2.65, 20.0]})
+
+        self.assertListEqual(list(res["feasible"]), [True, False])
+
+    def test_unknown_variable(self):
+        with self.assertRaises(ValueError):
+            evaluate_population(load_design("10MVA_example.json"), {"radius": [1.0]})
+
+
+class TestScPopulationModel(TestCase):
+    def test_single_design(self):
+        # 630 kVA HTS transformer, doi.org/10.1088/0953-2048/20/5/010
+        design = load_design("630kVA_sc_transformer")
+        res = evaluate_sc_population(design, {})
+        copper = evaluate_population(design, {})
+
+        # the same geometry as in the conventional model
+        for name in ("turn_voltage", "lv_thickness", "hv_thickness", "window_width", "core_mass", "sci"):
+            np.testing.assert_array_equal(res[name], copper[name])
+
+        self.assertAlmostEqual(res["lv_thickness"][0], 8.1, 1)
+        self.assertAlmostEqual(res["lv_dc_loss"][0], 0.0)
+        req = design.required
+        self.assertAlmostEqual(res["current_lead_loss"][0], thermal_incomes(req.lv.ph_current, req.hv.ph_current), 6)
+
+        r_in = res["lv_inner_radius"][0] + res["lv_thickness"][0] / 2.0
+        r_ou = res["hv_inner_radius"][0] + res["hv_thickness"][0] / 2.0
+        surface = cryo_surface(r_in, r_ou + res["m_gap"][0], res["hv_height"][0])
+        # the inner radii of the windings are rounded
+        self.assertAlmostEqual(res["cryostat_surface"][0], surface, delta=1e-3 * surface)
+        self.assertAlmostEqual(res["cryostat_loss"][0], cryostat_losses(res["cryostat_surface"][0]), 6)
+
+        cooling = res["sc_ac_loss"][0] + res["cryostat_loss"][0] + res["current_lead_loss"][0]
+        self.assertAlmostEqual(res["load_loss"][0], 18.0 * cooling, 6)
+        self.assertAlmostEqual(res["cooler_cost"][0], cooler_cost(cooling), 6)
+        self.assertTrue(res["feasible"][0])
+
+    def test_population(self):
+        design = load_design("1250kVA_sc_transformer")
+        j_in = np.linspace(20.0, 60.0, 5)
+        res = evaluate_sc_population(design, {"j_in": j_in, "ll_cost": 1.0})
+
+        self.assertEqual(res["capitalized_cost"].shape, (5,))
+        # the cooler cost is part of the objective
+        self.assertTrue(np.all(res["capitalized_cost"] >= res["cooler_cost"] + res["load_loss"]))
+        self.assertTrue(np.all(np.diff(res["ic_margin"]) <= 0))
+        self.assertLess(res["ic_margin"][-1], res["ic_margin"][0])
+
+        # field dependent critical current decreases the margin
+        mapped = evaluate_sc_population(design, {"j_in": j_in}, Ic=critical_current_map("BSCCO", 77.0))
+        self.assertTrue(np.all(mapped["ic_margin"] < res["ic_margin"]))
+
+    def test_infeasible_designs(self):
+        design = load_design("630kVA_sc_transformer")
+        res = evaluate_sc_population(design, {"j_in": [22.46, 200.0]})
+
+        # too large tape current and too thin winding
+        self.assertListEqual(res["feasible"].tolist(), [True, False])
+        self.assertLess(res["ic_margin"][1], 0.0)
+
+        # too small critical current
+        res = evaluate_sc_population(design, {"j_in": [22.46, 30.0]}, Ic=20.0)
+        self.assertListEqual(res["feasible"].tolist(), [False, False])
@@ -0,0 +1,41 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from benchmarks.suite import BENCHMARKS, append_history, compare, load_baseline, make_record, read_history, \
+    run_suite, save_baseline
+
+
+class TestBenchmarkSuite(TestCase):
+
+    def test_registry(self):
+        names = [bench.name for bench in BENCHMARKS]
+        self.assertEqual(len(names), len(set(names)))
+        # the scalar model is measured on every bundled rating
+        self.assertIn("calculate.10MVA_example", names)
+        self.assertIn("calculate.630kVA_sc_transformer", names)
+
+    def test_run_and_history(self):
+        results, skipped = run_suite(r"^kernel\.turn_voltage$", repeat=2, min_time=0.001, verbose=False)
+        self.assertListEqual(list(results), ["kernel.turn_voltage"])
+        self.assertGreater(results["kernel.turn_voltage"], 0.0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            history = os.path.join(tmp, "history.jsonl")
+            baseline = os.path.join(tmp, "baseline.json")
+            record = make_record(results, skipped)
+
+            append_history(record, history)
+            append_history(record, history)
+            self.assertEqual(len(read_history(history)), 2)
+
+            self.assertIsNone(load_baseline(baseline))
+            save_baseline(record, baseline)
+            self.assertDictEqual(load_baseline(baseline)["results"], results)
+
+    def test_compare(self):
+        baseline = {"a": 1.0, "b": 1.0, "c": 1.0}
+        current = {"a": 1.1, "b": 1.5, "d": 9.0}
+
+        self.assertListEqual(compare(current, baseline, 0.2), [("b", 1.0, 1.5)])
+        self.assertListEqual(compare(current, baseline, 0.05), [("a", 1.0, 1.1), ("b", 1.0, 1.5)])
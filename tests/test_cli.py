@@ -0,0 +1,140 @@
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+import numpy as np
+from typer.testing import CliRunner
+
+from src.batch_model import evaluate_population
+from src.cli import EvaluationOptions, OptimizationOptions, RecordWriter, app, chunks, evaluate_records, \
+    optimize_design, ordered_map, parse_values, read_records
+from src.design_library import load_design
+
+
+def _square(x):
+    return x * x
+
+
+class TestCli(TestCase):
+
+    def test_read_records(self):
+        jsonl = io.StringIO('{"id": 1, "rc": 200}\n\n{"id": 2, "bc": 1.6}\n')
+        self.assertListEqual(list(read_records(jsonl)), [{"id": 1, "rc": 200}, {"id": 2, "bc": 1.6}])
+
+        csv_rows = io.StringIO("id,rating,rc,bc\na,10MVA_example,200,\nb,10MVA_example,210,1.6\n")
+        self.assertListEqual(list(read_records(csv_rows)), [{"id": "a", "rating": "10MVA_example", "rc": 200.0},
+                                                            {"id": "b", "rating": "10MVA_example", "rc": 210.0,
+                                                             "bc": 1.6}])
+        self.assertListEqual(list(read_records(io.StringIO(""))), [])
+
+    def test_writer(self):
+        stream = io.StringIO()
+        writer = RecordWriter(stream, "csv")
+        writer.write({"id": 1, "sci": 8.5})
+        writer.write({"id": 2, "sci": 9.0, "error": "ignored"})
+        self.assertEqual(stream.getvalue(), "id,sci\n1,8.5\n2,9.0\n")
+
+        stream = io.StringIO()
+        RecordWriter(stream, "jsonl", columns=["sci", "error"]).write({"id": 1, "sci": 8.5})
+        self.assertEqual(json.loads(stream.getvalue()), {"sci": 8.5, "error": None})
+
+    def test_ordered_map(self):
+        self.assertListEqual(list(ordered_map(_square, range(20), workers=4, executor_class=ThreadPoolExecutor)),
+                             [x * x for x in range(20)])
+        self.assertListEqual(list(ordered_map(_square, range(5))), [0, 1, 4, 9, 16])
+        self.assertListEqual(list(chunks(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_bounded_window(self):
+        consumed = []
+
+        def items():
+            for i in range(100):
+                consumed.append(i)
+                yield i
+
+        results = ordered_map(_square, items(), workers=2, window=3, executor_class=ThreadPoolExecutor)
+        self.assertEqual(next(results), 0)
+        # only the window is read ahead from the input
+        self.assertLessEqual(len(consumed), 4)
+        self.assertEqual(len(list(results)), 99)
+
+    def test_evaluate_records(self):
+        design = load_design("10MVA_example")
+        records = [{"id": 1, "rc": 200.0}, {"id": 2, "rating": "unknown"}, {"id": 3, "bc": 1.6, "j_in": 2.5},
+                   dict(design.to_dict(), id=4)]
+        output = evaluate_records(records, EvaluationOptions(rating="10MVA_example"))
+
+        self.assertListEqual([row["id"] for row in output], [1, 2, 3, 4])
+        self.assertIn("unknown rating", output[1]["error"])
+
+        params = design.design_params
+        expected = evaluate_population(design, {"rc": [200.0, params.rc], "bc": [params.bc, 1.6],
+                                                "j_in": [params.j_in, 2.5]})
+        for row, k in ((output[0], 0), (output[2], 1)):
+            self.assertAlmostEqual(row["capitalized_cost"], expected["capitalized_cost"][k])
+            self.assertEqual(row["feasible"], bool(expected["feasible"][k]))
+        # the inline rating is evaluated with its own design variables
+        self.assertEqual(output[3]["rc"], design.design_params.rc)
+        self.assertEqual(output[3]["description"], design.description)
+
+        missing = evaluate_records([{"id": 5}])
+        self.assertIn("error", missing[0])
+
+    def test_evaluate_command(self):
+        stdin = '{"id": 1, "rc": 200}\n{"id": 2, "rc": 210}\n{"id": 3, "rating": "unknown"}\n'
+        result = CliRunner().invoke(app, ["evaluate", "--rating", "10MVA_example", "--columns", "id,rc,sci,error"],
+                                    input=stdin)
+        self.assertEqual(result.exit_code, 1)
+        rows = [json.loads(line) for line in result.stdout.splitlines() if line.startswith("{")]
+        self.assertListEqual([row["id"] for row in rows], [1, 2, 3])
+        self.assertEqual(rows[1]["rc"], 210.0)
+        self.assertIsNone(rows[0]["error"])
+
+        # the order of the input is kept by the worker processes
+        stdin = "".join('{{"id": {}, "rc": {}}}\n'.format(i, 180 + i) for i in range(20))
+        result = CliRunner().invoke(app, ["evaluate", "--rating", "10MVA_example", "--columns", "id,rc", "--workers",
+                                          "2", "--chunk-size", "3"], input=stdin)
+        self.assertEqual(result.exit_code, 0)
+        rows = [json.loads(line) for line in result.stdout.splitlines()]
+        self.assertListEqual([row["rc"] for row in rows], [180.0 + i for i in range(20)])
+
+    def test_sweep_command(self):
+        self.assertListEqual(parse_values("1:2:3").tolist(), [1.0, 1.5, 2.0])
+        self.assertListEqual(parse_values("1.5,1.7").tolist(), [1.5, 1.7])
+        with self.assertRaises(ValueError):
+            parse_values("1:2")
+
+        result = CliRunner().invoke(app, ["sweep", "10MVA_example", "--var", "rc=180:250:8", "--var", "bc=1.5,1.7",
+                                          "--output-format", "csv", "--columns", "rc,bc,feasible", "--chunk-size", "5"])
+        self.assertEqual(result.exit_code, 0)
+        lines = result.stdout.splitlines()
+        self.assertEqual(lines[0], "rc,bc,feasible")
+        self.assertEqual(len(lines), 1 + 16)
+        self.assertEqual(lines[1], "180.0,1.5,True")
+        self.assertEqual(lines[2], "180.0,1.7,True")
+
+        result = CliRunner().invoke(app, ["sweep", "10MVA_example", "--var", "unknown=1"])
+        self.assertEqual(result.exit_code, 2)
+
+    def test_optimize(self):
+        design = load_design("10MVA_example")
+        row = optimize_design(design, OptimizationOptions(maxiter=30, seed=1))
+        self.assertTrue(row["feasible"])
+        self.assertTrue(row["sci_feasible"])
+
+        # the optimum is not worse than the feasible designs of a random population
+        rng = np.random.default_rng(1)
+        population = {name: getattr(design.design_params, name) * rng.uniform(0.7, 1.3, 500)
+                      for name in ("rc", "bc", "j_in", "j_ou", "h_in", "m_gap")}
+        res = evaluate_population(design, population)
+        feasible = res["feasible"] & (np.abs(res["sci"] - design.required.sci_req) <
+                                      design.required.sci_req * design.required.drop_tol / 100)
+        self.assertLessEqual(row["capitalized_cost"], np.min(res["capitalized_cost"][feasible]) * 1.01)
+
+        result = CliRunner().invoke(app, ["optimize", "10MVA_example", "--maxiter", "5", "--seed", "1",
+                                          "--bound", "rc=180:250", "--columns", "rating,rc"])
+        self.assertEqual(result.exit_code, 0)
+        row = json.loads(result.stdout)
+        self.assertEqual(row["rating"], "10MVA_example")
+        self.assertTrue(180.0 <= row["rc"] <= 250.0)
@@ -0,0 +1,66 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.critical_current import TAPES, CriticalCurrentMap, critical_current_map, kim_critical_current, \
+    local_critical_state
+from src.superconductor_losses import norris_equation
+
+
+class TestCriticalCurrent(TestCase):
+
+    def test_kim_model(self):
+        # self-field critical current at the reference temperature
+        self.assertAlmostEqual(kim_critical_current(0.0, 0.0), 170.0, 9)
+        # the perpendicular field is more harmful than the parallel one
+        self.assertLess(kim_critical_current(0.0, 0.05), kim_critical_current(0.05, 0.0))
+        # the critical current increases with decreasing temperature
+        self.assertGreater(kim_critical_current(0.0, 0.05, 65.0), kim_critical_current(0.0, 0.05, 77.0))
+        self.assertEqual(kim_critical_current(0.0, 0.0, 110.0), 0.0)
+        self.assertEqual(kim_critical_current(np.zeros(3), 0.1).shape, (3,))
+
+    def test_map(self):
+        ic_map = critical_current_map("BSCCO", 77.0)
+        rng = np.random.default_rng(0)
+        b_ax = rng.normal(0.0, 0.05, 1000)
+        b_rad = rng.normal(0.0, 0.02, 1000)
+
+        exact = kim_critical_current(np.abs(b_ax), np.abs(b_rad))
+        np.testing.assert_allclose(ic_map(b_ax, b_rad), exact, rtol=1e-2)
+        # exact in the grid points, clipped outside of the grid
+        self.assertAlmostEqual(ic_map(0.0, 0.0), 170.0, 9)
+        self.assertAlmostEqual(ic_map(5.0, -5.0), kim_critical_current(1.0, 1.0), 9)
+
+    def test_measured_table(self):
+        # non-equidistant grid, bilinear function is interpolated exactly
+        b_par = np.array([0.0, 0.01, 0.05, 0.2])
+        b_perp = np.array([0.0, 0.02, 0.1])
+        ic = 170.0 - 100.0 * b_par[:, None] - 500.0 * b_perp[None, :]
+        ic_map = CriticalCurrentMap(b_par, b_perp, ic)
+
+        self.assertAlmostEqual(ic_map(0.03, -0.05), 170.0 - 3.0 - 25.0, 9)
+
+        with self.assertRaises(ValueError):
+            CriticalCurrentMap(b_par, b_perp, ic.T)
+        with self.assertRaises(ValueError):
+            CriticalCurrentMap(b_par[::-1], b_perp, ic)
+
+    def test_cache(self):
+        self.assertIs(critical_current_map("BSCCO", 65.0), critical_current_map("BSCCO", 65.0))
+        self.assertIsNot(critical_current_map("BSCCO", 65.0), critical_current_map("YBCO", 65.0))
+        with self.assertRaises(KeyError):
+            critical_current_map("MgB2")
+
+    def test_local_state(self):
+        ic_map = critical_current_map("BSCCO", 77.0)
+        b_ax = np.array([0.0, 0.05, 0.0])
+        b_rad = np.array([0.0, 0.02, 1.0])
+
+        state = local_critical_state(b_ax, b_rad, 50.0, 50.0, ic_map)
+        self.assertAlmostEqual(state.margin[0], 1.0 - 50.0 / 170.0, 9)
+        self.assertAlmostEqual(state.self_field[0], norris_equation(50.0, 50.0, 170.0), 12)
+        self.assertGreater(state.self_field[1], state.self_field[0])
+        # the current exceeds the local critical current
+        self.assertLess(state.margin[2], 0.0)
+        self.assertTrue(np.isnan(state.self_field[2]))
+        self.assertEqual(TAPES["BSCCO"].ic0, 170.0)
@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from src.design_library import DesignLibrary, clear_cache, load_design, validate_design
+
+
+class TestDesignLibrary(TestCase):
+    def setUp(self):
+        clear_cache()
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write_rating(self, name, **changes):
+        data = load_design("10MVA_example").to_dict()
+        data["required"].update(changes)
+        path = os.path.join(self.tmp.name, name + ".json")
+        with open(path, "w") as json_file:
+            json.dump(data, json_file)
+        return path
+
+    def test_bundled_ratings(self):
+        library = DesignLibrary()
+
+        for name in ("10MVA_example", "6300_kVA_example", "630kVA_sc_transformer", "1250kVA_sc_transformer"):
+            self.assertIn(name, library)
+
+        design = library.get("10MVA_example.json")
+        self.assertEqual(design.required.power, 10000)
+        self.assertEqual(design.design_params.rc, 210)
+
+        # every call gives back a new object from the cached data
+        design.design_params.rc = 0.0
+        self.assertEqual(library.get("10MVA_example").design_params.rc, 210)
+
+        with self.assertRaises(KeyError):
+            library.get("missing_rating")
+
+    def test_user_ratings(self):
+        self.write_rating("custom", power=12000.0)
+        library = DesignLibrary([self.tmp.name], bundled=False)
+
+        self.assertListEqual(library.names(), ["custom"])
+        self.assertEqual(library.get("custom").required.power, 12000.0)
+        self.assertEqual(len(dict(library.items())), 1)
+
+    def test_cache_invalidation(self):
+        path = self.write_rating("custom", power=12000.0)
+        library = DesignLibrary([path], bundled=False)
+        self.assertEqual(library.get("custom").required.power, 12000.0)
+
+        self.write_rating("custom", power=16000.0)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(library.get("custom").required.power, 16000.0)
+
+    def test_validation(self):
+        self.write_rating("invalid", power=-1.0, core_fillingf=120.0)
+        library = DesignLibrary([self.tmp.name], bundled=False)
+
+        with self.assertRaises(ValueError) as context:
+            library.get("invalid")
+
+        self.assertIn("required.power", str(context.exception))
+        self.assertIn("required.core_fillingf", str(context.exception))
+        self.assertEqual(validate_design(load_design("6300_kVA_example")).required.power, 6300.0)
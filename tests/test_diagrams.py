@@ -1,5 +1,11 @@
+import os
+import tempfile
 from unittest import TestCase
-from src.diagrams import plot_winding_flux
+
+import numpy as np
+
+from src.diagrams import plot_winding_flux, min_max_decimate, lttb, pixel_aggregate, plot_flux_profile, \
+    plot_design_space
 
 B_hv = [(0.029128001810690196, 0.034931126895950015), (0.050827730564536266, 0.013995471297917561),
         (0.05588725071682793, 0.008240268880776114), (0.05886954390963839, 0.005638255023196592),
@@ -20,3 +26,64 @@ class TestDiagrams(TestCase):
         plot_winding_flux(B_hv, 0, 100, dev=True)
 
         self.assertEqual(1, 1)
+
+    def test_min_max_decimation(self):
+        rng = np.random.default_rng(0)
+        z = np.linspace(0.0, 1000.0, 100000)
+        b = np.sin(z / 50.0) + rng.normal(0.0, 0.1, z.shape)
+
+        index = min_max_decimate(z, b, 500)
+        self.assertLessEqual(index.shape[0], 1002)
+        self.assertTrue(np.all(np.diff(index) > 0))
+        self.assertListEqual([index[0], index[-1]], [0, z.shape[0] - 1])
+        # the peaks are kept
+        self.assertEqual(b[index].max(), b.max())
+        self.assertEqual(b[index].min(), b.min())
+
+        np.testing.assert_array_equal(min_max_decimate(z[:100], b[:100], 500), np.arange(100))
+
+    def test_lttb(self):
+        z = np.linspace(0.0, 10.0, 10001)
+        b = np.zeros(z.shape)
+        b[5000] = 1.0
+
+        index = lttb(z, b, 100)
+        self.assertEqual(index.shape[0], 100)
+        self.assertTrue(np.all(np.diff(index) > 0))
+        # the spike is the largest triangle in its bucket
+        self.assertIn(5000, index)
+
+    def test_pixel_aggregate(self):
+        x = np.array([0.0, 0.1, 0.9, 1.0, 2.0])
+        y = np.array([0.0, 0.1, 0.9, 1.0, 0.5])
+        values = np.array([1.0, 3.0, 5.0, 7.0, 9.0])
+
+        count, extent = pixel_aggregate(x, y, bins=(2, 2), extent=(0.0, 1.0, 0.0, 1.0))
+        np.testing.assert_array_equal(count, [[2.0, 0.0], [0.0, 2.0]])
+
+        mean, _ = pixel_aggregate(x, y, values, bins=(2, 2), extent=(0.0, 1.0, 0.0, 1.0), agg="mean")
+        self.assertEqual(mean[0, 0], 2.0)
+        self.assertTrue(np.isnan(mean[0, 1]))
+        minimum, _ = pixel_aggregate(x, y, values, bins=(2, 2), agg="min")
+        self.assertEqual(np.nanmin(minimum), 1.0)
+
+        with self.assertRaises(ValueError):
+            pixel_aggregate(x, y, values, agg="median")
+
+    def test_headless_plots(self):
+        rng = np.random.default_rng(1)
+        z = np.linspace(0.0, 400.0, 100000)
+        sci = rng.normal(5.0, 1.0, 100000)
+        loss = rng.normal(50.0, 10.0, 100000)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            profile = os.path.join(tmp, "profile.png")
+            cloud = os.path.join(tmp, "cloud.png")
+            flux = os.path.join(tmp, "flux.png")
+
+            plot_flux_profile(z, np.sin(z / 50.0), np.cos(z / 50.0), path=profile, method="lttb")
+            plot_design_space(sci, loss, sci * loss, agg="min", bins=(200, 100), path=cloud)
+            plot_winding_flux(B_hv, 0, 100, path=flux)
+
+            for path in (profile, cloud, flux):
+                self.assertGreater(os.path.getsize(path), 0)
@@ -0,0 +1,54 @@
+import time
+from unittest import TestCase
+
+from typer.testing import CliRunner
+
+from src.cli import app
+from src.fem_fidelity import FIDELITY_LEVELS, FemFidelity, FemOutput, calibrate, get_fidelity
+
+
+def _converging(design, fidelity: FemFidelity) -> FemOutput:
+    # the error decreases with the refinements and the order of the elements
+    error = 0.1 / 2.0 ** (fidelity.number_of_refinements * fidelity.polynomial_order)
+    return FemOutput(design * (1.0 + error), 100.0 * (1.0 - error), 50.0 * (1.0 + error / 2.0))
+
+
+class TestFemFidelity(TestCase):
+
+    def test_presets(self):
+        self.assertEqual(get_fidelity("standard"), FemFidelity(1, 2))
+        self.assertIs(get_fidelity(FIDELITY_LEVELS["screening"]), FIDELITY_LEVELS["screening"])
+        with self.assertRaises(ValueError):
+            get_fidelity("unknown")
+
+    def test_calibration(self):
+        calibration = calibrate(7.5, sci_tolerance=3.0, flux_tolerance=3.0, evaluate=_converging)
+        self.assertListEqual([level.name for level in calibration.levels], list(FIDELITY_LEVELS))
+        self.assertAlmostEqual(calibration.levels[0].sci_error, (0.1 - 0.1 / 2 ** 12) / (1.0 + 0.1 / 2 ** 12) * 100.0)
+        self.assertFalse(calibration.levels[0].accepted)
+        self.assertTrue(calibration.levels[1].accepted)
+        self.assertTrue(calibration.levels[2].accepted)
+        self.assertIn(calibration.selected, ("standard", "verification"))
+        self.assertIn("selected: ", calibration.report())
+
+        # too strict tolerances
+        self.assertIsNone(calibrate(7.5, sci_tolerance=1e-6, evaluate=_converging).selected)
+
+        # the accepted level with the shortest time is selected
+        def adaptive_is_slow(design, fidelity):
+            if fidelity.adaptivity_type != "disabled":
+                time.sleep(0.05)
+            return _converging(design, fidelity)
+
+        levels = {"adaptive": FemFidelity(2, 3, "hp-adaptivity", 5, 1.0), "uniform": FemFidelity(2, 3)}
+        calibration = calibrate(7.5, levels=levels, reference=FemFidelity(2, 3), evaluate=adaptive_is_slow)
+        self.assertTrue(all(level.accepted for level in calibration.levels))
+        self.assertEqual(calibration.selected, "uniform")
+
+    def test_cli_options(self):
+        result = CliRunner().invoke(app, ["sweep", "10MVA_example", "--var", "rc=200", "--fidelity", "unknown"])
+        self.assertEqual(result.exit_code, 2)
+
+        result = CliRunner().invoke(app, ["sweep", "10MVA_example", "--var", "rc=200", "--fidelity", "screening",
+                                          "--columns", "rc"])
+        self.assertEqual(result.exit_code, 0)
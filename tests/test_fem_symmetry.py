@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.fem_symmetry import MirroredSolution, midplane
+from src.ring_field import Filaments, coil_filaments, filament_field
+
+
+class _FilamentSolution:
+    """local values of a filament model in [m], like the agros solution"""
+
+    def __init__(self, filaments: Filaments):
+        self.filaments = filaments
+        self.volume_calls = 0
+
+    def local_values(self, r, z):
+        br, bz = filament_field(self.filaments, r * 1e3, z * 1e3)
+        return {"Brr": float(br), "Brz": float(bz), "Br": float(np.hypot(br, bz))}
+
+    def volume_integrals(self, labels=None):
+        self.volume_calls += 1
+        return {"Wm": 10.0, "V": 0.5}
+
+
+class TestFemSymmetry(TestCase):
+
+    def test_midplane(self):
+        self.assertAlmostEqual(midplane(200.0, 1000.0, [(300.0, 800.0), (250.0, 900.0)]), 700.0)
+        self.assertIsNone(midplane(200.0, 1000.0, [(300.0, 800.0), (300.0, 776.0)]))
+        self.assertAlmostEqual(midplane(200.0, 1000.0, [(300.0, 800.0), (300.0, 800.0 + 1e-9)]), 700.0)
+
+    def test_mirrored_solution(self):
+        # two windings centred on the z = 700 mm plane
+        filaments = Filaments.concatenate(coil_filaments(150.0, 30.0, 800.0, 300.0, 5e4),
+                                          coil_filaments(200.0, 30.0, 800.0, 300.0, -5e4))
+        full = _FilamentSolution(filaments)
+        half = MirroredSolution(full, 700.0)
+
+        for r, z in ((0.19, 0.95), (0.165, 1.05), (0.215, 0.71), (0.2, 0.6)):
+            expected = full.local_values(r, z)
+            values = half.local_values(r, z)
+            self.assertAlmostEqual(values["Brr"], expected["Brr"], 12)
+            self.assertAlmostEqual(values["Brz"], expected["Brz"], 12)
+            self.assertAlmostEqual(values["Br"], expected["Br"], 12)
+
+        self.assertDictEqual(half.volume_integrals(), {"Wm": 20.0, "V": 1.0})
+        # the other attributes are given by the wrapped solution
+        self.assertEqual(half.volume_calls, 1)
@@ -0,0 +1,65 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.harmonic_losses import HARMONIC_ORDERS, eddy_loss_density, six_pulse_spectrum, skin_depth, \
+    strip_eddy_factor, two_winding_harmonics, winding_harmonics
+from src.short_circuit_forces import WindingSpec, winding_cells
+
+
+class TestHarmonicLosses(TestCase):
+
+    def test_strip_factor(self):
+        # copper at 75 C
+        self.assertAlmostEqual(skin_depth(50.0), 10.46, 2)
+        self.assertAlmostEqual(float(strip_eddy_factor(0.0)), 1.0)
+        self.assertAlmostEqual(float(strip_eddy_factor(0.05)), 1.0, 6)
+        # thick strips: the loss is given by the surface layers, G -> 6 / xi^3
+        self.assertAlmostEqual(float(strip_eddy_factor(20.0)) * 20.0 ** 3 / 6.0, 1.0, 6)
+        self.assertTrue(np.all(np.diff(strip_eddy_factor(np.linspace(0.1, 10.0, 50))) < 0.0))
+
+        # the loss density of the thin strips is proportional to the square of the frequency
+        density = eddy_loss_density(0.1, 0.1, [50.0, 500.0])
+        self.assertAlmostEqual(density[1] / density[0], 100.0, 4)
+
+    def test_spectrum(self):
+        ratios = six_pulse_spectrum(np.arange(1, 14))
+        self.assertListEqual(np.nonzero(ratios)[0].tolist(), [0, 4, 6, 10, 12])
+        self.assertAlmostEqual(ratios[4], 0.2)
+        self.assertListEqual(np.nonzero(six_pulse_spectrum(np.arange(1, 26), pulses=12))[0].tolist(),
+                             [0, 10, 12, 22, 24])
+
+    def test_loss_factor(self):
+        cells = winding_cells(300.0, 50.0, 1000.0, 50.0, n_sections=10, n_r=3, n_z=1)
+        b_ax = np.linspace(0.0, 0.1, cells.r.shape[0])
+        b_rad = np.full(cells.r.shape[0], 0.01)
+        ratios = six_pulse_spectrum()
+
+        # thin conductors give back the harmonic loss factor of IEEE C57.110
+        thin = winding_harmonics(cells, b_ax, b_rad, 0.6, 20.0, 50.0, conductor_thickness=0.1, conductor_height=0.1)
+        self.assertEqual(thin.unit_eddy.shape, HARMONIC_ORDERS.shape)
+        self.assertAlmostEqual(thin.loss_factor, np.sum(ratios ** 2 * HARMONIC_ORDERS ** 2) / np.sum(ratios ** 2), 4)
+
+        # the skin effect reduces the losses of the high orders
+        thick = winding_harmonics(cells, b_ax, b_rad, 0.6, 20.0, 50.0)
+        self.assertLess(thick.loss_factor, thin.loss_factor)
+        self.assertAlmostEqual(thick.load_loss, 20.0 * np.sum(ratios ** 2) + np.sum(thick.eddy))
+
+        with self.assertRaises(ValueError):
+            winding_harmonics(cells, b_ax, b_rad, 0.6, 20.0, 50.0, orders=[5, 7])
+
+    def test_two_windings(self):
+        inner = WindingSpec(300.0, 50.0, 1000.0, 50.0, 3.0, 0.6)
+        outer = WindingSpec(400.0, 60.0, 1000.0, 50.0, -2.5, 0.6)
+        lv, hv = two_winding_harmonics(inner, outer, 1100.0, (20.0, 25.0), 50.0)
+
+        # the eddy losses of the nominal current are a fraction of the dc losses
+        self.assertTrue(0.0 < lv.unit_eddy[0] < lv.dc_loss)
+        self.assertTrue(0.0 < hv.unit_eddy[0] < hv.dc_loss)
+        self.assertTrue(np.all(np.diff(lv.unit_eddy) > 0.0))
+        self.assertGreater(lv.load_loss, lv.dc_loss + lv.unit_eddy[0])
+
+        # the field is linear in the current, the losses of the doubled current density are quadrupled
+        double = two_winding_harmonics(inner._replace(current_density=6.0), outer._replace(current_density=-5.0),
+                                       1100.0, (20.0, 25.0), 50.0)[0]
+        np.testing.assert_allclose(double.unit_eddy, 4.0 * lv.unit_eddy, rtol=1e-9)
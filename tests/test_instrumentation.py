@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from src.instrumentation import JsonLinesSink, collect, count, enabled, record, span, stages
+from src.winding_loss_integration import sample_field, winding_grid
+
+
+class _UniformSolution:
+    """stands for the magnetic solution of the FEM model"""
+
+    def local_values(self, r, z):
+        return {"Brz": 0.05, "Brr": -0.01}
+
+
+class TestInstrumentation(TestCase):
+
+    def test_disabled(self):
+        # outside of a collect() block the hooks do nothing
+        self.assertFalse(enabled())
+        with span("calculate"):
+            count("fem.solve")
+            record("fem_sci", fem_based_sci=4.5)
+        with stages("calculate") as stage:
+            stage("windings")
+
+    def test_spans(self):
+        with collect() as metrics:
+            self.assertTrue(enabled())
+            with span("fem_simulation"):
+                with span("solve"):
+                    pass
+                with span("solve"):
+                    pass
+
+        self.assertFalse(enabled())
+        self.assertEqual([name for name, _ in metrics.spans],
+                         ["fem_simulation/solve", "fem_simulation/solve", "fem_simulation"])
+        durations = metrics.durations()
+        self.assertEqual(set(durations), {"fem_simulation", "fem_simulation/solve"})
+        self.assertGreaterEqual(durations["fem_simulation"], durations["fem_simulation/solve"])
+
+    def test_stages(self):
+        with collect() as metrics:
+            with stages("calculate") as stage:
+                stage("windings")
+                stage("core")
+                with span("inner"):
+                    pass
+                stage("cost")
+
+        self.assertEqual([name for name, _ in metrics.spans],
+                         ["calculate/windings", "calculate/core/inner", "calculate/core", "calculate/cost", "calculate"])
+
+    def test_stage_exception(self):
+        with collect() as metrics:
+            with self.assertRaises(ValueError):
+                with stages("calculate") as stage:
+                    stage("windings")
+                    raise ValueError()
+
+            with span("next"):
+                pass
+
+        self.assertEqual([name for name, _ in metrics.spans], ["calculate/windings", "calculate", "next"])
+
+    def test_counters_and_records(self):
+        events = []
+        with collect(sinks=[events.append]) as metrics:
+            count("fem.solve")
+            count("fem.field_points", 20)
+            count("fem.field_points", 22)
+            record("fem_sci", fem_based_sci=4.5)
+
+        self.assertEqual(metrics.counters, {"fem.solve": 1, "fem.field_points": 42})
+        self.assertEqual(metrics.events, [{"type": "record", "name": "fem_sci", "values": {"fem_based_sci": 4.5}}])
+        self.assertEqual(events[-1], {"type": "counters", "values": {"fem.solve": 1, "fem.field_points": 42}})
+
+    def test_field_points(self):
+        grid = winding_grid(300.0, 20.0, 600.0, 100.0, 0.6, 4, n_r=3, n_z=2)
+        with collect() as metrics:
+            b_ax, b_rad = sample_field(_UniformSolution(), grid)
+
+        np.testing.assert_array_equal(b_ax, 0.05)
+        self.assertEqual(metrics.counters["fem.field_points"], 4 * 3 * 2)
+
+    def test_json_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.jsonl")
+            with collect(sinks=[JsonLinesSink(path)]):
+                with span("calculate"):
+                    record("fem_flux", fem_bax_hv=np.float64(70.1))
+
+            with open(path) as jsonl:
+                events = [json.loads(line) for line in jsonl]
+
+        self.assertEqual([event["type"] for event in events], ["record", "span", "counters"])
+        self.assertEqual(events[0]["values"], {"fem_bax_hv": 70.1})
+        self.assertEqual(events[1]["name"], "calculate")
+
+    def test_profile_and_memory(self):
+        with collect(profile=True, trace_memory=True) as metrics:
+            data = [np.ones(1000) for _ in range(10)]
+
+        self.assertEqual(len(data), 10)
+        self.assertGreater(metrics.profile.total_calls, 0)
+        current, peak = metrics.memory
+        self.assertGreaterEqual(peak, 10 * 8000)
+
+    def test_nested_collect(self):
+        with collect():
+            with self.assertRaises(RuntimeError):
+                with collect():
+                    pass
+
+        self.assertFalse(enabled())
@@ -0,0 +1,179 @@
+from unittest import TestCase, skipIf
+
+import numpy as np
+
+from src import base_functions, jit_kernels
+from src.analytical_flux import calc_b_parallel, calc_b_perpendicular, rogowski
+from src.batch_model import evaluate_population, evaluate_sc_population
+from src.critical_current import critical_current_map
+from src.design_library import load_design
+from src.jit_kernels import COLUMNS, SC_COLUMNS, calculate_population, round_to
+from src.superconductor_losses import cooler_cost, cryo_surface, cryostat_losses, norris_equation, parallel_loss, \
+    perp_loss
+
+
+def _population(design, size, seed=0):
+    rng = np.random.default_rng(seed)
+    return {name: getattr(design.design_params, name) * rng.uniform(0.5, 1.5, size)
+            for name in ("rc", "bc", "j_in", "j_ou", "h_in", "m_gap")}
+
+
+class TestJitKernels(TestCase):
+
+    def assert_same(self, expected, actual, rtol=1e-12):
+        np.testing.assert_allclose(np.asarray(actual, dtype=float), np.asarray(expected, dtype=float), rtol=rtol,
+                                   equal_nan=True)
+
+    def test_rounding(self):
+        values = np.random.default_rng(0).uniform(-1e4, 1e4, 1000)
+        for digits in (0, 1, 2):
+            self.assertListEqual([round_to(float(x), digits) for x in values], np.round(values, digits).tolist())
+        # half to even like numpy
+        self.assertEqual(round_to(0.25, 1), 0.2)
+        self.assertEqual(round_to(0.35, 1), float(np.round(0.35, 1)))
+        self.assertTrue(np.isnan(round_to(float("nan"), 1)))
+
+    def test_base_functions(self):
+        rng = np.random.default_rng(1)
+        for _ in range(200):
+            r_c, h, t, g = rng.uniform(100.0, 400.0), rng.uniform(300.0, 1500.0), rng.uniform(5.0, 80.0), \
+                           rng.uniform(10.0, 60.0)
+            ind, ff, j = rng.uniform(1.2, 1.8), rng.uniform(0.3, 0.9), rng.uniform(1.0, 5.0)
+
+            cases = [
+                ("turn_voltage", (ind, r_c, ff, 50.0)),
+                ("calc_inner_width", (3333.3, h, ff, j, 46.6)),
+                ("inner_winding_radius", (r_c, 20.0, t)),
+                ("outer_winding_radius", (r_c, t, g, t * 1.2)),
+                ("window_width", (20.0, t, t * 1.2, g, 0, 0)),
+                ("winding_dc_loss", (t * 100, j)),
+                ("core_mass", (r_c, ff, h, 200.0, 150.0, 20.0)),
+                ("core_loss_unit", (ind, 1e4, 1.2)),
+                ("short_circuit_impedance", (10000.0, 3.0, 50.0, 0.97, 46.64, h, 198.4, r_c, t, r_c + 50.0, t, g)),
+                ("homogenous_insulation_ff", (ff,)),
+                ("opt_win_eddy_loss", (t * 0.7, t)),
+                ("capitalized_cost", (1e4, 3.0, 2e3, 7.0, 2.5e3, 7.0, 60.0, 1500.0, 9.0, 6000.0)),
+            ]
+            for name, args in cases:
+                self.assert_same(getattr(base_functions, name)(*args), getattr(jit_kernels, name)(*args))
+
+            self.assert_same(base_functions.winding_mass(3, r_c, t, h, ff),
+                             jit_kernels.winding_mass(3, r_c, t, h, ff))
+            self.assert_same(base_functions.winding_mass(3, r_c, t, h, ff, material="BSSCO"),
+                             jit_kernels.winding_mass(3, r_c, t, h, ff, base_functions.C_RHO_BSSCO))
+            self.assert_same(rogowski(t, t, g, h), jit_kernels.rogowski(t, t, g, h))
+            self.assert_same(calc_b_parallel(ind * 1e4, 1.0, h * 1e-3), jit_kernels.calc_b_parallel(ind * 1e4, 1.0,
+                                                                                                    h * 1e-3))
+            self.assert_same(calc_b_perpendicular(ind * 1e4, 1.0, h * 1e-3, 4.1e-3),
+                             jit_kernels.calc_b_perpendicular(ind * 1e4, 1.0, h * 1e-3, 4.1e-3))
+            self.assert_same(cryo_surface(r_c, r_c + t, h), jit_kernels.cryo_surface(r_c, r_c + t, h))
+            self.assert_same(cryostat_losses(h * 1e3), jit_kernels.cryostat_losses(h * 1e3))
+            self.assert_same(cooler_cost(h), jit_kernels.cooler_cost(h))
+
+    def test_sc_losses(self):
+        for b in (0.0, 1e-3, 0.02, 0.0344, 0.05, 0.3, -0.02):
+            self.assert_same(parallel_loss(abs(b), 50.0), jit_kernels.parallel_loss(abs(b), 50.0))
+            self.assert_same(perp_loss(50.0, b), jit_kernels.perp_loss(50.0, b))
+
+        for current in (0.0, 10.0, 100.0, 169.9):
+            self.assert_same(norris_equation(50.0, current, 170.0), jit_kernels.norris_equation(50.0, current, 170.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.assertTrue(np.isnan(norris_equation(50.0, 170.0, 170.0)))
+        self.assertTrue(np.isnan(jit_kernels.norris_equation(50.0, 170.0, 170.0)))
+        self.assertTrue(np.isnan(jit_kernels.norris_equation(50.0, 200.0, 170.0)))
+
+    def test_fused_population(self):
+        design = load_design("10MVA_example")
+        population = _population(design, 2000)
+        population["ll_cost"] = np.linspace(1000.0, 2000.0, 2000)
+        expected = evaluate_population(design, population)
+        actual = calculate_population(design, population, backend="python")
+
+        self.assertSetEqual(set(COLUMNS) - set(actual), set())
+        self.assertSetEqual(set(actual), set(expected))
+        for name, column in expected.items():
+            self.assert_same(column, actual[name])
+        np.testing.assert_array_equal(actual["feasible"], expected["feasible"])
+        self.assertTrue(0 < np.mean(actual["feasible"]) < 1)
+
+    def test_fused_sc_population(self):
+        design = load_design("1250kVA_sc_transformer")
+        population = _population(design, 2000)
+        population["j_in"] = population["j_in"] * np.linspace(0.5, 6.0, 2000)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            expected = evaluate_sc_population(design, population, Ic=150.0, kappa=1.1)
+        actual = calculate_population(load_design("1250kVA_sc_transformer"), population, is_sc=True, Ic=150.0,
+                                      kappa=1.1, backend="python")
+
+        self.assertSetEqual(set(SC_COLUMNS) - set(actual), set())
+        self.assertSetEqual(set(actual), set(expected))
+        for name, column in expected.items():
+            self.assert_same(column, actual[name])
+        np.testing.assert_array_equal(actual["feasible"], expected["feasible"])
+        self.assertTrue(0 < np.mean(actual["feasible"]) < 1)
+
+    def test_backends(self):
+        design = load_design("10MVA_example")
+        population = _population(design, 10)
+        default = calculate_population(design, population)
+        expected = evaluate_population(design, population)
+        self.assert_same(expected["capitalized_cost"], default["capitalized_cost"])
+
+        with self.assertRaises(ValueError):
+            calculate_population(design, population, backend="fortran")
+        if jit_kernels.numba is None:
+            with self.assertRaises(ValueError):
+                calculate_population(design, population, backend="numba")
+        with self.assertRaises(ValueError):
+            calculate_population(design, population, is_sc=True, Ic=critical_current_map(), backend="python")
+
+        # the critical current maps are evaluated by the columnar model
+        sc_design = load_design("1250kVA_sc_transformer")
+        res = calculate_population(sc_design, _population(sc_design, 10), is_sc=True, Ic=critical_current_map())
+        self.assertIn("ic_margin", res)
+
+
+@skipIf(jit_kernels.numba is None, "numba is not installed")
+class TestCompiledKernels(TestCase):
+
+    def test_rounded_kernels(self):
+        self.assertEqual(jit_kernels.BACKEND, "numba")
+        rng = np.random.default_rng(2)
+        for _ in range(200):
+            r_c, h, t, ind, ff, j = rng.uniform(100.0, 400.0), rng.uniform(300.0, 1500.0), rng.uniform(5.0, 80.0), \
+                                    rng.uniform(1.2, 1.8), rng.uniform(0.3, 0.9), rng.uniform(1.0, 5.0)
+            cases = [
+                ("turn_voltage", (ind, r_c, ff, 50.0)),
+                ("calc_inner_width", (3333.3, h, ff, j, 46.6)),
+                ("inner_winding_radius", (r_c, 20.0, t)),
+                ("outer_winding_radius", (r_c, t, 30.0, t * 1.2)),
+                ("winding_mass", (3, r_c, t, h, ff)),
+                ("winding_dc_loss", (t * 100, j)),
+                ("core_loss_unit", (ind, 1e4, 1.2)),
+                ("short_circuit_impedance", (10000.0, 3.0, 50.0, 0.97, 46.64, h, 198.4, r_c, t, r_c + 50.0, t, 30.0)),
+            ]
+            for name, args in cases:
+                compiled = getattr(jit_kernels, name)
+                self.assertTrue(hasattr(compiled, "py_func"), name)
+                expected = float(getattr(base_functions, name)(*args))
+                self.assertEqual(compiled(*args), expected, name)
+                self.assertEqual(compiled.py_func(*args), expected, name)
+
+    def test_fused_population(self):
+        design = load_design("10MVA_example")
+        population = _population(design, 2000)
+        expected = evaluate_population(design, population)
+        actual = calculate_population(design, population, backend="numba")
+        for name, column in expected.items():
+            np.testing.assert_allclose(np.asarray(actual[name], dtype=float), np.asarray(column, dtype=float),
+                                       rtol=1e-12, err_msg=name)
+
+        design = load_design("1250kVA_sc_transformer")
+        population = _population(design, 2000)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            expected = evaluate_sc_population(design, population, Ic=150.0)
+        actual = calculate_population(load_design("1250kVA_sc_transformer"), population, is_sc=True, Ic=150.0,
+                                      backend="numba")
+        for name, column in expected.items():
+            np.testing.assert_allclose(np.asarray(actual[name], dtype=float), np.asarray(column, dtype=float),
+                                       rtol=1e-12, equal_nan=True, err_msg=name)
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.batch_model import evaluate_population
+from src.design_library import load_design
+from src.models import MainResults, WindingDesign
+from src.records import ResultRecord, ResultRow, ResultsTable, WindingRecord
+
+
+class TestRecords(TestCase):
+    def test_winding_record(self):
+        winding = WindingDesign(winding_height=1100, inner_radius=230, thickness=35, filling_factor=53.5,
+                                current_density=3.02)
+        winding.calc_properties()
+
+        record = WindingRecord.from_design(winding)
+        self.assertAlmostEqual(record.mass, 885.5, 2)
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertAlmostEqual(record.to_design().amper_turns, 62204.4, 2)
+
+    def test_result_record(self):
+        results = MainResults(sci=7.5, feasible=True, lv_mass=10.0)
+        record = ResultRecord.from_results(results)
+
+        self.assertEqual(record.sci, 7.5)
+        self.assertEqual(record.to_results(), results)
+
+
+class TestResultsTable(TestCase):
+    def test_from_columns(self):
+        design = load_design("10MVA_example.json")
+        columns = evaluate_population(design, {"rc": np.linspace(180.0, 250.0, 100)})
+        table = ResultsTable.from_columns(columns)
+
+        self.assertEqual(len(table), 100)
+        np.testing.assert_array_equal(table["capitalized_cost"], columns["capitalized_cost"])
+
+        row = table[10]
+        self.assertIsInstance(row, ResultRow)
+        self.assertEqual(row.sci, columns["sci"][10])
+        self.assertEqual(row.winding("hv").thickness, columns["hv_thickness"][10])
+        self.assertEqual(row.winding("lv").mass, columns["lv_mass"][10])
+        self.assertEqual(row.to_results().core_mass, columns["core_mass"][10])
+
+        with self.assertRaises(AttributeError):
+            row.unknown_field
+
+        feasible = table[table["feasible"]]
+        self.assertIsInstance(feasible, ResultsTable)
+        self.assertTrue(all(row.feasible for row in feasible))
+
+    def test_from_results(self):
+        results = [MainResults(sci=7.0 + i, feasible=True, fem_bax_brad_hv=[(1.0, 2.0), (3.0, 4.0)],
+                               fem_bax_brad_lv=[(5.0, 6.0), (7.0, 8.0)]) for i in range(3)]
+        table = ResultsTable.from_results(results, n_flux=2, float_type=np.float32)
+
+        self.assertEqual(table[2].sci, 9.0)
+        self.assertListEqual(table[1].fem_bax_brad_lv, [(5.0, 6.0), (7.0, 8.0)])
+        self.assertEqual(table[0].to_results(), results[0])
+        self.assertLess(table.nbytes, 3 * 200)
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.batch_model import evaluate_population
+from src.design_library import load_design
+from src.models import MainResults, MaterialCosts
+from src.repricing import cheapest_designs, cost_components, cost_vector, reprice, scenario_matrix
+
+
+class TestRepricing(TestCase):
+    def test_reprice_equals_model(self):
+        design = load_design("10MVA_example.json")
+        res = evaluate_population(design, {"rc": np.linspace(180.0, 250.0, 50), "h_in": np.linspace(800., 1400., 50)})
+
+        components = cost_components(res)
+        cost = reprice(components, cost_vector(design.costs))
+
+        np.testing.assert_allclose(cost, res["capitalized_cost"])
+
+        # new loss capitalization rates
+        new = MaterialCosts(ll_cost=2000.0, nll_cost=9000.0, lv_cost=10.0, hv_cost=9.5, core_cost=3.5)
+        res_new = evaluate_population(design, {"rc": res["rc"], "h_in": res["h_in"], "ll_cost": 2000.0,
+                                               "nll_cost": 9000.0})
+        np.testing.assert_allclose(reprice(components, scenario_matrix([new]))[:, 0], res_new["capitalized_cost"])
+
+    def test_main_results_components(self):
+        results = [MainResults(core_mass=100., lv_mass=10., hv_mass=20., load_loss=5., core_loss=1.)]
+        components = cost_components(results)
+
+        self.assertEqual(components.shape, (1, 5))
+        cost = reprice(components, scenario_matrix([{"core_cost": 1.0, "ll_cost": 10.0}]))
+        self.assertAlmostEqual(cost[0, 0], 150.0)
+
+    def test_cheapest_designs(self):
+        components = np.array([[1., 0., 0., 0., 0.],
+                               [0., 0., 0., 1., 0.],
+                               [0., 0., 0., 0., 1.]])
+        scenarios = np.array([[1., 0., 0., 2., 3.],
+                              [5., 0., 0., 2., 3.],
+                              [5., 0., 0., 4., 3.]])
+
+        idx, cost = cheapest_designs(components, scenarios, chunk_size=2)
+        self.assertListEqual(list(idx), [0, 1, 2])
+        self.assertListEqual(list(cost), [1., 2., 3.])
+
+        idx, cost = cheapest_designs(components, scenarios, feasible=np.array([True, False, True]))
+        self.assertListEqual(list(idx), [0, 2, 2])
+
+        idx, cost = cheapest_designs(components, scenarios, feasible=np.zeros(3, dtype=bool))
+        self.assertListEqual(list(idx), [-1, -1, -1])
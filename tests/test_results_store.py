@@ -0,0 +1,76 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+import numpy as np
+
+from src.batch_model import evaluate_population
+from src.design_library import load_design
+from src.records import ResultsTable
+from src.results_store import ResultsStore
+
+
+class TestResultsStore(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.design = load_design("10MVA_example.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_and_read(self):
+        store = ResultsStore(self.tmp.name)
+        self.assertEqual(len(store), 0)
+
+        chunks = [evaluate_population(self.design, {"rc": np.linspace(180.0 + i, 250.0, 100)}) for i in range(3)]
+        for chunk in chunks:
+            store.append(chunk)
+
+        self.assertEqual(len(store), 300)
+        self.assertEqual(len(store.parts()), 3)
+
+        data = store.read(["rc", "sci"])
+        self.assertListEqual(sorted(data), ["rc", "sci"])
+        np.testing.assert_array_equal(data["sci"], np.concatenate([chunk["sci"] for chunk in chunks]))
+
+        # the unfiltered scan gives memory mapped columns
+        part = next(store.scan(["capitalized_cost"]))
+        self.assertIsInstance(part["capitalized_cost"], np.memmap)
+
+    def test_filters(self):
+        store = ResultsStore(self.tmp.name)
+        columns = evaluate_population(self.design, {"rc": np.linspace(180.0, 250.0, 200)})
+        store.append(columns)
+
+        selected = store.read(["rc", "sci"], where=[("sci", ">=", 7.1), ("sci", "<", 7.9)])
+        mask = (columns["sci"] >= 7.1) & (columns["sci"] < 7.9)
+        np.testing.assert_array_equal(selected["rc"], columns["rc"][mask])
+
+        selected = store.read(["rc"], where=lambda c: c["feasible"] & (c["core_mass"] > 8000.0))
+        np.testing.assert_array_equal(selected["rc"], columns["rc"][columns["feasible"] & (columns["core_mass"] > 8000)])
+
+        empty = store.read(["rc"], where=[("sci", "<", 0.0)])
+        self.assertEqual(empty["rc"].shape, (0,))
+
+        # an empty list of conditions selects every row
+        np.testing.assert_array_equal(store.read(["rc"], where=[])["rc"], columns["rc"])
+        self.assertEqual(len(list(store.scan(["rc"], where=[]))), 1)
+
+    def test_parallel_writers(self):
+        store = ResultsStore(self.tmp.name)
+        table = ResultsTable.from_columns(evaluate_population(self.design, {"rc": np.linspace(180.0, 250.0, 50)}))
+
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(lambda _: ResultsStore(self.tmp.name).append(table.data), range(8)))
+
+        self.assertEqual(len(store), 400)
+        self.assertEqual(len(store.read(["sci"])["sci"]), 400)
+
+    def test_schema_mismatch(self):
+        store = ResultsStore(self.tmp.name)
+        store.append({"rc": np.ones(2)})
+
+        with self.assertRaises(ValueError):
+            store.append({"bc": np.ones(2)})
+        with self.assertRaises(ValueError):
+            store.append({"rc": np.ones(2), "bc": np.ones(3)})
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+import numpy as np
+from scipy.constants import mu_0
+
+from src.ring_field import Filaments, coil_filaments, field_map, filament_field, flux_profile, ring_field
+from src.superconductor_losses import supra_winding_ac_loss
+
+
+class TestRingField(TestCase):
+
+    def test_ring_on_axis(self):
+        # B = mu0 I a^2 / (2 (a^2 + z^2)^1.5) on the axis
+        br, bz = ring_field(100.0, 0.0, 1000.0, 0.0, 50.0)
+        self.assertAlmostEqual(bz, mu_0 * 1000.0 * 0.1 ** 2 / (2.0 * (0.1 ** 2 + 0.05 ** 2) ** 1.5), 12)
+        self.assertEqual(br, 0.0)
+
+        # close to the axis the field is continuous
+        br, bz_near = ring_field(100.0, 0.0, 1000.0, 1e-3, 50.0)
+        self.assertAlmostEqual(bz_near, bz, 9)
+        self.assertGreater(br, 0.0)
+
+    def test_long_solenoid(self):
+        # B = mu0 N I / L * (L / 2) / sqrt((L / 2)^2 + R^2) in the center of a solenoid
+        solenoid = coil_filaments(100.0, 1.0, 4000.0, -2000.0, 1e5, n_r=1, n_z=800)
+        br, bz = filament_field(solenoid, [0.0, 50.0], [0.0, 0.0])
+        np.testing.assert_allclose(bz, mu_0 * 1e5 / 4.0 * 2.0 / np.hypot(2.0, 0.1005), rtol=1e-5)
+        np.testing.assert_allclose(br, 0.0, atol=1e-12)
+
+    def test_symmetry_and_chunks(self):
+        filaments = Filaments.concatenate(coil_filaments(200.0, 10.0, 400.0, -200.0, 1e4),
+                                          coil_filaments(250.0, 15.0, 420.0, -210.0, -1e4))
+        r = np.linspace(150.0, 300.0, 31)
+        z = np.linspace(-300.0, 300.0, 41)
+
+        br, bz = field_map(filaments, r, z)
+        self.assertEqual(br.shape, (31, 41))
+        # Bz is even, Br is odd to the mid-plane
+        np.testing.assert_allclose(bz, bz[:, ::-1], atol=1e-12)
+        np.testing.assert_allclose(br, -br[:, ::-1], atol=1e-12)
+
+        br_sym, bz_sym = field_map(filaments, r, z, symmetry_plane=0.0)
+        np.testing.assert_allclose(br_sym, br, atol=1e-12)
+        np.testing.assert_allclose(bz_sym, bz, atol=1e-12)
+
+        br_chunk, bz_chunk = field_map(filaments, r, z, chunk_elements=1000)
+        np.testing.assert_allclose(bz_chunk, bz, atol=1e-14)
+
+        with self.assertRaises(ValueError):
+            field_map(filaments, r, z, symmetry_plane=10.0)
+
+    def test_flux_profile(self):
+        filaments = Filaments.concatenate(coil_filaments(200.0, 10.0, 400.0, 0.0, 1e4),
+                                          coil_filaments(250.0, 15.0, 400.0, 0.0, -1e4))
+        profile = flux_profile(filaments, 250.0, 15.0, 400.0, 0.0)
+
+        self.assertEqual(profile.shape, (21, 2))
+        # the axial field is maximal in the middle, the radial one at the ends of the winding
+        self.assertEqual(np.argmax(profile[:, 0]), 10)
+        self.assertIn(np.argmax(profile[:, 1]), (0, 20))
+        self.assertGreater(supra_winding_ac_loss(profile, 50.0, 50.0), 0.0)
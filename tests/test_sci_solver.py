@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.batch_model import evaluate_population
+from src.design_library import load_design
+from src.sci_solver import continuous_sci, evaluate_on_sci_target, sci_feasible, solve_h_in, solve_h_in_batch, \
+    solve_m_gap
+
+
+class TestSciSolver(TestCase):
+    def test_continuous_sci(self):
+        design = load_design("10MVA_example.json")
+        rc = np.linspace(180.0, 250.0, 20)
+
+        # the rounded model gives the same values with 0.5% precision
+        np.testing.assert_allclose(continuous_sci(design, {"rc": rc}), evaluate_population(design, {"rc": rc})["sci"],
+                                   rtol=5e-3)
+
+    def test_closed_form_main_gap(self):
+        design = load_design("10MVA_example.json")
+        rc = np.array([190.0, 210.0, 240.0])
+
+        m_gap = solve_m_gap(design, {"rc": rc})
+        np.testing.assert_allclose(continuous_sci(design, {"rc": rc, "m_gap": m_gap}), design.required.sci_req)
+
+        # too small impedance cannot be reached with a positive main gap
+        self.assertTrue(np.isnan(solve_m_gap(design, {}, sci=0.1)[0]))
+
+    def test_winding_height(self):
+        design = load_design("10MVA_example.json")
+
+        h_in = solve_h_in(design, (800.0, 1400.0))
+        self.assertAlmostEqual(continuous_sci(design, {"h_in": h_in})[0], 7.5, 4)
+        self.assertTrue(np.isnan(solve_h_in(design, (800.0, 900.0))))
+
+        rc = np.array([190.0, 210.0, 240.0, 180.0])
+        h_batch = solve_h_in_batch(design, {"rc": rc}, (600.0, 1600.0))
+        self.assertAlmostEqual(h_batch[1], h_in, 2)
+        self.assertTrue(np.isnan(h_batch[3]))
+        np.testing.assert_allclose(continuous_sci(design, {"rc": rc[:3], "h_in": h_batch[:3]}), 7.5, rtol=1e-5)
+
+    def test_reduced_design_space(self):
+        design = load_design("10MVA_example.json")
+        rc = np.linspace(190.0, 250.0, 10)
+
+        res = evaluate_on_sci_target(design, {"rc": rc, "h_in": 0.0}, bounds=(600.0, 1600.0))
+        self.assertTrue(np.all(res["feasible"]))
+        self.assertTrue(np.all(sci_feasible(design, res["sci"])))
+
+        res = evaluate_on_sci_target(design, {"rc": rc}, solve_for="m_gap")
+        self.assertTrue(np.all(res["feasible"]))
+
+        with self.assertRaises(ValueError):
+            evaluate_on_sci_target(design, {"rc": rc})
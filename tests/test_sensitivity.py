@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.design_library import load_design
+from src.sensitivity import saltelli_matrices, sobol_analysis, sobol_estimates, stack_saltelli
+
+
+def ishigami(x, a=7.0, b=0.1):
+    return np.sin(x[:, 0]) + a * np.sin(x[:, 1]) ** 2 + b * x[:, 2] ** 4 * np.sin(x[:, 0])
+
+
+class TestSobolIndices(TestCase):
+    def test_saltelli_matrices(self):
+        a, b = saltelli_matrices({"rc": (180.0, 250.0), "bc": (1.5, 1.7)}, 100, seed=1)
+
+        # rounded up to the next power of 2
+        self.assertEqual(a.shape, (128, 2))
+        self.assertTrue(np.all((a[:, 0] >= 180.0) & (a[:, 0] <= 250.0)))
+        self.assertTrue(np.all((b[:, 1] >= 1.5) & (b[:, 1] <= 1.7)))
+
+        stacked = stack_saltelli(a, b)
+        self.assertEqual(stacked.shape, (128 * 4, 2))
+        np.testing.assert_array_equal(stacked[256:384, 0], b[:, 0])
+        np.testing.assert_array_equal(stacked[256:384, 1], a[:, 1])
+
+    def test_ishigami_function(self):
+        # analytical values: S1 = 0.314, 0.442, 0; ST = 0.558, 0.442, 0.244
+        bounds = {"x1": (-np.pi, np.pi), "x2": (-np.pi, np.pi), "x3": (-np.pi, np.pi)}
+        a, b = saltelli_matrices(bounds, 2 ** 14, seed=3)
+        y = ishigami(stack_saltelli(a, b))
+        n = a.shape[0]
+
+        s1, st = sobol_estimates(y[:n], y[n:2 * n], y[2 * n:].reshape(3, n))
+
+        np.testing.assert_allclose(s1, [0.314, 0.442, 0.0], atol=0.02)
+        np.testing.assert_allclose(st, [0.558, 0.442, 0.244], atol=0.02)
+
+    def test_transformer_sensitivity(self):
+        design = load_design("10MVA_example")
+        bounds = {"rc": (180.0, 250.0), "m_gap": (20.0, 60.0), "ll_cost": (500.0, 1500.0)}
+        res = sobol_analysis(design, bounds, n=512, n_bootstrap=20, seed=1)
+
+        self.assertEqual(res.parameters, ("rc", "m_gap", "ll_cost"))
+        self.assertEqual(res.first_order["sci"].shape, (3,))
+        self.assertEqual(res.total_conf["sci"].shape, (2, 3))
+        # the cost coefficients have no effect on the impedance and the no-load loss
+        self.assertAlmostEqual(res.total["sci"][2], 0.0, 6)
+        self.assertAlmostEqual(res.total["core_loss"][2], 0.0, 6)
+        # the impedance is mainly determined by the main gap and the core radius
+        self.assertGreater(res.total["sci"][1], 0.1)
+        self.assertGreater(res.total["capitalized_cost"][2], 0.0)
+        self.assertTrue(np.all(res.first_order_conf["sci"][0] <= res.first_order_conf["sci"][1]))
@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from src.design_library import load_design
+from src.models import MainResults, TransformerDesign, WindingParams
+from src.serialization import DESIGN_CODEC, RESULTS_CODEC, codec_for
+
+
+class TestFastCodec(TestCase):
+    def test_flat_tuple(self):
+        design = load_design("10MVA_example.json")
+        values = DESIGN_CODEC.to_tuple(design)
+
+        self.assertEqual(len(values), len(DESIGN_CODEC.names))
+        self.assertEqual(values[DESIGN_CODEC.names.index("required.hv.connection")], design.required.hv.connection)
+        self.assertEqual(DESIGN_CODEC.from_tuple(values), design)
+
+    def test_dataclasses_json_compatibility(self):
+        design = load_design("6300_kVA_example.json")
+
+        self.assertDictEqual(DESIGN_CODEC.to_dict(design), design.to_dict())
+        self.assertEqual(DESIGN_CODEC.from_dict(design.to_dict()), design)
+        self.assertEqual(DESIGN_CODEC.from_json(design.to_json()), design)
+        self.assertEqual(TransformerDesign.from_json(DESIGN_CODEC.to_json(design)), design)
+
+    def test_missing_keys_fall_back(self):
+        codec = codec_for(WindingParams)
+        self.assertEqual(codec.from_dict({"connection": "y", "line_voltage": 22.0}),
+                         WindingParams(connection="y", line_voltage=22.0))
+
+    def test_binary(self):
+        design = load_design("630kVA_sc_transformer.json")
+        self.assertEqual(DESIGN_CODEC.from_bytes(DESIGN_CODEC.to_bytes(design)), design)
+
+        results = MainResults(sci=7.5, feasible=True, fem_bax_brad_hv=[[1.0, 2.0], [3.0, 4.0]])
+        self.assertEqual(RESULTS_CODEC.from_bytes(RESULTS_CODEC.to_bytes(results)), results)
+
+    def test_numpy_records(self):
+        designs = [load_design("10MVA_example.json"), load_design("6300_kVA_example.json")]
+        array = DESIGN_CODEC.to_array(designs)
+
+        self.assertEqual(array.shape, (2,))
+        self.assertEqual(array["design_params.rc"][1], designs[1].design_params.rc)
+        self.assertListEqual(DESIGN_CODEC.from_array(array), designs)
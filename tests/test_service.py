@@ -0,0 +1,101 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from unittest import TestCase
+
+from src.cli import evaluate_records
+from src.service import Batcher, EvaluationService, LatencyStats, fem_available
+
+
+def _request(url, body=None):
+    data = None if body is None else (body if isinstance(body, bytes) else json.dumps(body).encode())
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+
+class TestService(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.service = EvaluationService(port=0, max_delay=0.05, fem_workers=0).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.service.stop()
+
+    def test_evaluate(self):
+        status, result = _request(self.service.url + "/evaluate", {"id": 1, "rating": "10MVA_example", "rc": 200})
+        self.assertEqual(status, 200)
+        expected = evaluate_records([{"id": 1, "rating": "10MVA_example", "rc": 200}])[0]
+        self.assertEqual(result["id"], 1)
+        self.assertAlmostEqual(result["capitalized_cost"], expected["capitalized_cost"])
+
+        status, results = _request(self.service.url + "/evaluate", [{"rating": "10MVA_example", "rc": rc}
+                                                                    for rc in (190, 200, 210)])
+        self.assertEqual(status, 200)
+        self.assertListEqual([row["rc"] for row in results], [190, 200, 210])
+
+        status, result = _request(self.service.url + "/evaluate", {"rating": "unknown"})
+        self.assertEqual(status, 422)
+        self.assertIn("unknown rating", result["error"])
+
+    def test_hts_losses(self):
+        status, result = _request(self.service.url + "/hts-losses", {"rating": "630kVA_sc_transformer"})
+        self.assertEqual(status, 200)
+        self.assertGreater(result["sc_ac_loss"], 0.0)
+        self.assertGreater(result["cryostat_loss"], 0.0)
+
+    def test_coalescing(self):
+        results = [None] * 16
+
+        def call(i):
+            results[i] = _request(self.service.url + "/evaluate", {"rating": "10MVA_example", "rc": 180 + i})
+
+        batches = self.service.metrics()["batches"]["/evaluate"]["count"]
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertListEqual([result[1]["rc"] for result in results], [180 + i for i in range(16)])
+        # the concurrent requests are evaluated in less batches than requests
+        self.assertLess(self.service.metrics()["batches"]["/evaluate"]["count"] - batches, 16)
+
+    def test_invalid_requests(self):
+        self.assertEqual(_request(self.service.url + "/unknown")[0], 404)
+        self.assertEqual(_request(self.service.url + "/evaluate", b"{not json")[0], 400)
+        self.assertEqual(_request(self.service.url + "/evaluate", [1, 2])[0], 400)
+        if not fem_available():
+            self.assertEqual(_request(self.service.url + "/fem", {"rating": "10MVA_example"})[0], 503)
+
+    def test_metrics(self):
+        _request(self.service.url + "/evaluate", {"rating": "10MVA_example"})
+        status, metrics = _request(self.service.url + "/metrics")
+        self.assertEqual(status, 200)
+        latency = metrics["endpoints"]["/evaluate"]
+        self.assertGreater(latency["count"], 0)
+        self.assertLessEqual(latency["p50_ms"], latency["p99_ms"])
+
+        status, ratings = _request(self.service.url + "/ratings")
+        self.assertIn("10MVA_example", ratings)
+        self.assertEqual(_request(self.service.url + "/health")[1]["status"], "ok")
+
+    def test_batcher(self):
+        batcher = Batcher(lambda records: [record * 2 for record in records], max_batch=4, max_delay=0.05)
+        try:
+            self.assertListEqual(batcher.evaluate_many(list(range(10))), [2 * i for i in range(10)])
+            self.assertTrue(all(size <= 4 for size in batcher.batch_sizes))
+        finally:
+            batcher.close()
+
+        stats = LatencyStats()
+        for latency in range(1, 101):
+            stats.add(latency * 1e-3)
+        summary = stats.summary()
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["p50_ms"], 50.5)
@@ -0,0 +1,108 @@
+from unittest import TestCase
+
+import numpy as np
+from scipy.constants import mu_0
+from scipy.integrate import quad
+
+from src.base_functions import sc_current
+from src.batch_model import evaluate_population
+from src.design_library import load_design
+from src.ring_field import coil_filaments, filament_field
+from src.short_circuit_forces import WindingSpec, filament_forces, peak_current_ratio, population_forces, \
+    two_winding_forces, winding_cells, winding_forces, yoke_images
+
+
+class TestShortCircuitForces(TestCase):
+
+    def test_cells(self):
+        cells = winding_cells(100.0, 20.0, 500.0, 10.0, n_sections=10, n_r=4, n_z=3)
+        self.assertEqual(cells.r.shape, (120,))
+        self.assertListEqual(np.bincount(cells.section).tolist(), [12] * 10)
+        # the volume of the rings: pi (r2^2 - r1^2) h
+        self.assertAlmostEqual(np.sum(cells.volume), np.pi * (120.0 ** 2 - 100.0 ** 2) * 500.0 * 1e-9, 12)
+        self.assertTrue(np.all((cells.z[cells.section == 0] > 10.0) & (cells.z[cells.section == 0] < 60.0)))
+
+        with self.assertRaises(ValueError):
+            winding_cells(100.0, 20.0, 500.0, 10.0, n_sections=0)
+
+    def test_single_coil(self):
+        # the self forces of a coil are balanced axially and compress it to the middle
+        spec = WindingSpec(200.0, 30.0, 600.0, -300.0, 2.0, 0.6)
+        forces = filament_forces([spec], n_sections=20)[0]
+        self.assertEqual(forces.z.shape, (20,))
+        self.assertEqual(forces.compressive_force.shape, (21,))
+        self.assertLess(abs(np.sum(forces.axial)), 1e-6 * np.max(np.abs(forces.axial)))
+        self.assertGreater(forces.axial[0], 0.0)
+        self.assertLess(forces.axial[-1], 0.0)
+        self.assertEqual(np.argmax(forces.compressive_force), 10)
+        # a single coil is expanded by its own field
+        self.assertTrue(np.all(forces.radial > 0.0))
+
+    def test_two_windings(self):
+        # tall windings between the yokes: B0 = mu0 NI / h in the gap, which decreases linearly in the outer winding
+        height = 1000.0
+        inner = WindingSpec(150.0, 30.0, height, 0.0, 3.0, 0.5)
+        outer = WindingSpec(200.0, 30.0, height, 0.0, -3.0, 0.5)
+        lv, hv = two_winding_forces(inner, outer, height, n_images=20)
+
+        b0 = mu_0 * 3.0 * 0.5 * 30.0 * height / (height * 1e-3)
+        expected = 2.0 * np.pi * 1.5e6 * height * 1e-3 * quad(lambda r: r * b0 * (0.23 - r) / 0.03, 0.2, 0.23)[0]
+        self.assertAlmostEqual(np.sum(hv.radial) / expected, 1.0, delta=0.005)
+        self.assertGreater(hv.max_hoop_stress, 0.0)
+        self.assertLess(lv.max_hoop_stress, 0.0)
+        # balanced windings in a closed window are not pressed axially
+        self.assertLess(hv.max_compressive_stress, 0.05 * abs(hv.max_hoop_stress))
+
+        # without the yokes the end fields of the windings press them to the middle
+        lv, hv = two_winding_forces(inner, outer, None)
+        self.assertGreater(lv.max_compressive_stress, 0.0)
+        self.assertEqual(np.argmax(hv.compressive_force), 10)
+
+    def test_peak_current_scaling(self):
+        ratio = peak_current_ratio(500.0, 9.0, 60.0, 10000.0)
+        self.assertAlmostEqual(ratio, sc_current(500.0, 0.09, (0.09 ** 2 - 0.006 ** 2) ** 0.5, 0.006) / 500.0)
+        # the x/r ratio is limited to the fitted range
+        self.assertAlmostEqual(peak_current_ratio(500.0, 9.0, 0.0, 10000.0), 2.8 * 1.41 / 0.09, 2)
+
+        cells = winding_cells(200.0, 20.0, 400.0, 0.0, n_sections=8)
+        filaments = coil_filaments(200.0, 20.0, 400.0, 0.0, 2.0 * 0.5 * 20.0 * 400.0)
+        br, bz = filament_field(filaments, cells.r, cells.z)
+        nominal = winding_forces(cells, br, bz, 2.0, 0.5)
+        peak = winding_forces(cells, br, bz, 2.0, 0.5, ratio)
+        np.testing.assert_allclose(peak.radial, nominal.radial * ratio ** 2)
+        np.testing.assert_allclose(peak.hoop_stress, nominal.hoop_stress * ratio ** 2)
+
+        self.assertEqual(yoke_images(filaments, 500.0, 2).r.shape[0], 10 * filaments.r.shape[0])
+
+        # the ratios of a population
+        ratios = peak_current_ratio(500.0, np.array([9.0, 9.0, 12.0]), np.array([60.0, 0.0, 30.0]), 10000.0)
+        np.testing.assert_allclose(ratios, [ratio, peak_current_ratio(500.0, 9.0, 0.0, 10000.0),
+                                            peak_current_ratio(500.0, 12.0, 30.0, 10000.0)])
+
+    def test_population(self):
+        design = load_design("10MVA_example")
+        res = evaluate_population(design, {"rc": [190.0, 220.0]})
+        columns = population_forces(design, res, n_sections=10)
+
+        self.assertEqual(columns["lv_hoop_stress"].shape, (2,))
+        self.assertTrue(np.all(columns["lv_hoop_stress"] < 0.0))
+        self.assertTrue(np.all(columns["hv_hoop_stress"] > 0.0))
+        # the lower impedance gives larger short-circuit current
+        self.assertGreater(columns["sc_peak_ratio"][1], columns["sc_peak_ratio"][0])
+        self.assertGreater(columns["hv_radial_force"][1], columns["hv_radial_force"][0])
+
+        # the stacked designs give the forces of the designs one by one
+        req = design.required
+        for k in range(2):
+            windings = [WindingSpec(res[prefix + "_inner_radius"][k], res[prefix + "_thickness"][k],
+                                    res[prefix + "_height"][k], req.ei / 2.0, sign * res[j][k], ff / 100.0)
+                        for prefix, j, sign, ff in (("lv", "j_in", 1.0, req.lv.filling_factor),
+                                                    ("hv", "j_ou", -1.0, req.hv.filling_factor))]
+            lv, hv = filament_forces(windings, res["wh"][k], columns["sc_peak_ratio"][k], n_sections=10, n_r=3)
+            self.assertAlmostEqual(columns["lv_hoop_stress"][k], lv.max_hoop_stress, 9)
+            self.assertAlmostEqual(columns["hv_compressive_stress"][k], hv.max_compressive_stress, 9)
+            self.assertAlmostEqual(columns["hv_radial_force"][k] / np.sum(hv.radial), 1.0, 12)
+
+        # the resistance is given by the winding losses, the cooling penalty of the sc load loss is not considered
+        penalized = population_forces(design, dict(res, load_loss=18.0 * res["load_loss"]), n_sections=10)
+        np.testing.assert_allclose(penalized["sc_peak_ratio"], columns["sc_peak_ratio"])
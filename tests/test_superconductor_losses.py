@@ -1,6 +1,9 @@
 from unittest import TestCase
+
+import numpy as np
+
 from src.superconductor_losses import parallel_loss, perp_loss, norris_equation, cryostat_losses, cryo_surface, \
-    thermal_incomes, cooler_cost, sc_load_loss, magnusson_ac_loss
+    thermal_incomes, cooler_cost, sc_load_loss, magnusson_ac_loss, supra_winding_ac_loss
 
 from math import pi
 
@@ -100,3 +103,39 @@ class TestLosses(TestCase):
 
         self.assertAlmostEqual(c1, 24984.95, 1)
         self.assertAlmostEqual(c2, 92827.91, 1)
+
+
+class TestVectorizedLosses(TestCase):
+
+    def test_array_losses(self):
+        b = np.array([0.0, 0.02, 0.0344, 0.066, 0.1])
+
+        par = parallel_loss(b, 50)
+        perp = perp_loss(50, b)
+        self.assertEqual(par.shape, (5,))
+        for i, bi in enumerate(b):
+            self.assertEqual(par[i], parallel_loss(float(bi), 50))
+            self.assertEqual(perp[i], perp_loss(50, float(bi)))
+
+        # the perpendicular loss is zero in zero field
+        self.assertEqual(perp[0], 0.0)
+
+        current = np.array([10.0, 25.0, 50.0])
+        ac = magnusson_ac_loss(0.066, 0.068, 50, current)
+        self.assertAlmostEqual(ac[1], 2.125, 2)
+        self.assertAlmostEqual(norris_equation(50, current, 115.)[2], 0.0047, 4)
+
+    def test_winding_ac_loss(self):
+        profile = [(0.03, 0.0237), (0.05, 0.01), (0.06, 0.002), (0.05, 0.01), (0.03, 0.0237)]
+
+        loss = supra_winding_ac_loss(profile, 50, 18.75)
+        pax = sum(parallel_loss(bax, 50) for bax, _ in profile)
+        prad = sum(perp_loss(50, brad) / 1.2 for _, brad in profile)
+        self.assertEqual(loss, round((pax + prad) / len(profile) + norris_equation(50, 18.75, 170), 3))
+
+        # three windings at once
+        profiles = np.array([profile, np.array(profile) * 0.5, np.array(profile) * 2.0])
+        losses = supra_winding_ac_loss(profiles, 50, np.array([18.75, 10.0, 30.0]))
+        self.assertEqual(losses.shape, (3,))
+        self.assertEqual(losses[0], loss)
+        self.assertEqual(losses[2], supra_winding_ac_loss(profiles[2], 50, 30.0))
@@ -0,0 +1,80 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.ring_field import Filaments, coil_filaments, filament_field
+from src.short_circuit_forces import winding_cells
+from src.superposition import Superposition, energy_matrix, load_case_columns, sample_basis
+
+# energy matrix of the test windings [J/(A/mm2)^2]
+ENERGY = np.array([[40.0, -35.0], [-35.0, 45.0]])
+WINDINGS = {"lv": (150.0, 30.0, 800.0, 100.0, 0.6), "hv": (200.0, 30.0, 780.0, 110.0, 0.5)}
+
+
+def _filaments(j_lv, j_hv) -> Filaments:
+    return Filaments.concatenate(*[
+        coil_filaments(r, t, h, z0, j * ff * t * h, 4, 50)
+        for (r, t, h, z0, ff), j in zip(WINDINGS.values(), (j_lv, j_hv))])
+
+
+class _LinearSolution:
+    """linear model of the windings, like the solution of the FEM model with constant permeabilities"""
+
+    def __init__(self, j_lv, j_hv):
+        self.filaments = _filaments(j_lv, j_hv)
+        self.j = np.array([j_lv, j_hv])
+
+    def local_values(self, r, z):
+        br, bz = filament_field(self.filaments, r * 1e3, z * 1e3)
+        return {"Brr": float(br), "Brz": float(bz)}
+
+    def volume_integrals(self):
+        return {"Wm": float(self.j @ ENERGY @ self.j)}
+
+
+class TestSuperposition(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.grids = {name: winding_cells(r, t, h, z0, n_sections=10, n_r=3, n_z=1)
+                     for name, (r, t, h, z0, _) in WINDINGS.items()}
+        basis = [sample_basis(_LinearSolution(1.0, 0.0), cls.grids), sample_basis(_LinearSolution(0.0, 1.0), cls.grids)]
+        pair = sample_basis(_LinearSolution(1.0, 1.0), {})
+        cls.basis = Superposition(("lv", "hv"), basis, {(0, 1): pair.energy}, cls.grids, 10)
+
+    def test_energy(self):
+        np.testing.assert_allclose(self.basis.energy_matrix, ENERGY)
+        cases = np.array([[2.5, -2.4], [3.0, -2.4], [2.5 * 1.2, -2.4 * 1.2]])
+        np.testing.assert_allclose(self.basis.energy(cases), [j @ ENERGY @ j for j in cases])
+
+        np.testing.assert_allclose(energy_matrix([1.0, 2.0, 3.0], {(0, 2): 6.0}), [[1.0, 0.0, 1.0], [0.0, 2.0, 0.0],
+                                                                                   [1.0, 0.0, 3.0]])
+
+    def test_fields(self):
+        # the superposed fields are the fields of the load cases
+        for j_lv, j_hv in ((2.5, -2.4), (3.1, -1.0)):
+            b_ax, b_rad = self.basis.flux([j_lv, j_hv], "hv")
+            b_rad_direct, b_ax_direct = filament_field(_filaments(j_lv, j_hv), self.grids["hv"].r, self.grids["hv"].z)
+            np.testing.assert_allclose(b_ax, b_ax_direct, atol=1e-12)
+            np.testing.assert_allclose(b_rad, b_rad_direct, atol=1e-12)
+
+        b_ax, b_rad = self.basis.flux_profile(np.array([[2.5, -2.4], [3.0, -2.0], [1.0, -1.0]]), "lv")
+        self.assertEqual(b_ax.shape, (3, 10))
+        self.assertEqual(self.basis.z["lv"].shape, (10,))
+        self.assertTrue(np.all(b_rad >= 0.0))
+
+    def test_load_cases(self):
+        factors = np.array([1.0, 1.2, 1.5])
+        res = load_case_columns(self.basis, 2.5 * factors, -2.4 * factors, factors, 50.0, 10000.0, 33.0)
+        # the impedance does not depend on the overload, the peak flux densities are proportional
+        np.testing.assert_allclose(res["fem_based_sci"], res["fem_based_sci"][0])
+        np.testing.assert_allclose(res["fem_bax_hv"], res["fem_bax_hv"][0] * factors)
+        np.testing.assert_allclose(res["magnetic_energy"], res["magnetic_energy"][0] * factors ** 2)
+
+        i_b = 10000.0 / 33.0 / 3. ** 0.5
+        expected = 2.0 * np.pi * 50.0 * 2.0 * res["magnetic_energy"][0] / i_b ** 2 / (33.0 ** 2 / 10.0) * 100.0
+        self.assertAlmostEqual(res["fem_based_sci"][0], expected)
+
+        # unbalanced ampere-turns of a tap position
+        tap = load_case_columns(self.basis, 2.5, -2.4 * 1.05, 1.05, 50.0, 10000.0, 33.0)
+        self.assertNotAlmostEqual(float(tap["fem_based_sci"]), res["fem_based_sci"][0])
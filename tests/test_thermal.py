@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.batch_model import evaluate_population
+from src.cli import OptimizationOptions, optimize_design
+from src.design_library import load_design
+from src.models import WindingDesign
+from src.thermal import ThermalParameters, design_thermal, oil_rise, population_thermal, winding_cooling_surface
+
+
+class TestThermal(TestCase):
+
+    def test_oil_rise(self):
+        params = ThermalParameters()
+        mean_oil_rise, top_oil_rise = oil_rise(50.0, 200.0, params)
+        # the dissipated loss of the cooling surface gives back the total loss
+        self.assertAlmostEqual(params.tank_htc * 200.0 * mean_oil_rise ** (1.0 / params.oil_exponent), 50e3, 6)
+        self.assertAlmostEqual(top_oil_rise, params.top_oil_factor * mean_oil_rise)
+
+    def test_ducts(self):
+        params = ThermalParameters(duct_pitch=40.0)
+        # without ducts: the inner and the outer surfaces
+        self.assertAlmostEqual(winding_cooling_surface(200.0, 40.0, 1000.0, params),
+                               2.0 * np.pi * (0.2 + 0.24) * 1.0 * params.wetted_fraction)
+        # one duct in the middle doubles the surface
+        self.assertAlmostEqual(winding_cooling_surface(200.0, 60.0, 1000.0, params),
+                               2.0 * winding_cooling_surface(200.0, 60.0, 1000.0, ThermalParameters(duct_pitch=60.0)))
+
+    def test_population(self):
+        design = load_design("10MVA_example")
+        j = np.linspace(2.0, 4.0, 5)
+        res = evaluate_population(design, {"j_in": j, "j_ou": j})
+        thermal = population_thermal(design, res)
+
+        self.assertEqual(thermal.hot_spot.shape, (5,))
+        # the larger current densities give larger losses and temperatures
+        self.assertTrue(np.all(np.diff(thermal.top_oil_rise) > 0.0))
+        self.assertTrue(np.all(np.diff(thermal.hot_spot) > 0.0))
+        self.assertTrue(np.all(thermal.hot_spot > thermal.top_oil_rise + ThermalParameters().ambient))
+        self.assertTrue(thermal.feasible[0])
+        self.assertFalse(thermal.feasible[-1])
+
+        columns = thermal.columns()
+        self.assertIn("lv_winding_rise", columns)
+        self.assertIn("hv_hot_spot", columns)
+
+    def test_single_design(self):
+        design = load_design("10MVA_example")
+        res = evaluate_population(design, {})
+
+        windings = []
+        for prefix, params in (("lv", design.required.lv), ("hv", design.required.hv)):
+            winding = WindingDesign(inner_radius=float(res[prefix + "_inner_radius"][0]),
+                                    thickness=float(res[prefix + "_thickness"][0]),
+                                    winding_height=float(res[prefix + "_height"][0]),
+                                    filling_factor=params.filling_factor,
+                                    current_density=design.design_params.j_in if prefix == "lv" else
+                                    design.design_params.j_ou)
+            winding.calc_properties()
+            windings.append(winding)
+
+        single = design_thermal(design, windings[0], windings[1], float(res["core_loss"][0]), float(res["wh"][0]))
+        self.assertAlmostEqual(single.hot_spot, population_thermal(design, res).hot_spot[0], 6)
+
+    def test_optimization(self):
+        design = load_design("10MVA_example")
+        row = optimize_design(design, OptimizationOptions(maxiter=20, seed=1, thermal=True))
+        self.assertTrue(row["thermal_feasible"])
+        self.assertLessEqual(row["hot_spot"], ThermalParameters().hot_spot_max)
+
+        with self.assertRaises(ValueError):
+            optimize_design(design, OptimizationOptions(sc=True, thermal=True))
@@ -81,3 +81,12 @@ class TestGeoCreation(TestCase):
         print(fem_based_sci)
 
         self.assertAlmostEqual(1480.7, solution.volume_integrals()["Wm"], 1)
+
+    def test_fidelity(self):
+        model = FemModel("screening")
+        self.assertEqual(model.magnetic.number_of_refinements, 0)
+        self.assertEqual(model.magnetic.polynomial_order, 1)
+
+        model = FemModel("verification")
+        self.assertEqual(model.magnetic.polynomial_order, 3)
+        self.assertEqual(model.magnetic.adaptivity_type, "hp-adaptivity")
@@ -2,6 +2,9 @@ from unittest import TestCase
 
 from importlib_resources import files
 
+from src.critical_current import critical_current_map
+from src.models import MainResults
+from src.winding_loss_integration import TAPE_AREA
 from src.two_winding_model import TransformerDesign, TwoWindingModel
 
 """10 MVA Transformer from Karsai, Nagytranszformátorok """
@@ -39,6 +42,9 @@ class TestConvTransformerModel(TestCase):
         self.assertAlmostEqual(trafo_model.results.sci, 7.5, 0)
 
         self.assertAlmostEqual(trafo_model.results.capitalized_cost, 161503, 0)
+        self.assertAlmostEqual(trafo_model.results.hv_mass, 1620., 0)
+        self.assertAlmostEqual(trafo_model.results.copper_mass,
+                               trafo_model.results.lv_mass + trafo_model.results.hv_mass, 1)
         print(trafo_model)
 
         # FEM calculation
@@ -47,3 +53,92 @@ class TestConvTransformerModel(TestCase):
         self.assertAlmostEqual(trafo_model.results.fem_based_sci, 7.56, 1)
 
         del trafo_model
+
+    def test_symmetric_half_model(self):
+        transformer = TransformerDesign.from_json(files("data").joinpath("31_5_MVA_example.json").read_text())
+
+        full = TwoWindingModel(input=transformer, results=MainResults())
+        full.calculate()
+        full.fem_simulation(detailed_output=False)
+
+        half = TwoWindingModel(input=transformer, results=MainResults())
+        half.calculate()
+        half.fem_simulation(detailed_output=False, symmetry=True)
+
+        self.assertAlmostEqual(half.results.fem_based_sci, full.results.fem_based_sci, 1)
+        self.assertAlmostEqual(half.results.fem_bax_hv, full.results.fem_bax_hv, delta=0.02 * full.results.fem_bax_hv)
+        self.assertAlmostEqual(half.results.fem_brad_lv, full.results.fem_brad_lv,
+                               delta=0.05 * full.results.fem_brad_lv)
+
+    def test_superposed_load_cases(self):
+        transformer = TransformerDesign.from_json(files("data").joinpath("10MVA_example.json").read_text())
+        model = TwoWindingModel(input=transformer, results=MainResults())
+        model.calculate()
+        model.fem_simulation(detailed_output=False)
+
+        basis = model.fem_basis()
+        res = model.superposed_load_cases(basis, lv_factor=[1.0, 1.2], hv_factor=[1.0, 1.2])
+        self.assertAlmostEqual(res["fem_based_sci"][0], model.results.fem_based_sci, 1)
+        self.assertAlmostEqual(res["fem_based_sci"][1], res["fem_based_sci"][0], 6)
+        self.assertAlmostEqual(res["fem_bax_hv"][1], 1.2 * res["fem_bax_hv"][0], 6)
+
+    def test_sc_winding_losses(self):
+        transformer = TransformerDesign.from_json(files("data").joinpath("1250kVA_sc_transformer.json").read_text())
+        model = TwoWindingModel(input=transformer, results=MainResults())
+        model.calculate(is_sc=True)
+        model.fem_simulation(detailed_output=False)
+
+        ac_loss = model.lv_winding.ac_loss + model.hv_winding.ac_loss
+        load_loss, cost = model.results.load_loss, model.results.capitalized_cost
+        currents = (model.lv_winding.current_density * TAPE_AREA, model.hv_winding.current_density * TAPE_AREA)
+
+        # the YBCO tape is over-critical, the model is not modified
+        with self.assertRaises(ValueError):
+            model.sc_winding_losses(*currents, Ic=critical_current_map("YBCO"))
+        self.assertEqual(model.lv_winding.ac_loss + model.hv_winding.ac_loss, ac_loss)
+        self.assertEqual(model.results.load_loss, load_loss)
+
+        lv, hv = model.sc_winding_losses(*currents)
+        self.assertFalse(lv.over_critical or hv.over_critical)
+        # the cooling penalized load loss follows the integrated ac losses
+        self.assertAlmostEqual(model.results.load_loss - load_loss,
+                               18.0 * (model.lv_winding.ac_loss + model.hv_winding.ac_loss - ac_loss), 1)
+        self.assertAlmostEqual(model.results.capitalized_cost - cost,
+                               (model.results.load_loss - load_loss) * transformer.costs.ll_cost, 3)
+
+    def test_harmonic_losses(self):
+        transformer = TransformerDesign.from_json(files("data").joinpath("10MVA_example.json").read_text())
+        model = TwoWindingModel(input=transformer, results=MainResults())
+        model.calculate()
+        model.fem_simulation(detailed_output=False)
+
+        lv, hv = model.harmonic_losses()
+        self.assertEqual(lv.unit_eddy.shape, (50,))
+        self.assertTrue(0.0 < lv.unit_eddy[0] < model.lv_winding.dc_loss)
+        self.assertGreater(hv.loss_factor, 1.0)
+
+    def test_sc_forces(self):
+        transformer = TransformerDesign.from_json(files("data").joinpath("10MVA_example.json").read_text())
+        model = TwoWindingModel(input=transformer, results=MainResults())
+        model.calculate()
+        model.fem_simulation(detailed_output=False)
+
+        lv, hv = model.sc_forces(n_sections=10)
+        self.assertLess(lv.max_hoop_stress, 0.0)
+        self.assertGreater(hv.max_hoop_stress, 0.0)
+
+        # the point sampling alone, without the force integrals of the labels
+        class _SampledSolution:
+            def __init__(self, solution):
+                self.solution = solution
+
+            def local_values(self, r, z):
+                return self.solution.local_values(r, z)
+
+            def volume_integrals(self, *args, **kwargs):
+                return {}
+
+        model.fem_solution = _SampledSolution(model.fem_solution)
+        sampled_lv, sampled_hv = model.sc_forces(n_sections=10)
+        self.assertAlmostEqual(sum(sampled_hv.radial) / sum(hv.radial), 1.0, delta=0.05)
+        self.assertAlmostEqual(sum(sampled_lv.axial) - sum(lv.axial), 0.0, delta=1e-6 * abs(sum(lv.radial)))
@@ -0,0 +1,81 @@
+from math import pi
+from unittest import TestCase
+
+import numpy as np
+
+from src.superconductor_losses import magnusson_ac_loss, norris_equation
+from src.winding_loss_integration import TAPE_AREA, pancake_losses, winding_grid
+
+
+class TestWindingLossIntegration(TestCase):
+
+    def test_grid(self):
+        grid = winding_grid(300.0, 20.0, 600.0, 100.0, 0.6, 60, n_r=40, n_z=42)
+
+        self.assertEqual(grid.r.shape, (40 * 60 * 42,))
+        self.assertTrue(np.all((grid.r > 300.0) & (grid.r < 320.0)))
+        self.assertTrue(np.all((grid.z > 100.0) & (grid.z < 700.0)))
+        np.testing.assert_array_equal(np.bincount(grid.pancake), np.full(60, 40 * 42))
+        # the pancakes are stacked along the axis
+        self.assertTrue(np.all(grid.z[grid.pancake == 1] > grid.z[grid.pancake == 0].max()))
+
+        # tape length of the whole cross-section, mm -> m
+        length = 2.0 * pi * 310.0 * 20.0 * 600.0 * 0.6 / TAPE_AREA * 1e-3
+        self.assertAlmostEqual(np.sum(grid.length), length, 6)
+
+    def test_uniform_field(self):
+        grid = winding_grid(300.0, 20.0, 600.0, 100.0, 0.6, 12)
+        b_ax = np.full(grid.r.shape, 0.066)
+        b_rad = np.full(grid.r.shape, -0.02)
+
+        losses = pancake_losses(grid, b_ax, b_rad, 50.0, 50.0, 170.0, kappa=1.0)
+
+        self.assertEqual(losses.total.shape, (12,))
+        np.testing.assert_allclose(losses.total, magnusson_ac_loss(0.066, 0.02, 50.0, 50.0, 170.0) * losses.length)
+        self.assertAlmostEqual(losses.winding_loss, float(np.sum(losses.total)), 9)
+
+    def test_field_dependent_critical_current(self):
+        grid = winding_grid(300.0, 20.0, 600.0, 100.0, 0.6, 12)
+        rng = np.random.default_rng(0)
+        b_ax = rng.normal(0.0, 0.05, grid.r.shape)
+        b_rad = rng.normal(0.0, 0.02, grid.r.shape)
+
+        scalar = pancake_losses(grid, b_ax, b_rad, 50.0, 50.0, 170.0)
+        array = pancake_losses(grid, b_ax, b_rad, 50.0, 50.0, np.full(grid.r.shape, 170.0))
+        np.testing.assert_allclose(array.self_field, scalar.self_field)
+        np.testing.assert_allclose(array.total, scalar.total)
+
+        lower = pancake_losses(grid, b_ax, b_rad, 50.0, 50.0, np.where(grid.pancake == 0, 100.0, 170.0))
+        self.assertAlmostEqual(lower.self_field[0], norris_equation(50.0, 50.0, 100.0) * lower.length[0], 9)
+        np.testing.assert_allclose(lower.self_field[1:], scalar.self_field[1:])
+
+    def test_over_critical(self):
+        grid = winding_grid(300.0, 20.0, 600.0, 100.0, 0.6, 12)
+        b_ax = np.full(grid.r.shape, 0.066)
+        b_rad = np.full(grid.r.shape, -0.02)
+
+        scalar = pancake_losses(grid, b_ax, b_rad, 50.0, 50.0, 170.0)
+        np.testing.assert_allclose(scalar.ic_margin, 1.0 - 50.0 / 170.0)
+        self.assertFalse(scalar.over_critical)
+
+        # one over-critical point in the first pancake, the current equals to the critical current in the last one
+        ic = np.full(grid.r.shape, 170.0)
+        ic[np.flatnonzero(grid.pancake == 0)[0]] = 40.0
+        ic[np.flatnonzero(grid.pancake == 11)[0]] = 50.0
+        losses = pancake_losses(grid, b_ax, b_rad, 50.0, 50.0, ic)
+
+        self.assertTrue(losses.over_critical)
+        self.assertTrue(np.all(np.isfinite(losses.total)))
+        self.assertAlmostEqual(losses.ic_margin[0], 1.0 - 50.0 / 40.0)
+        self.assertEqual(losses.ic_margin[-1], 0.0)
+        np.testing.assert_allclose(losses.ic_margin[1:-1], 1.0 - 50.0 / 170.0)
+        # the over-critical points are excluded from the self-field losses
+        self.assertLess(losses.self_field[0], scalar.self_field[0])
+        np.testing.assert_allclose(losses.self_field[1:-1], scalar.self_field[1:-1])
+
+        with np.errstate(invalid="raise", divide="raise"):
+            self.assertTrue(pancake_losses(grid, b_ax, b_rad, 50.0, 60.0, 50.0).over_critical)
+
+    def test_invalid_grid(self):
+        with self.assertRaises(ValueError):
+            winding_grid(300.0, 20.0, 600.0, 100.0, 0.6, 0)